@@ -1,74 +1,215 @@
 # app/main.py
-from fastapi import FastAPI
-from pydantic import BaseModel, EmailStr
-from tests.playwright_runner import run_test
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from app.models import BatchReq, CreateAccountReq, CreateUserReq, GenericReq
+from tests.playwright_runner import run_test, stream_test
+import tests.playwright_runner as playwright_runner
+from curly_octo_guacamole.api.runner.jobs import FINISHED_STATES, JobManager
+from curly_octo_guacamole.api.runner.cancellation import TIMEOUT, RunTimeouts
+from curly_octo_guacamole.api.runner.history import RUN_STATUSES, RunHistory
+from curly_octo_guacamole.api.runner.job_queue import (
+    DistributedRunner, SQLiteJobQueue, coordinator_max_runs, runner_mode,
+)
+from curly_octo_guacamole.api.runner.admission import AdmissionRejected, ConcurrencyGovernor
+from curly_octo_guacamole.api.runner import batch, metrics
+from curly_octo_guacamole.api.runner.result_cache import cache_key
+from curly_octo_guacamole.api.runner.registry import keywords
+from curly_octo_guacamole.api.runner.logging_config import configure_logging
+from curly_octo_guacamole.api.controllers.collection_index import get_collection_index
+from curly_octo_guacamole.api.controllers.worker_pool import close_worker_pool, get_worker_pool
+from pydantic import ValidationError
+import json
+import asyncio
+import contextlib
+import functools
 import logging
+import os
+import queue
 from datetime import datetime
+from typing import Literal
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Playwright Test API")
+def classify_run(keyword: str, payload: dict) -> str:
+    """Admission class of a run: browser-driven UI runs or pytest API runs."""
+    return "ui" if payload.get("ui_test") else "api"
+
+# Jobs kept for polling through /jobs
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "1000"))
+
+# Runner state, created by `start_runner` when the server starts so that
+# importing this module stays cheap and free of side effects
+log_handler = None
+governor: ConcurrencyGovernor | None = None
+run_history: RunHistory | None = None
+job_queue: SQLiteJobQueue | None = None
+distributed_runner: DistributedRunner | None = None
+job_manager: JobManager | None = None
+
+def start_runner():
+    """Configure logging and create the admission, history, queue and job state."""
+    global log_handler, governor, run_history, job_queue, distributed_runner, job_manager
+    # Configure logging: background writer, text or JSON (LOG_* settings)
+    log_handler = configure_logging()
+
+    # Every finished run is recorded in SQLite for /runs (RUN_HISTORY_* settings)
+    run_history = RunHistory.from_env()
+
+    # In coordinator mode runs are queued for worker agents instead of run here
+    # (RUNNER_MODE, JOB_QUEUE_* settings); agents lease them by priority
+    job_queue = SQLiteJobQueue.from_env() if runner_mode() == "coordinator" else None
+    distributed_runner = DistributedRunner(job_queue, classify=classify_run) if job_queue else None
+
+    # Separate UI/API slots with bounded waiting queues (ADMISSION_* settings) for
+    # runs executed here; in coordinator mode the agents' concurrency bounds them
+    governor = ConcurrencyGovernor.from_env() if job_queue is None else None
+
+    # Bounded executor for test runs so slow UI runs can't starve the HTTP server
+    job_manager = JobManager(
+        distributed_runner or run_test,
+        max_workers=coordinator_max_runs(),  # Runs waiting on agents; the governor sizes local pools
+        max_jobs=JOB_HISTORY_SIZE,
+        governor=governor,
+        classify=classify_run,
+        on_finish=run_history.record if run_history else None,
+        # Runs past their keyword's timeout are killed (RUN_TIMEOUT* settings)
+        timeouts=RunTimeouts.from_env(),
+        pass_priority=distributed_runner is not None,
+    )
+
+    # Index the API tests up front so the first run doesn't pay for it
+    get_collection_index()
 
-# ——— Demo models —————————————————————————————————————————————————————
+    # Spawn and warm the pytest workers now rather than on the first run
+    # (PYTEST_WORKER_POOL_SIZE); in coordinator mode the agents run the tests
+    if job_queue is None:
+        get_worker_pool()
 
-class CreateAccountReq(BaseModel):
-    expired_at: str        # e.g. "20250819"
-    ui_test: bool = False  # Set to True to run UI tests
+def stop_runner():
+    """Stop accepting runs and write the pending run history."""
+    job_manager.shutdown(wait=False)
+    close_worker_pool()
+    if run_history is not None:
+        run_history.close()
 
-class CreateUserReq(BaseModel):
-    action: str            # e.g. "create_user"
-    ui_test: bool = False  # Set to True to run UI tests
-    username: str
-    email: EmailStr
-    first_name: str
-    last_name: str
-    gender: str
-    birth: str             # YYYYMMDD
-    agreed_terms: bool
-    salary: int
-    id: str
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_runner()
+    try:
+        yield
+    finally:
+        stop_runner()
+
+app = FastAPI(title="Playwright Test API", lifespan=lifespan)
+
+# Coalesce identical requests onto the run already in flight (single-flight)
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+def submit_test(keyword: str, payload: dict, **options):
+    """Submit a test run, attaching to an identical in-flight run when enabled."""
+    payload_hash = cache_key(keyword, payload)
+    dedupe_key = payload_hash if SINGLE_FLIGHT_ENABLED else None
+    return job_manager.submit(keyword, payload, dedupe_key=dedupe_key, payload_hash=payload_hash, **options)
+
+def collect_service_metrics():
+    """Admission, result cache and logging gauges, read at scrape time."""
+    for run_class, stats in (governor.stats() if governor is not None else {}).items():
+        labels = {"run_class": run_class}
+        yield "runner_admission_slots_in_use", "Admission slots in use", labels, stats["in_use"]
+        yield "runner_admission_slots", "Admission slots configured", labels, stats["limit"]
+        yield "runner_admission_queued", "Runs waiting for an admission slot", labels, stats["queued"]
+    cache = playwright_runner.result_cache
+    if cache is not None:
+        stats = cache.stats()
+        yield "runner_result_cache_hits", "Result cache hits", {}, stats["hits"]
+        yield "runner_result_cache_misses", "Result cache misses", {}, stats["misses"]
+        yield "runner_result_cache_entries", "Entries in the result cache", {}, stats["size"]
+    yield "runner_log_records_dropped", "Log records dropped because the log queue was full", {}, getattr(log_handler, "dropped", 0)
+
+metrics.REGISTRY.add_collector(collect_service_metrics)
+
+def log_request(endpoint: str, keyword: str, payload: dict):
+    """One structured line per request; the payload is rendered by the log writer thread."""
+    logger.info(
+        "🚀 API request received",
+        extra={"endpoint": endpoint, "keyword": keyword, "payload": dict(payload)}
+    )
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Queue for the run class is full: ask the client to back off."""
+    return JSONResponse(
+        status_code=429,
+        content={"status": "rejected", "message": str(exc), "run_class": exc.run_class},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# ——— Helpers ——————————————————————————————————————————————————————————
+
+def build_test_response(result: dict) -> dict:
+    """Wrap a test result in the standard endpoint response."""
+    if result.get("status") == "success":
+        return {
+            "status": "success",
+            "message": "Test executed successfully",
+            "test_result": result,
+            "timestamp": datetime.now().isoformat()
+        }
+    return {
+        "status": "error",
+        "message": "Test execution failed",
+        "test_result": result,
+        "timestamp": datetime.now().isoformat()
+    }
+
+# Scheduling priority while a run waits for a slot of its class
+Priority = Literal["high", "normal", "low"]
+
+def use_result_cache(
+    cache_control: str | None = Header(None),
+    x_cache_bypass: str | None = Header(None),
+) -> bool:
+    """False when the caller asks for a fresh run via `Cache-Control: no-cache` or `X-Cache-Bypass`."""
+    if cache_control and "no-cache" in cache_control.lower():
+        return False
+    if x_cache_bypass and x_cache_bypass.lower() in ("1", "true", "yes"):
+        return False
+    return True
+
+def job_accepted(job) -> JSONResponse:
+    """202 response pointing the caller at the job status endpoint."""
+    return JSONResponse(
+        status_code=202,
+        content={**job.to_dict(include_result=False), "status_url": f"/jobs/{job.id}"}
+    )
 
 # ——— Endpoints ————————————————————————————————————————————————————————
 
 @app.post("/create_account")
-def create_account(req: CreateAccountReq):
-    # Log the request details
-    logger.info("=" * 60)
-    logger.info("🚀 API REQUEST RECEIVED")
-    logger.info("=" * 60)
-    logger.info(f"📡 Endpoint: POST /create_account")
-    logger.info(f"🔑 Keyword: create_account")
-    logger.info(f"📊 Test Data: {req.model_dump()}")
-    logger.info("-" * 60)
+async def create_account(
+    req: CreateAccountReq,
+    background: bool = False,
+    priority: Priority = "normal",
+    use_cache: bool = Depends(use_result_cache),
+):
+    payload = req.model_dump()
+    log_request("POST /create_account", "create_account", payload)
     
     try:
-        # translate Pydantic model to dict
-        result = run_test("create_account", req.model_dump())
+        job = submit_test("create_account", payload, priority=priority, use_cache=use_cache)
+        if background:
+            return job_accepted(job)
         
-        # Check if the test was successful
-        if result.get("status") == "success":
-            return {
-                "status": "success",
-                "message": "Test executed successfully",
-                "test_result": result,
-                "timestamp": datetime.now().isoformat()
-            }
-        else:
-            return {
-                "status": "error",
-                "message": "Test execution failed",
-                "test_result": result,
-                "timestamp": datetime.now().isoformat()
-            }
+        await asyncio.wrap_future(job.future)
+        if job.error:
+            raise RuntimeError(job.error)
+        return build_test_response(job.result)
             
+    except AdmissionRejected:
+        raise
     except Exception as e:
-        logger.error(f"Exception during test execution: {str(e)}")
+        logger.error("Exception during test execution: %s", e)
         return {
             "status": "error",
             "message": f"Exception during test execution: {str(e)}",
@@ -77,38 +218,29 @@ def create_account(req: CreateAccountReq):
         }
 
 @app.post("/create_user")
-def create_user(req: CreateUserReq):
-    # Log the request details
-    logger.info("=" * 60)
-    logger.info("🚀 API REQUEST RECEIVED")
-    logger.info("=" * 60)
-    logger.info(f"📡 Endpoint: POST /create_user")
-    logger.info(f"🔑 Keyword: {req.action}")
-    logger.info(f"📊 Test Data: {req.model_dump()}")
-    logger.info(f"🖥️  UI Test: {req.ui_test}")
-    logger.info("-" * 60)
+async def create_user(
+    req: CreateUserReq,
+    background: bool = False,
+    priority: Priority = "normal",
+    use_cache: bool = Depends(use_result_cache),
+):
+    payload = req.model_dump()
+    log_request("POST /create_user", req.action, payload)
     
     try:
-        result = run_test(req.action, req.model_dump())
+        job = submit_test(req.action, payload, priority=priority, use_cache=use_cache)
+        if background:
+            return job_accepted(job)
         
-        # Check if the test was successful
-        if result.get("status") == "success":
-            return {
-                "status": "success",
-                "message": "Test executed successfully",
-                "test_result": result,
-                "timestamp": datetime.now().isoformat()
-            }
-        else:
-            return {
-                "status": "error",
-                "message": "Test execution failed",
-                "test_result": result,
-                "timestamp": datetime.now().isoformat()
-            }
+        await asyncio.wrap_future(job.future)
+        if job.error:
+            raise RuntimeError(job.error)
+        return build_test_response(job.result)
             
+    except AdmissionRejected:
+        raise
     except Exception as e:
-        logger.error(f"Exception during test execution: {str(e)}")
+        logger.error("Exception during test execution: %s", e)
         return {
             "status": "error",
             "message": f"Exception during test execution: {str(e)}",
@@ -116,21 +248,312 @@ def create_user(req: CreateUserReq):
             "timestamp": datetime.now().isoformat()
         }
 
-# Optional: generic endpoint for any test keyword
-class GenericReq(BaseModel):
-    keyword: str
-    payload: dict
-
 @app.post("/run_test")
-def run_generic_test(req: GenericReq):
-    # Log the request details
-    logger.info("=" * 60)
-    logger.info("🚀 API REQUEST RECEIVED")
-    logger.info("=" * 60)
-    logger.info(f"📡 Endpoint: POST /run_test")
-    logger.info(f"🔑 Keyword: {req.keyword}")
-    logger.info(f"📊 Test Data: {req.payload}")
-    logger.info("-" * 60)
+async def run_generic_test(
+    req: GenericReq,
+    background: bool = False,
+    priority: Priority = "normal",
+    use_cache: bool = Depends(use_result_cache),
+):
+    payload = req.payload
+    log_request("POST /run_test", req.keyword, payload)
+    
+    job = submit_test(req.keyword, payload, priority=priority, use_cache=use_cache)
+    if background:
+        return job_accepted(job)
     
-    result = run_test(req.keyword, req.payload)
-    return {"status": "ok", "result": result}
+    await asyncio.wrap_future(job.future)
+    if job.error:
+        raise HTTPException(status_code=504 if job.status == TIMEOUT else 500, detail=job.error)
+    return {"status": "ok", "result": job.result}
+
+# ——— Streaming —————————————————————————————————————————————————————————
+
+def format_sse(event: dict) -> str:
+    """Encode a run event as a Server-Sent Events message."""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+def submit_stream(keyword: str, payload: dict, priority: str = "normal"):
+    """
+    Submit a streamed run as a job and return it with the queue its output
+    events arrive on; `None` on the queue marks the end of the run.
+
+    The job goes through admission, timeouts, metrics and run history like any
+    other run (never single-flight, each stream needs its own output).
+    """
+    events = queue.Queue()
+
+    def forward_events(keyword, payload, **options):
+        end = None
+        try:
+            for event in stream_test(keyword, payload):
+                if event["event"] == "end":
+                    end = event
+                events.put(event)
+        finally:
+            events.put(None)
+        return end
+
+    job = job_manager.submit(
+        keyword, payload, priority=priority, payload_hash=cache_key(keyword, payload), runner=forward_events
+    )
+    # A job cancelled while queued never runs forward_events
+    job.future.add_done_callback(lambda future: events.put(None))
+    return job, events
+
+def stream_events(job, events):
+    """Yield the job's events; closing the generator early (client gone) cancels the job."""
+    drained = False
+    try:
+        ended = False
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            ended = ended or event["event"] == "end"
+            yield {**event, "job_id": job.id}
+        drained = True
+        if not ended:
+            # Stopped before the test produced its end event
+            yield {"event": "end", "job_id": job.id, "status": job.status, "error": job.error}
+    finally:
+        if not drained:
+            job_manager.cancel(job.id)
+
+@app.post("/run_test/stream")
+def stream_generic_test(req: GenericReq, format: str = "sse", priority: Priority = "normal"):
+    """
+    Run a test and stream its output line by line while it executes.
+
+    `format=sse` (default) returns `text/event-stream`; `format=ndjson`
+    returns one JSON event per line. The run is a job (its id is on every
+    event), so it waits for an admission slot and is recorded in `/runs`.
+    Disconnecting stops the run.
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=422, detail=f"Unsupported stream format: {format}")
+    
+    logger.info("📡 Streaming run for keyword: %s", req.keyword)
+    events = stream_events(*submit_stream(req.keyword, req.payload, priority=priority))
+    if format == "ndjson":
+        return StreamingResponse(
+            (json.dumps(event) + "\n" for event in events),
+            media_type="application/x-ndjson"
+        )
+    return StreamingResponse(
+        (format_sse(event) for event in events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+# ——— Batches ———————————————————————————————————————————————————————————
+
+BATCH_PARALLELISM = int(os.getenv("BATCH_PARALLELISM", "4"))
+BATCH_MAX_PARALLELISM = int(os.getenv("BATCH_MAX_PARALLELISM", "16"))
+
+def run_batch_item(keyword: str, payload: dict, **options) -> dict:
+    """
+    Run one batch item as a job, under the same admission slots, single-flight,
+    timeouts, metrics and run history as a `/run_test` call.
+    """
+    job = submit_test(keyword, payload, **options)
+    job.future.result()
+    if job.error:
+        raise RuntimeError(job.error)
+    return job.result
+
+@app.post("/run_batch")
+async def run_batch(
+    request: Request,
+    parallelism: int | None = Query(None, ge=1),
+    priority: Priority = "normal",
+    use_cache: bool = Depends(use_result_cache),
+):
+    """
+    Run many `{keyword, payload}` items concurrently.
+
+    The body is either a JSON array of items, a JSON object with an `items`
+    array (and optional `parallelism`), or JSON Lines when sent with an
+    `application/x-ndjson` or `application/jsonl` content type. Each item is
+    submitted as a job, so items wait for (or are rejected by) the admission
+    slots of their run class like individual runs; `parallelism` caps how many
+    of the batch's items are submitted at once.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    
+    try:
+        body = body.decode("utf-8")
+        if "ndjson" in content_type or "jsonl" in content_type:
+            data = {"items": batch.parse_jsonl(body)}
+        else:
+            data = json.loads(body)
+            if isinstance(data, list):
+                data = {"items": data}
+        req = BatchReq.model_validate(data)
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid batch: {e}")
+    
+    items = [item.model_dump() for item in req.items]
+    if parallelism is None:
+        parallelism = req.parallelism if req.parallelism is not None else BATCH_PARALLELISM
+    parallelism = min(parallelism, BATCH_MAX_PARALLELISM)
+    
+    logger.info("📦 Batch received: %d items, parallelism %d", len(items), parallelism)
+    runner = functools.partial(run_batch_item, priority=priority, use_cache=use_cache)
+    return await asyncio.to_thread(batch.run_batch, items, runner, parallelism)
+
+# ——— Admission ——————————————————————————————————————————————————————————
+
+@app.get("/admission")
+def get_admission_stats():
+    """Slots in use, queue depth and wait times per run class (none in coordinator mode)."""
+    return governor.stats() if governor is not None else {}
+
+# ——— Metrics ——————————————————————————————————————————————————————————
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Runner metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+# ——— Keywords ——————————————————————————————————————————————————————————
+
+@app.get("/keywords")
+def list_keywords():
+    """Registered test keywords and whether their handlers are loaded yet."""
+    return {"keywords": keywords.describe()}
+
+# ——— Result cache ——————————————————————————————————————————————————————
+
+@app.get("/cache")
+def get_cache_stats():
+    """Result cache hit/miss counters and size."""
+    cache = playwright_runner.result_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.delete("/cache")
+def clear_cache():
+    """Drop every cached result."""
+    cache = playwright_runner.result_cache
+    if cache is not None:
+        cache.clear()
+    return {"status": "ok"}
+
+# ——— Jobs ——————————————————————————————————————————————————————————————
+
+@app.post("/jobs", status_code=202)
+def submit_job(
+    req: GenericReq,
+    priority: Priority = "normal",
+    use_cache: bool = Depends(use_result_cache),
+):
+    """Queue a test run and return its job id without waiting for it."""
+    logger.info("📥 Job submitted for keyword: %s", req.keyword)
+    return job_accepted(submit_test(req.keyword, req.payload, priority=priority, use_cache=use_cache))
+
+@app.get("/jobs")
+def list_jobs(status: str | None = None, limit: int = Query(50, ge=1, le=JOB_HISTORY_SIZE)):
+    """List recent jobs, newest first, optionally filtered by status."""
+    jobs = job_manager.list(status=status, limit=limit)
+    return {"jobs": [job.to_dict(include_result=False) for job in jobs], "count": len(jobs)}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Return the status and, once finished, the result of a job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a queued or running job, killing its test processes."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if job.status in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already finished: {job.status}")
+    logger.info("🛑 Cancel requested for job %s", job_id)
+    return job_manager.cancel(job_id).to_dict(include_result=False)
+
+# ——— Run history ———————————————————————————————————————————————————————
+
+@app.get("/runs")
+def list_runs(
+    keyword: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = 50,
+    offset: int = 0,
+):
+    """
+    Recorded runs, newest first, filtered by keyword, status and finish time
+    (`since`/`until` as ISO timestamps) and paginated with `limit`/`offset`.
+    """
+    if run_history is None:
+        raise HTTPException(status_code=404, detail="Run history is disabled")
+    if not 1 <= limit <= 500 or offset < 0:
+        raise HTTPException(status_code=422, detail="limit must be 1-500 and offset non-negative")
+    if status is not None and status not in RUN_STATUSES:
+        raise HTTPException(status_code=422, detail=f"status must be one of {', '.join(RUN_STATUSES)}")
+    page = run_history.query(keyword=keyword, status=status, since=since, until=until, limit=limit, offset=offset)
+    return {**page, "limit": limit, "offset": offset}
+
+@app.get("/runs/{run_id}")
+def get_run(run_id: str):
+    """A recorded run with its per-test outcomes and durations."""
+    run = run_history.get(run_id) if run_history is not None else None
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
+    return run
+
+# ——— Distributed queue ——————————————————————————————————————————————————
+
+class LeaseReq(BaseModel):
+    worker_id: str
+    run_classes: list[str] | None = None
+
+class HeartbeatReq(BaseModel):
+    worker_id: str
+
+class CompleteReq(BaseModel):
+    worker_id: str
+    result: dict | None = None
+    error: str | None = None
+
+def require_job_queue() -> SQLiteJobQueue:
+    if job_queue is None:
+        raise HTTPException(status_code=404, detail="Distributed queue is disabled (RUNNER_MODE=local)")
+    return job_queue
+
+@app.get("/queue")
+def get_queue_stats(queue: SQLiteJobQueue = Depends(require_job_queue)):
+    """Jobs per state and the lease agents must renew."""
+    return {"lease_seconds": queue.lease_seconds, "jobs": queue.stats()}
+
+@app.post("/queue/lease")
+def lease_job(req: LeaseReq, queue: SQLiteJobQueue = Depends(require_job_queue)):
+    """Lease the next queued job for a worker agent; 204 when there is none."""
+    job = queue.lease(req.worker_id, req.run_classes)
+    if job is None:
+        return Response(status_code=204)
+    return job
+
+@app.post("/queue/{job_id}/heartbeat")
+def heartbeat_job(job_id: str, req: HeartbeatReq, queue: SQLiteJobQueue = Depends(require_job_queue)):
+    """Renew a lease; 409 when the agent no longer holds it."""
+    if not queue.heartbeat(job_id, req.worker_id):
+        raise HTTPException(status_code=409, detail=f"Lease on {job_id} is not held by {req.worker_id}")
+    return {"status": "ok"}
+
+@app.post("/queue/{job_id}/complete")
+def complete_job(job_id: str, req: CompleteReq, queue: SQLiteJobQueue = Depends(require_job_queue)):
+    """Post a leased job's result; 409 when the lease was lost and the job requeued."""
+    if not queue.complete(job_id, req.worker_id, result=req.result, error=req.error):
+        raise HTTPException(status_code=409, detail=f"Lease on {job_id} is not held by {req.worker_id}")
+    distributed_runner.notify(job_id)
+    return {"status": "ok"}
@@ -0,0 +1,41 @@
+# app/models.py
+"""
+Request bodies of the test runner API.
+
+Kept apart from app.main so they can be imported (e.g. by the benchmarks)
+without the application.
+"""
+from typing import Optional
+
+from pydantic import BaseModel, EmailStr, conint
+
+# ——— Demo models —————————————————————————————————————————————————————
+
+class CreateAccountReq(BaseModel):
+    expired_at: str        # e.g. "20250819"
+    ui_test: bool = False  # Set to True to run UI tests
+    include_logs: bool = False  # Include full stdout/stderr in the result
+
+class CreateUserReq(BaseModel):
+    action: str            # e.g. "create_user"
+    ui_test: bool = False  # Set to True to run UI tests
+    include_logs: bool = False  # Include full stdout/stderr in the result
+    username: str
+    email: EmailStr
+    first_name: str
+    last_name: str
+    gender: str
+    birth: str             # YYYYMMDD
+    agreed_terms: bool
+    salary: int
+    id: str
+
+# ——— Generic endpoints for any test keyword ————————————————————————
+
+class GenericReq(BaseModel):
+    keyword: str
+    payload: dict
+
+class BatchReq(BaseModel):
+    items: list[GenericReq]
+    parallelism: Optional[conint(ge=1)] = None  # Items submitted at once
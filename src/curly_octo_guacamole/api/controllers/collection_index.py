@@ -0,0 +1,186 @@
+"""
+Index of the API test suite, mapping test types to pytest nodeids.
+
+The Controller used to run a test type as ``<file> -k <test name>``, which
+makes pytest collect every test of the module before filtering by name. The
+index instead resolves each test type to exact nodeids
+(``tests/api/test_user.py::TestUserAPI::test_create_user``) so pytest only
+collects what it runs.
+
+The index is built by parsing the test files (no imports, so it is cheap and
+safe at API startup) and kept current by re-parsing a file only when its
+mtime or size changes; files are checked at most every
+``COLLECTION_INDEX_REFRESH_SECONDS`` seconds.
+
+A test type resolves to the same tests ``-k`` selected: every test of its
+module (``test_<test type>.py``) whose name starts with the prefix in
+``TEST_TYPE_TESTS``, by convention ``test_create_<test type>``. For ``user``
+that is ``test_create_user`` together with ``test_create_user_variations``,
+``test_create_user_duplicate_email`` and the other ``test_create_user_*``
+tests. New entity tests are picked up without code changes.
+
+Configuration (environment variables):
+    COLLECTION_INDEX_REFRESH_SECONDS  minimum seconds between file checks (default 1)
+"""
+import ast
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Project root (go up from src/curly_octo_guacamole/api/controllers/)
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
+
+# Test type -> prefix of its test function names, where it differs from the convention
+TEST_TYPE_TESTS: Dict[str, str] = {
+    "account": "test_create_account",
+    "user": "test_create_user",
+}
+
+
+def resolve_test_name(test_type: str) -> str:
+    """Name prefix of the test functions that run ``test_type``."""
+    return TEST_TYPE_TESTS.get(test_type, f"test_create_{test_type}")
+
+
+def resolve_test_module(test_type: str) -> str:
+    """File name of the test module that holds the tests of ``test_type``."""
+    return f"test_{test_type}.py"
+
+
+def collect_nodeids(path: Path, relative_to: Path) -> List[Tuple[str, str]]:
+    """
+    Statically collect (test name, nodeid) pairs from a test module.
+
+    Follows pytest's default discovery: ``test*`` functions at module level
+    and in ``Test*`` classes without an ``__init__``.
+    """
+    tree = ast.parse(path.read_text(), filename=str(path))
+    prefix = path.relative_to(relative_to).as_posix()
+    tests = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            tests.append((node.name, f"{prefix}::{node.name}"))
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            methods = [
+                item for item in node.body if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            if any(method.name == "__init__" for method in methods):
+                continue
+            for method in methods:
+                if method.name.startswith("test"):
+                    tests.append((method.name, f"{prefix}::{node.name}::{method.name}"))
+    return tests
+
+
+class CollectionIndex:
+    """Test name -> nodeids for the test modules under ``test_dir``."""
+
+    def __init__(
+        self,
+        test_dir: Optional[Path] = None,
+        project_root: Path = PROJECT_ROOT,
+        pattern: str = "test_*.py",
+        refresh_interval: float = 1.0,
+    ):
+        self.project_root = Path(project_root)
+        self.test_dir = Path(test_dir) if test_dir else self.project_root / "tests" / "api"
+        self.pattern = pattern
+        self.refresh_interval = refresh_interval
+        # path -> ((mtime_ns, size), [(name, nodeid), ...])
+        self._files: Dict[Path, Tuple[Tuple[int, int], List[Tuple[str, str]]]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Re-parse test files that changed since the last check.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked and now - self._checked < self.refresh_interval:
+                return False
+            self._checked = now
+            changed = False
+            seen = set()
+            for path in sorted(self.test_dir.glob(self.pattern)):
+                seen.add(path)
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                cached = self._files.get(path)
+                if cached is not None and cached[0] == signature:
+                    continue
+                try:
+                    tests = collect_nodeids(path, self.project_root)
+                except (OSError, SyntaxError) as e:
+                    logger.warning("Could not index %s: %s", path, e)
+                    tests = []
+                self._files[path] = (signature, tests)
+                changed = True
+            for path in set(self._files) - seen:
+                del self._files[path]
+                changed = True
+            if changed:
+                by_name: Dict[str, List[str]] = {}
+                for _, tests in self._files.values():
+                    for name, nodeid in tests:
+                        by_name.setdefault(name, []).append(nodeid)
+                self._by_name = by_name
+                logger.info("Indexed %d tests in %d files under %s",
+                            sum(len(ids) for ids in by_name.values()), len(self._files), self.test_dir)
+            return changed
+
+    def nodeids(self, test_name: str) -> List[str]:
+        """Nodeids of the tests named ``test_name`` (relative to the project root)."""
+        self.refresh()
+        return list(self._by_name.get(test_name, ()))
+
+    def resolve(self, test_type: str) -> List[str]:
+        """
+        Nodeids to run for ``test_type``: the tests of its module whose name
+        starts with its prefix, in file order.
+
+        Raises:
+            LookupError: If no test implements the test type.
+        """
+        test_name = resolve_test_name(test_type)
+        module = self.test_dir / resolve_test_module(test_type)
+        self.refresh()
+        with self._lock:
+            tests = self._files.get(module, (None, []))[1]
+        nodeids = [nodeid for name, nodeid in tests if name.startswith(test_name)]
+        if not nodeids:
+            raise LookupError(f"No test '{test_name}*' found for test type '{test_type}' in {module}")
+        return nodeids
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Test name -> nodeids, for diagnostics."""
+        self.refresh()
+        return {name: list(nodeids) for name, nodeids in sorted(self._by_name.items())}
+
+
+_index: Optional[CollectionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_collection_index() -> CollectionIndex:
+    """Return the shared index of the API tests, building it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CollectionIndex(
+                refresh_interval=float(os.getenv("COLLECTION_INDEX_REFRESH_SECONDS", "1")),
+            )
+            _index.refresh(force=True)
+        return _index
@@ -1,17 +1,32 @@
+import contextlib
+import json
 import logging
 import subprocess
 import sys
 import os
+import tempfile
+import threading
+import time
+import uuid
 from pathlib import Path
+from typing import Iterator, Optional
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
+from curly_octo_guacamole.api.controllers.worker_pool import get_worker_pool
+from curly_octo_guacamole.api.controllers.collection_index import get_collection_index
+from curly_octo_guacamole.api.controllers.result_plugin import RESULT_FILE_ENV
+from curly_octo_guacamole.api.controllers.payload_channel import PAYLOAD_FILE_ENV, payload_file
+from curly_octo_guacamole.api.runner.cancellation import (
+    POLL_INTERVAL, RunCancelled, current_run, kill_process_group,
 )
+
 logger = logging.getLogger(__name__)
 
+# Command used to launch pytest in a subprocess (when not using the worker pool)
+PYTEST_COMMAND = os.getenv("PYTEST_COMMAND", "pdm run pytest").split()
+
+# Pytest plugin writing the structured per-test summary
+RESULT_PLUGIN = "curly_octo_guacamole.api.controllers.result_plugin"
+
 class Controller:
     def __init__(self):
         pass
@@ -26,95 +41,308 @@ class Controller:
         else:
             raise ValueError(f"Invalid test type: {test_type}")
 
+    def stream_test(self, test_type: str, data: dict) -> Iterator[dict]:
+        """Streaming counterpart of run_test: yield run events as they happen."""
+        if test_type == "ui":
+            logger.info("Executing UI Test")
+            yield {"event": "end", **self.run_ui_test(data)}
+        elif test_type == "api":
+            logger.info("Streaming API Test")
+            yield from self.stream_api_test(data)
+        else:
+            raise ValueError(f"Invalid test type: {test_type}")
+
     def run_api_test(self, data: dict) -> dict:
         """
         Execute API tests using PyTest while maintaining compatibility.
         This method runs the appropriate test file based on the test type.
+        
+        The response carries a structured `summary` (per-test outcome, duration,
+        nodeid and failure excerpt). Full stdout/stderr are only included when
+        `data["include_logs"]` is true or no summary could be produced.
         """
         logger.info("Executing API Test")
         
         try:
-            # Get the project root directory (go up from src/curly_octo_guacamole/api/controllers/)
-            project_root = Path(__file__).parent.parent.parent.parent.parent
-            
-            # Determine which test file to run based on the test type
+            pytest_args, test_env, project_root = self._prepare_api_test(data)
             test_type = data.get("test_type", "account")
-            if test_type == "user":
-                test_file_path = project_root / "tests" / "api" / "test_user.py"
-                test_method = "test_create_user"
-            else:  # default to account
-                test_file_path = project_root / "tests" / "api" / "test_account.py"
-                test_method = "test_create_account"
-            
-            if not test_file_path.exists():
-                raise FileNotFoundError(f"Test file not found: {test_file_path}")
-            
-            # Set environment variables for the test data
-            env = os.environ.copy()
-            env['TEST_DATA'] = str(data)
-            
-            # Run the specific test using PyTest
-            cmd = [
-                "pdm", "run", "pytest",
-                str(test_file_path),
-                "-k", test_method,  # Run only the specific test method
-                "-v",  # Verbose output
-                "--tb=short",  # Short traceback
-                "--capture=no"  # Show print statements
-            ]
-            
-            logger.info(f"Executing command: {' '.join(cmd)}")
-            logger.info(f"Test data: {data}")
-            logger.info(f"Test file: {test_file_path}")
-            logger.info(f"Test method: {test_method}")
             
             # Run the test
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                env=env,
-                cwd=project_root
-            )
+            with self._result_file() as result_path, payload_file(test_type, data) as payload_path:
+                test_env[RESULT_FILE_ENV] = result_path
+                test_env[PAYLOAD_FILE_ENV] = payload_path
+                result = self._execute_pytest(pytest_args, test_env, project_root)
+                summary = self._read_summary(result_path)
             
             # Parse the result
-            success = result.returncode == 0
+            success = result['returncode'] == 0
+            include_logs = data.get("include_logs", False) or summary is None
             
             if success:
                 logger.info("✅ API test executed successfully")
-                return {
+                response = {
                     "status": "success",
                     "message": "API test executed successfully",
-                    "stdout": result.stdout,
-                    "stderr": result.stderr,
-                    "returncode": result.returncode
+                    "returncode": result['returncode'],
+                    "summary": summary,
+                    "timings": result.get('timings')
                 }
             else:
-                logger.error(f"❌ API test failed with return code: {result.returncode}")
-                logger.error(f"STDOUT: {result.stdout}")
-                logger.error(f"STDERR: {result.stderr}")
-                return {
+                logger.error("❌ API test failed with return code: %s", result['returncode'])
+                if summary is None:
+                    logger.error("STDOUT: %s", result['stdout'])
+                    logger.error("STDERR: %s", result['stderr'])
+                else:
+                    for test in summary["tests"]:
+                        if test["outcome"] in ("failed", "error"):
+                            logger.error("%s %s: %s", test['nodeid'], test['outcome'], test.get('excerpt', ''))
+                response = {
                     "status": "error",
                     "message": "API test failed",
-                    "stdout": result.stdout,
-                    "stderr": result.stderr,
-                    "returncode": result.returncode
+                    "returncode": result['returncode'],
+                    "summary": summary,
+                    "timings": result.get('timings')
                 }
+            
+            if include_logs:
+                response["stdout"] = result['stdout']
+                response["stderr"] = result['stderr']
+            return response
                 
+        except RunCancelled:
+            raise
         except Exception as e:
-            logger.error(f"Exception during API test execution: {str(e)}")
+            logger.error("Exception during API test execution: %s", e)
             return {
                 "status": "error",
                 "message": f"Exception during test execution: {str(e)}",
                 "error": str(e)
             }
     
+    def _prepare_api_test(self, data: dict) -> tuple:
+        """
+        Resolve the nodeids to run for the test type in `data`.
+        
+        Nodeids come from the collection index, so pytest only collects the
+        selected tests. The test data itself is passed through a payload file
+        (see `payload_channel`), not the environment.
+        
+        Returns:
+            tuple: (pytest_args, test_env, project_root)
+        """
+        index = get_collection_index()
+        test_type = data.get("test_type", "account")
+        nodeids = index.resolve(test_type)
+        
+        # Extra environment for the run; the payload file path is added by the caller
+        test_env = {}
+        
+        # Run exactly the indexed tests using PyTest
+        pytest_args = nodeids + [
+            "-v",  # Verbose output
+            "--tb=short",  # Short traceback
+            "--capture=no",  # Show print statements
+            "-p", RESULT_PLUGIN  # Structured per-test summary
+        ]
+        
+        logger.info("Test data: %s", data)
+        logger.info("Tests: %s", " ".join(nodeids))
+        
+        return pytest_args, test_env, index.project_root
+    
+    def stream_api_test(self, data: dict) -> Iterator[dict]:
+        """
+        Execute an API test in a subprocess and yield its output as it is produced.
+        
+        Yields a `start` event, one `line` event per line of combined
+        stdout/stderr, and a final `end` event with the status and return code.
+        Output is never accumulated, so memory stays flat however verbose the
+        test is. Closing the generator early kills the subprocess.
+
+        When the current run times out or is cancelled, a watcher thread kills
+        the pytest process group (including any browsers), even while the test
+        prints nothing, and the `end` event reports `timeout` or `cancelled`.
+        """
+        run_id = uuid.uuid4().hex
+        run = current_run()
+        try:
+            pytest_args, test_env, project_root = self._prepare_api_test(data)
+        except Exception as e:
+            logger.error("Exception during API test preparation: %s", e)
+            yield {"event": "end", "run_id": run_id, "status": "error", "error": str(e)}
+            return
+        
+        cmd = PYTEST_COMMAND + pytest_args
+        logger.info("Streaming command: %s", " ".join(cmd))
+        
+        with contextlib.ExitStack() as files:
+            try:
+                payload_path = files.enter_context(payload_file(data.get("test_type", "account"), data))
+            except Exception as e:
+                logger.error("Invalid test data: %s", e)
+                yield {"event": "end", "run_id": run_id, "status": "error", "error": str(e)}
+                return
+            result_path = files.enter_context(self._result_file())
+            test_env[RESULT_FILE_ENV] = result_path
+            test_env[PAYLOAD_FILE_ENV] = payload_path
+            env = os.environ.copy()
+            env.update(test_env)
+            env["PYTHONUNBUFFERED"] = "1"
+            try:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    bufsize=1,
+                    env=env,
+                    cwd=project_root,
+                    start_new_session=True
+                )
+            except OSError as e:
+                logger.error("Could not start streaming run: %s", e)
+                yield {"event": "end", "run_id": run_id, "status": "error", "error": str(e)}
+                return
+            stopped = []
+            if run is not None:
+                threading.Thread(
+                    target=self._watch_run, args=(run, process, stopped), name=f"stream-{run_id}", daemon=True
+                ).start()
+            try:
+                yield {"event": "start", "run_id": run_id, "pid": process.pid}
+                for line in process.stdout:
+                    yield {"event": "line", "run_id": run_id, "line": line.rstrip("\n")}
+                returncode = process.wait()
+                if stopped:
+                    yield {
+                        "event": "end",
+                        "run_id": run_id,
+                        "status": stopped[0],
+                        "returncode": returncode,
+                        "error": str(RunCancelled(stopped[0]))
+                    }
+                    return
+                yield {
+                    "event": "end",
+                    "run_id": run_id,
+                    "status": "success" if returncode == 0 else "error",
+                    "returncode": returncode,
+                    "summary": self._read_summary(result_path)
+                }
+            finally:
+                if process.poll() is None:
+                    logger.warning("Stream for run %s closed early, killing process group %s", run_id, process.pid)
+                    kill_process_group(process.pid)
+                    process.wait()
+                process.stdout.close()
+    
+    def _watch_run(self, run, process: subprocess.Popen, stopped: list) -> None:
+        """Kill `process`'s group once `run` is stopped, recording the reason in `stopped`."""
+        while process.poll() is None:
+            reason = run.wait()
+            if reason is not None and process.poll() is None:
+                logger.warning("Killing streaming pytest process group %s: run %s", process.pid, reason)
+                stopped.append(reason)
+                kill_process_group(process.pid)
+                return
+    
+    @contextlib.contextmanager
+    def _result_file(self) -> Iterator[str]:
+        """Temporary file path the result plugin writes its summary to."""
+        fd, path = tempfile.mkstemp(prefix="pytest-result-", suffix=".json")
+        os.close(fd)
+        try:
+            yield path
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+    
+    def _read_summary(self, path: str) -> Optional[dict]:
+        """Load the plugin's summary, or None if the run didn't produce one."""
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+    
+    def _execute_pytest(self, pytest_args: list, test_env: dict, project_root: Path) -> dict:
+        """
+        Run pytest on a warm pool worker, falling back to a `pdm run pytest`
+        subprocess when the pool is disabled (PYTEST_WORKER_POOL_SIZE=0).
+
+        The result carries `timings`: `spawn_s` (subprocess start, or waiting
+        for an idle pool worker) and `execution_s` (pytest itself).
+
+        When the current run times out or is cancelled, the pytest process
+        group (including any browsers) is killed and RunCancelled is raised.
+        """
+        start = time.perf_counter()
+        pool = get_worker_pool()
+        if pool is not None:
+            logger.info("Executing on pytest worker pool: pytest %s", " ".join(pytest_args))
+            result = pool.run(pytest_args, test_env)
+            spawn = result.pop("wait_s", 0.0)
+            result["timings"] = {
+                "spawn_s": round(spawn, 4),
+                "execution_s": round(time.perf_counter() - start - spawn, 4),
+            }
+            return result
+        
+        cmd = PYTEST_COMMAND + pytest_args
+        logger.info("Executing command: %s", " ".join(cmd))
+        
+        env = os.environ.copy()
+        env.update(test_env)
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env,
+            cwd=project_root,
+            start_new_session=True
+        )
+        spawned = time.perf_counter()
+        stdout, stderr = self._communicate(process)
+        return {
+            "returncode": process.returncode,
+            "stdout": stdout,
+            "stderr": stderr,
+            "timings": {
+                "spawn_s": round(spawned - start, 4),
+                "execution_s": round(time.perf_counter() - spawned, 4),
+            },
+        }
+    
+    def _communicate(self, process: subprocess.Popen) -> tuple:
+        """Wait for `process`, killing its process group if the current run is stopped."""
+        run = current_run()
+        if run is None:
+            return process.communicate()
+        while True:
+            try:
+                return process.communicate(timeout=POLL_INTERVAL)
+            except subprocess.TimeoutExpired:
+                reason = run.reason
+                if reason is not None:
+                    logger.warning("Killing pytest process group %s: run %s", process.pid, reason)
+                    kill_process_group(process.pid)
+                    process.communicate()
+                    raise RunCancelled(reason)
+    
     def run_ui_test(self, data: dict) -> dict:
         logger.info("Executing UI Test")
         return {"status": "success", "message": "UI test executed successfully"}    
 
 # Example usage
 if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    
     # Create an instance of the Controller
     controller = Controller()
     
@@ -0,0 +1,146 @@
+"""
+Typed hand-off of test data from the Controller to the pytest run.
+
+The Controller validates a run's data against the schema of its test type and
+writes it as JSON to a temporary file whose path is passed in the
+``PYTEST_PAYLOAD_FILE`` environment variable; the test reads it back with
+``read_payload`` and validates it again. Only the path travels through the
+environment, so payload size is bounded by disk rather than by the
+environment block, and a payload that does not match its schema fails the run
+instead of being replaced by defaults. Data-driven runs can pass any number
+of ``records`` alongside the single-entity fields; each record is validated
+like those fields.
+"""
+import contextlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+# Environment variable naming the JSON file the payload is read from
+PAYLOAD_FILE_ENV = "PYTEST_PAYLOAD_FILE"
+
+# Bumped when the envelope changes incompatibly
+PAYLOAD_VERSION = 1
+
+# Routing/reporting options of the request, not test data
+CONTROL_KEYS = ("test_type", "ui_test", "include_logs")
+
+
+class PayloadError(ValueError):
+    """The payload is missing, unreadable or does not match its schema."""
+
+
+class AccountRecord(BaseModel):
+    """One account's test data."""
+    model_config = ConfigDict(extra="allow")
+
+    expired_at: Optional[str] = None  # YYYYMMDD
+
+
+class AccountPayload(AccountRecord):
+    """Test data for the account tests."""
+    records: List[AccountRecord] = []
+
+
+class UserRecord(BaseModel):
+    """One user's test data."""
+    model_config = ConfigDict(extra="allow")
+
+    username: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    gender: Optional[str] = None
+    birth: Optional[str] = None  # YYYYMMDD
+    agreed_terms: Optional[bool] = None
+    salary: Optional[int] = None
+    is_account_owner: Optional[bool] = None
+    net_worth: Optional[int] = None
+    account_id: Optional[str] = None
+
+
+class UserPayload(UserRecord):
+    """Test data for the user tests."""
+    records: List[UserRecord] = []
+
+
+# test type -> schema of its payload
+PAYLOAD_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "account": AccountPayload,
+    "user": UserPayload,
+}
+
+
+def validate_payload(test_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate ``data`` against the schema of ``test_type``.
+
+    Returns:
+        dict: The validated data, without fields that were not set.
+
+    Raises:
+        PayloadError: If the test type is unknown or the data does not match.
+    """
+    schema = PAYLOAD_SCHEMAS.get(test_type)
+    if schema is None:
+        raise PayloadError(f"No payload schema for test type '{test_type}'")
+    try:
+        return schema.model_validate(data).model_dump(exclude_unset=True)
+    except ValidationError as e:
+        raise PayloadError(f"Invalid {test_type} payload: {e}") from e
+
+
+def write_payload(path: str, test_type: str, data: Dict[str, Any]) -> None:
+    """Validate ``data`` and write it with its envelope to ``path``."""
+    test_data = {key: value for key, value in data.items() if key not in CONTROL_KEYS}
+    envelope = {
+        "version": PAYLOAD_VERSION,
+        "test_type": test_type,
+        "data": validate_payload(test_type, test_data),
+    }
+    with open(path, "w") as file:
+        json.dump(envelope, file, default=str)
+
+
+@contextlib.contextmanager
+def payload_file(test_type: str, data: Dict[str, Any]) -> Iterator[str]:
+    """Temporary payload file for one run, removed afterwards."""
+    fd, path = tempfile.mkstemp(prefix="pytest-payload-", suffix=".json")
+    os.close(fd)
+    try:
+        write_payload(path, test_type, data)
+        yield path
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+
+def read_payload(test_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the payload the Controller passed to this run.
+
+    Returns:
+        dict: The validated test data, or None when the test is not running
+        through the Controller (``PYTEST_PAYLOAD_FILE`` unset).
+
+    Raises:
+        PayloadError: If the file is unreadable, was written for another test
+            type or version, or does not match the schema.
+    """
+    path = os.environ.get(PAYLOAD_FILE_ENV)
+    if not path:
+        return None
+    try:
+        with open(path) as file:
+            envelope = json.load(file)
+    except (OSError, ValueError) as e:
+        raise PayloadError(f"Could not read payload file {path}: {e}") from e
+    if envelope.get("version") != PAYLOAD_VERSION:
+        raise PayloadError(f"Unsupported payload version: {envelope.get('version')}")
+    if envelope.get("test_type") != test_type:
+        raise PayloadError(f"Payload is for test type '{envelope.get('test_type')}', expected '{test_type}'")
+    return validate_payload(test_type, envelope.get("data") or {})
@@ -0,0 +1,70 @@
+"""
+Pytest plugin that records a compact, structured summary of a test run.
+
+Loaded by the Controller with ``-p curly_octo_guacamole.api.controllers.result_plugin``.
+When the ``PYTEST_RESULT_FILE`` environment variable is set, the plugin writes
+per-test outcome, duration, nodeid and a failure excerpt as JSON to that file
+at the end of the session, so callers don't have to parse pytest's stdout.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+# Environment variable naming the JSON file the summary is written to
+RESULT_FILE_ENV = "PYTEST_RESULT_FILE"
+
+# Maximum characters kept from a failure's traceback
+EXCERPT_LIMIT = int(os.getenv("PYTEST_RESULT_EXCERPT_LIMIT", "2000"))
+
+
+def failure_excerpt(text: str, limit: int = EXCERPT_LIMIT) -> str:
+    """Keep the tail of a traceback, where the assertion message is."""
+    if len(text) <= limit:
+        return text
+    return "..." + text[-limit:]
+
+
+class ResultCollector:
+    """Collects test reports and writes the summary file on session finish."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.time()
+        self.tests: Dict[str, Dict[str, Any]] = {}
+
+    def _record(self, report, outcome: str) -> None:
+        entry = self.tests.setdefault(report.nodeid, {"nodeid": report.nodeid, "duration": 0.0})
+        entry["outcome"] = outcome
+        entry["duration"] = round(entry["duration"] + report.duration, 4)
+        if report.failed or report.skipped:
+            entry["excerpt"] = failure_excerpt(report.longreprtext)
+
+    def pytest_runtest_logreport(self, report) -> None:
+        if report.when == "call":
+            self._record(report, report.outcome)
+        elif report.failed:
+            # Failures in setup/teardown are errors, not test failures
+            self._record(report, "error")
+        elif report.skipped:
+            self._record(report, "skipped")
+
+    def pytest_sessionfinish(self, session, exitstatus) -> None:
+        tests: List[Dict[str, Any]] = list(self.tests.values())
+        counts: Dict[str, int] = {}
+        for test in tests:
+            counts[test["outcome"]] = counts.get(test["outcome"], 0) + 1
+        summary = {
+            "exitstatus": int(exitstatus),
+            "duration": round(time.time() - self.started, 4),
+            "counts": counts,
+            "tests": tests,
+        }
+        with open(self.path, "w") as file:
+            json.dump(summary, file)
+
+
+def pytest_configure(config) -> None:
+    path = os.environ.get(RESULT_FILE_ENV)
+    if path:
+        config.pluginmanager.register(ResultCollector(path), "result_collector")
@@ -0,0 +1,271 @@
+"""
+Warm pool of pytest worker processes for the API test Controller.
+
+Spawning ``pdm run pytest`` for every request pays for pdm resolution,
+interpreter startup, importing playwright/pymongo and test collection.
+The workers in this pool import the test modules once and then execute
+selected tests in-process through ``pytest.main``. A worker is recycled
+after a configurable number of runs so leaked state cannot accumulate.
+Each worker leads its own process group, so a run that times out or is
+cancelled is stopped by killing the worker together with any browsers it
+started; a fresh worker takes its place. Workers also watch a lifeline pipe to
+the service and kill their process group when it closes, so a service that
+dies mid-run leaves no orphaned workers or browsers behind.
+
+Configuration (environment variables):
+    PYTEST_WORKER_POOL_SIZE  number of workers, 0 disables the pool (default 2)
+    PYTEST_WORKER_MAX_RUNS   runs before a worker is recycled (default 50)
+"""
+import atexit
+import contextlib
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from curly_octo_guacamole.api.runner.cancellation import (
+    POLL_INTERVAL, RunCancelled, RunContext, current_run, kill_process_group,
+)
+
+logger = logging.getLogger(__name__)
+
+# Project root (go up from src/curly_octo_guacamole/api/controllers/)
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
+
+# Test modules imported by every worker before it accepts work
+DEFAULT_WARM_MODULES = ("tests.api.test_account", "tests.api.test_user")
+
+
+def _watch_parent(lifeline) -> None:
+    """Kill this worker's process group once the parent closes the lifeline (or dies)."""
+    try:
+        lifeline.recv()
+    except (EOFError, OSError):
+        pass
+    if hasattr(os, "killpg"):
+        os.killpg(os.getpgrp(), signal.SIGKILL)
+    os._exit(1)
+
+
+def _worker_main(conn, lifeline, project_root: str, warm_modules: List[str]) -> None:
+    """Entry point of a worker process: warm up, then serve pytest runs."""
+    if hasattr(os, "setsid"):
+        # Lead a process group so the worker and its browsers can be killed together
+        os.setsid()
+    # The lifeline is never written to: EOF means the parent is gone, even mid-run
+    threading.Thread(target=_watch_parent, args=(lifeline,), name="parent-watch", daemon=True).start()
+    os.chdir(project_root)
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+    import pytest
+
+    for module_name in warm_modules:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            print(f"⚠️  Could not pre-import {module_name}: {e}", file=sys.stderr)
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        args, env = job
+        saved_env = os.environ.copy()
+        os.environ.update(env)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                returncode = int(pytest.main(list(args)))
+        except BaseException as e:
+            returncode = -1
+            stderr.write(f"Exception in pytest worker: {e}\n")
+        finally:
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+        conn.send({
+            "returncode": returncode,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "pid": os.getpid(),
+        })
+
+
+class _Worker:
+    """Handle on a single worker process and its pipe."""
+
+    def __init__(self, process, conn, lifeline):
+        self.process = process
+        self.conn = conn
+        self.lifeline = lifeline
+        self.runs = 0
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+            return
+        self.conn.close()
+        self.lifeline.close()
+
+    def kill(self) -> None:
+        """Kill the worker and everything it started, without waiting for the run."""
+        kill_process_group(self.process.pid)
+        self.process.join(5)
+        self.conn.close()
+        self.lifeline.close()
+
+
+class PytestWorkerPool:
+    """Pool of long-lived processes that run pytest in-process."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_runs: int = 50,
+        warm_modules: Iterable[str] = DEFAULT_WARM_MODULES,
+        project_root: Path = PROJECT_ROOT,
+    ):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        self.size = size
+        self.max_runs = max_runs
+        self.warm_modules = list(warm_modules)
+        self.project_root = str(project_root)
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        lifeline_reader, lifeline = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, lifeline_reader, self.project_root, self.warm_modules),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        lifeline_reader.close()
+        logger.info("Started pytest worker pid=%s", process.pid)
+        return _Worker(process, parent_conn, lifeline)
+
+    def run(self, args: List[str], env: Optional[Dict[str, str]] = None) -> dict:
+        """
+        Run pytest with ``args`` on an idle worker.
+
+        Args:
+            args: Command line arguments passed to ``pytest.main``.
+            env: Environment variables set for the duration of the run.
+
+        Returns:
+            dict: ``returncode``, ``stdout``, ``stderr``, the worker ``pid`` and
+            ``wait_s`` spent waiting for an idle worker.
+
+        Raises:
+            RunCancelled: If the current run timed out or was cancelled; the
+                worker running it is killed and replaced.
+        """
+        if self._closed:
+            raise RuntimeError("Pytest worker pool is closed")
+
+        run = current_run()
+        waiting = time.perf_counter()
+        worker = self._acquire(run)
+        wait_s = time.perf_counter() - waiting
+        try:
+            worker.conn.send((list(args), dict(env or {})))
+            while run is not None and not worker.conn.poll(POLL_INTERVAL):
+                reason = run.reason
+                if reason is not None:
+                    logger.warning("Killing pytest worker pid=%s: run %s", worker.process.pid, reason)
+                    worker.kill()
+                    if not self._closed:
+                        self._idle.put(self._spawn())
+                    raise RunCancelled(reason)
+            result = worker.conn.recv()
+            result["wait_s"] = wait_s
+        except (EOFError, OSError) as e:
+            logger.error("Pytest worker pid=%s died: %s", worker.process.pid, e)
+            worker.stop(timeout=0)
+            self._idle.put(self._spawn())
+            raise RuntimeError(f"Pytest worker died during run: {e}")
+
+        worker.runs += 1
+        if self._closed:
+            worker.stop()
+            return result
+        if worker.runs >= self.max_runs:
+            logger.info("Recycling pytest worker pid=%s after %d runs", worker.process.pid, worker.runs)
+            worker.stop()
+            worker = self._spawn()
+        self._idle.put(worker)
+        return result
+
+    def _acquire(self, run: Optional[RunContext]) -> _Worker:
+        """Take an idle worker, giving up if the run is stopped while waiting."""
+        if run is None:
+            return self._idle.get()
+        while True:
+            run.check()
+            try:
+                return self._idle.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+    def close(self) -> None:
+        """Stop all workers. Workers busy with a run are stopped once returned."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+
+_pool: Optional[PytestWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> Optional[PytestWorkerPool]:
+    """Return the shared worker pool, or None when disabled by configuration."""
+    global _pool
+    size = int(os.getenv("PYTEST_WORKER_POOL_SIZE", "2"))
+    if size <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            max_runs = int(os.getenv("PYTEST_WORKER_MAX_RUNS", "50"))
+            _pool = PytestWorkerPool(size=size, max_runs=max_runs)
+            atexit.register(_pool.close)
+        return _pool
+
+
+def close_worker_pool() -> None:
+    """Stop the shared worker pool, if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            atexit.unregister(_pool.close)
+            _pool = None
@@ -0,0 +1 @@
+# Runner service package: job execution infrastructure for the test runner API
@@ -0,0 +1,203 @@
+"""
+Admission control and priority scheduling for test runs.
+
+Each class of run (e.g. ``ui`` browser runs and ``api`` pytest runs) has its
+own number of concurrent slots and a bounded waiting queue, so fast API runs
+never queue behind slow UI runs. Work submitted while all slots of its class
+are busy waits in the class queue; once the queue is full, further work is
+rejected with a suggested retry delay, so the service degrades predictably
+under load instead of spawning browsers until the box runs out of memory.
+
+Waiting work is started in priority order (``high``, ``normal``, ``low``).
+Aging promotes waiting work by one priority level for every
+``SCHEDULER_AGING_SECONDS`` it has waited, so low priority work is never
+starved; within the same effective priority, work starts first come first
+served.
+
+Configuration (environment variables):
+    ADMISSION_UI_SLOTS       concurrent UI runs (default 2)
+    ADMISSION_API_SLOTS      concurrent API runs (default 4)
+    ADMISSION_UI_QUEUE       UI runs allowed to wait for a slot (default 10)
+    ADMISSION_API_QUEUE      API runs allowed to wait for a slot (default 50)
+    SCHEDULER_AGING_SECONDS  wait that promotes work by one level (default 30)
+"""
+import itertools
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+# Retry-After suggested before any run time has been observed
+DEFAULT_RETRY_AFTER = 5
+
+# Priority classes, lower value starts first
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY = "normal"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a class's slots and waiting queue are both full."""
+
+    def __init__(self, run_class: str, retry_after: int):
+        super().__init__(f"Too many '{run_class}' runs in progress, retry after {retry_after}s")
+        self.run_class = run_class
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Pending:
+    priority: int
+    enqueued_at: float
+    sequence: int
+    start: Callable[[float], None]
+
+
+@dataclass
+class _ClassState:
+    limit: int
+    max_queue: int
+    in_use: int = 0
+    pending: List[_Pending] = field(default_factory=list)
+    admitted: int = 0
+    rejected: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+    avg_run_s: float = 0.0
+
+
+class ConcurrencyGovernor:
+    """Per-class concurrency slots with bounded, priority-ordered waiting queues."""
+
+    def __init__(self, limits: Dict[str, int], max_queue: Dict[str, int], aging_seconds: float = 30.0):
+        """
+        Args:
+            limits: Concurrent slots per run class.
+            max_queue: Maximum waiting runs per run class.
+            aging_seconds: Waiting time that promotes work by one priority level
+                (0 disables aging).
+        """
+        self._classes = {
+            name: _ClassState(limit=limit, max_queue=max_queue.get(name, 0))
+            for name, limit in limits.items()
+        }
+        self.aging_seconds = aging_seconds
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ConcurrencyGovernor":
+        return cls(
+            limits={
+                "ui": int(os.getenv("ADMISSION_UI_SLOTS", "2")),
+                "api": int(os.getenv("ADMISSION_API_SLOTS", "4")),
+            },
+            max_queue={
+                "ui": int(os.getenv("ADMISSION_UI_QUEUE", "10")),
+                "api": int(os.getenv("ADMISSION_API_QUEUE", "50")),
+            },
+            aging_seconds=float(os.getenv("SCHEDULER_AGING_SECONDS", "30")),
+        )
+
+    @property
+    def run_classes(self) -> List[str]:
+        return list(self._classes)
+
+    def slots(self, run_class: str) -> int:
+        return self._classes[run_class].limit
+
+    @property
+    def total_slots(self) -> int:
+        return sum(state.limit for state in self._classes.values())
+
+    def submit(self, run_class: str, start: Callable[[float], None], priority: str = DEFAULT_PRIORITY) -> bool:
+        """
+        Start work now if a slot is free, otherwise queue it at ``priority``.
+
+        ``start`` is called with the seconds spent waiting once the work holds a
+        slot; it must hand the work off quickly (e.g. to an executor) and the
+        work must call ``release`` when done.
+
+        Returns:
+            bool: True if started immediately, False if queued.
+
+        Raises:
+            AdmissionRejected: If the class's queue is full.
+            KeyError: If ``run_class`` is unknown.
+            ValueError: If ``priority`` is not one of PRIORITIES.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Invalid priority '{priority}', expected one of {list(PRIORITIES)}")
+        state = self._classes[run_class]
+        with self._lock:
+            if state.in_use < state.limit:
+                state.in_use += 1
+                state.admitted += 1
+                run_now = True
+            elif len(state.pending) < state.max_queue:
+                state.pending.append(
+                    _Pending(PRIORITIES[priority], time.monotonic(), next(self._sequence), start)
+                )
+                run_now = False
+            else:
+                state.rejected += 1
+                raise AdmissionRejected(run_class, self._retry_after(state))
+        if run_now:
+            start(0.0)
+        return run_now
+
+    def release(self, run_class: str, run_time_s: float = 0.0) -> None:
+        """Free a slot, handing it straight to the next waiting work if any."""
+        state = self._classes[run_class]
+        with self._lock:
+            if run_time_s > 0:
+                # Exponentially weighted average, used to estimate Retry-After
+                state.avg_run_s = run_time_s if state.avg_run_s == 0 else 0.8 * state.avg_run_s + 0.2 * run_time_s
+            if not state.pending:
+                state.in_use -= 1
+                return
+            now = time.monotonic()
+            entry = min(state.pending, key=lambda p: (self._effective_priority(p, now), p.sequence))
+            state.pending.remove(entry)
+            waited = now - entry.enqueued_at
+            state.admitted += 1
+            state.total_wait_s += waited
+            state.max_wait_s = max(state.max_wait_s, waited)
+        entry.start(waited)
+
+    def _effective_priority(self, entry: _Pending, now: float) -> float:
+        """Priority after aging: one level better per aging interval waited."""
+        if self.aging_seconds <= 0:
+            return entry.priority
+        return entry.priority - (now - entry.enqueued_at) / self.aging_seconds
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Slots in use, queue depth and wait times per run class."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "limit": state.limit,
+                    "in_use": state.in_use,
+                    "queued": len(state.pending),
+                    "queued_by_priority": {
+                        level: sum(1 for p in state.pending if p.priority == value)
+                        for level, value in PRIORITIES.items()
+                    },
+                    "max_queue": state.max_queue,
+                    "admitted": state.admitted,
+                    "rejected": state.rejected,
+                    "avg_wait_s": round(state.total_wait_s / state.admitted, 4) if state.admitted else 0.0,
+                    "max_wait_s": round(state.max_wait_s, 4),
+                    "oldest_wait_s": round(now - min(p.enqueued_at for p in state.pending), 4) if state.pending else 0.0,
+                    "avg_run_s": round(state.avg_run_s, 4),
+                }
+                for name, state in self._classes.items()
+            }
+
+    def _retry_after(self, state: _ClassState) -> int:
+        """Seconds until a queue position is likely to free up (lock held)."""
+        if state.avg_run_s == 0 or state.limit == 0:
+            return DEFAULT_RETRY_AFTER
+        return max(1, math.ceil(state.avg_run_s * (len(state.pending) + 1) / state.limit))
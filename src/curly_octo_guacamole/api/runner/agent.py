@@ -0,0 +1,169 @@
+"""
+Worker agent for distributed test execution.
+
+Leases jobs from a coordinator's queue (see ``job_queue``), runs them through
+the keyword runner (``tests.playwright_runner.run_test``, i.e. the usual
+Controller path), renews the lease while the test runs and posts the result.
+When a heartbeat is refused (the job was cancelled or timed out on the
+coordinator) the run's process group is killed.
+Start as many agents on as many hosts as needed:
+
+    pdm run python -m curly_octo_guacamole.api.runner.agent --coordinator http://coordinator:8000
+    pdm run python -m curly_octo_guacamole.api.runner.agent --queue-path /shared/job_queue.sqlite3 --run-class api
+"""
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from curly_octo_guacamole.api.runner.cancellation import RunCancelled, RunContext, bind
+from curly_octo_guacamole.api.runner.job_queue import AgentQueue, HttpJobQueue, SQLiteJobQueue
+
+logger = logging.getLogger(__name__)
+
+Runner = Callable[..., dict]
+
+
+class WorkerAgent:
+    """Pulls jobs from an AgentQueue and runs up to ``concurrency`` at a time."""
+
+    def __init__(
+        self,
+        queue: AgentQueue,
+        runner: Runner,
+        worker_id: Optional[str] = None,
+        concurrency: int = 1,
+        run_classes: Optional[List[str]] = None,
+        poll_interval: float = 1.0,
+        heartbeat_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            queue: Broker to lease jobs from.
+            runner: Called as ``runner(keyword, payload, **options)``.
+            worker_id: Name of this agent in leases (default host name plus a suffix).
+            concurrency: Jobs run at the same time.
+            run_classes: Only lease jobs of these classes (e.g. ``["api"]`` on
+                hosts without browsers); default all.
+            poll_interval: Seconds to wait when the queue is empty.
+            heartbeat_interval: Seconds between lease renewals (default a
+                third of the queue's lease).
+        """
+        self.queue = queue
+        self.runner = runner
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        self.run_classes = run_classes
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or queue.lease_seconds / 3
+        self._stop = threading.Event()
+
+    def run_once(self) -> bool:
+        """Lease and run a single job; False when the queue had none."""
+        job = self.queue.lease(self.worker_id, self.run_classes)
+        if job is None:
+            return False
+        self._run(job)
+        return True
+
+    def run_forever(self) -> None:
+        """Run jobs until ``stop`` is called."""
+        logger.info("🤖 Agent %s started, concurrency %d", self.worker_id, self.concurrency)
+        slots = threading.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="agent") as executor:
+            while not self._stop.is_set():
+                slots.acquire()
+                try:
+                    job = self.queue.lease(self.worker_id, self.run_classes)
+                except Exception as e:
+                    logger.error("Could not lease a job: %s", e)
+                    job = None
+                if job is None:
+                    slots.release()
+                    self._stop.wait(self.poll_interval)
+                    continue
+                future = executor.submit(self._run, job)
+                future.add_done_callback(lambda _: slots.release())
+        logger.info("Agent %s stopped", self.worker_id)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        logger.info("Leased job %s for keyword '%s' (attempt %d)", job_id, job["keyword"], job["attempts"])
+        done = threading.Event()
+        run = RunContext()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, done, run), daemon=True)
+        heartbeat.start()
+        result, error = None, None
+        try:
+            with bind(run):
+                result = self.runner(job["keyword"], job["payload"], **job["options"])
+        except RunCancelled:
+            logger.warning("Job %s was stopped after its lease was lost", job_id)
+            return
+        except Exception as e:
+            logger.error("Job %s raised an exception: %s", job_id, e)
+            error = str(e)
+        finally:
+            done.set()
+            heartbeat.join()
+        if not self.queue.complete(job_id, self.worker_id, result=result, error=error):
+            logger.warning("Lease on job %s was lost before its result was posted", job_id)
+
+    def _heartbeat(self, job_id: str, done: threading.Event, run: RunContext) -> None:
+        while not done.wait(self.heartbeat_interval):
+            try:
+                if not self.queue.heartbeat(job_id, self.worker_id):
+                    logger.warning("Lost the lease on job %s, stopping it", job_id)
+                    run.cancel()
+                    return
+            except Exception as e:
+                logger.error("Heartbeat for job %s failed: %s", job_id, e)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run test jobs leased from a coordinator queue.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--coordinator", help="Coordinator base URL, e.g. http://coordinator:8000")
+    source.add_argument("--queue-path", help="SQLite queue file shared with the coordinator")
+    parser.add_argument("--worker-id", default=None, help="Agent name in leases (default host name)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs run at the same time")
+    parser.add_argument("--run-class", action="append", dest="run_classes",
+                        help="Only lease jobs of this class (repeatable: ui, api)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when idle")
+    args = parser.parse_args(argv)
+
+    from curly_octo_guacamole.api.controllers.worker_pool import get_worker_pool
+    from curly_octo_guacamole.api.runner.logging_config import configure_logging
+    from tests.playwright_runner import run_test
+
+    configure_logging()
+    # Warm the pytest workers before leasing the first job
+    get_worker_pool()
+    queue = HttpJobQueue(args.coordinator) if args.coordinator else SQLiteJobQueue(
+        args.queue_path, lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    )
+    agent = WorkerAgent(
+        queue,
+        run_test,
+        worker_id=args.worker_id,
+        concurrency=args.concurrency,
+        run_classes=args.run_classes,
+        poll_interval=args.poll_interval,
+    )
+    try:
+        agent.run_forever()
+    except KeyboardInterrupt:
+        agent.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Batch execution of many test payloads under a parallelism limit.
+
+A batch is a list of ``{"keyword": ..., "payload": {...}}`` items, either as a
+JSON array or as JSON Lines. Items are fanned out over a thread pool and the
+per-item results are returned together with aggregate timing.
+"""
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def parse_jsonl(text: str) -> List[Dict[str, Any]]:
+    """
+    Parse JSON Lines into a list of objects, skipping blank lines.
+
+    Raises:
+        ValueError: If a line is not valid JSON, naming the offending line.
+    """
+    items = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+    return items
+
+
+def _run_item(runner: Callable[[str, dict], dict], index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+    keyword = item["keyword"]
+    start = time.perf_counter()
+    try:
+        result = runner(keyword, item["payload"])
+        status = "error" if result.get("status") == "error" else "success"
+        error = None
+    except Exception as e:
+        logger.error("Batch item %d (%s) raised an exception: %s", index, keyword, e)
+        result, status, error = None, "error", str(e)
+    return {
+        "index": index,
+        "keyword": keyword,
+        "status": status,
+        "duration_s": round(time.perf_counter() - start, 4),
+        "result": result,
+        "error": error,
+    }
+
+
+def run_batch(
+    items: List[Dict[str, Any]],
+    runner: Callable[[str, dict], dict],
+    parallelism: int = 4,
+) -> Dict[str, Any]:
+    """
+    Run every item through ``runner`` with at most ``parallelism`` in flight.
+
+    Args:
+        items: Dicts with ``keyword`` and ``payload`` keys.
+        runner: Callable executing a test, e.g. ``playwright_runner.run_test``.
+        parallelism: Maximum number of items running concurrently.
+
+    Returns:
+        dict: ``items`` with per-item results in submission order and a
+        ``summary`` with counts and timing.
+    """
+    if parallelism < 1:
+        raise ValueError(f"parallelism must be at least 1, got {parallelism}")
+
+    workers = max(1, min(parallelism, len(items)))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+        futures = [executor.submit(_run_item, runner, i, item) for i, item in enumerate(items)]
+        results = [future.result() for future in futures]
+    wall_time = time.perf_counter() - start
+
+    durations = [r["duration_s"] for r in results]
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    summary = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "parallelism": workers,
+        "wall_time_s": round(wall_time, 4),
+        "total_run_time_s": round(sum(durations), 4),
+        "max_run_time_s": max(durations, default=0.0),
+    }
+    logger.info(
+        "Batch finished: %d/%d succeeded in %ss with parallelism %d",
+        summary["succeeded"], summary["total"], summary["wall_time_s"], workers
+    )
+    return {"items": results, "summary": summary}
@@ -0,0 +1,322 @@
+"""
+Micro-benchmarks for the layers of the runner dispatch path.
+
+Each benchmark isolates one layer so the effect of an optimization shows up
+where it was made:
+
+    validation        a CreateUserReq body (app.models) through a FastAPI route
+    runner_dispatch   tests.playwright_runner.run_test to a no-op keyword handler
+    controller_route  Controller.run_test routing to the (stub) UI test
+    subprocess_spawn  one `python -m pytest` subprocess running a stub test
+    worker_pool_run   the same stub test on a warm pytest worker
+
+Results can be saved as a baseline and later runs compared against it; the
+compare mode exits non-zero when a benchmark's median got slower than the
+baseline by more than the threshold.
+
+    pdm run python -m curly_octo_guacamole.api.runner.bench --save
+    pdm run python -m curly_octo_guacamole.api.runner.bench --compare --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Project root (go up from src/curly_octo_guacamole/api/runner/)
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
+
+DEFAULT_BASELINE = PROJECT_ROOT / ".benchmarks" / "runner_baseline.json"
+
+CREATE_USER_BODY = json.dumps({
+    "action": "create_user",
+    "username": "bench_user",
+    "email": "bench@example.com",
+    "first_name": "Bench",
+    "last_name": "User",
+    "gender": "female",
+    "birth": "19900101",
+    "agreed_terms": True,
+    "salary": 50000,
+    "id": "bench-1",
+})
+
+STUB_TEST = "def test_stub():\n    assert True\n"
+
+# A benchmark does its setup (excluded from timing) and returns the callable
+# to time and a teardown
+Benchmark = Callable[[], Tuple[Callable[[], Any], Callable[[], None]]]
+
+
+def _bench_validation():
+    from fastapi import FastAPI
+
+    # The request models live outside app.main, so the app itself is not started;
+    # a route taking the same body runs FastAPI's parsing and validation for it
+    # (async, so the threadpool hop of a sync route is not timed as validation)
+    from app.models import CreateUserReq
+
+    api = FastAPI()
+
+    @api.post("/users")
+    async def create_user(req: CreateUserReq):
+        return None
+
+    body = CREATE_USER_BODY.encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/users", "raw_path": b"/users",
+        "root_path": "", "query_string": b"", "server": ("bench", 80), "client": ("bench", 0),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise AssertionError(f"validation benchmark got {message['status']}")
+
+    def post():
+        # Stepped without an event loop: receive and send never wait, so the request
+        # completes in one step, and a TestClient's thread hop would dwarf the validation
+        request = api(dict(scope), receive, send)
+        try:
+            request.send(None)
+        except StopIteration:
+            return
+        request.close()
+        raise RuntimeError("validation benchmark request suspended")
+
+    return post, lambda: None
+
+
+def _bench_runner_dispatch():
+    from curly_octo_guacamole.api.runner.registry import KeywordRegistry
+    from tests import playwright_runner
+
+    # A private registry keeps the stub keyword out of the shared one (and GET /keywords)
+    registry = KeywordRegistry(entry_point_group=None)
+
+    @registry.register("bench_noop", description="No-op keyword used by the dispatch benchmark")
+    def noop(data: dict) -> dict:
+        return {"status": "success"}
+
+    data = {"expired_at": "20250819"}
+
+    def dispatch():
+        # Swapped per call so an exception can never leave the private registry installed
+        shared = playwright_runner.keywords
+        playwright_runner.keywords = registry
+        try:
+            return playwright_runner.run_test("bench_noop", data, use_cache=False)
+        finally:
+            playwright_runner.keywords = shared
+
+    return dispatch, lambda: None
+
+
+def _bench_controller_route():
+    import logging
+    from curly_octo_guacamole.api.controllers.controller import Controller
+
+    # Routing, not logging, is measured here
+    controller_logger = logging.getLogger("curly_octo_guacamole.api.controllers.controller")
+    previous = controller_logger.level
+    controller_logger.setLevel(logging.WARNING)
+    controller = Controller()
+    return (
+        lambda: controller.run_test("ui", {"test_type": "account"}),
+        lambda: controller_logger.setLevel(previous),
+    )
+
+
+def _stub_test_dir() -> tempfile.TemporaryDirectory:
+    directory = tempfile.TemporaryDirectory(prefix="runner-bench-")
+    Path(directory.name, "test_stub.py").write_text(STUB_TEST)
+    return directory
+
+
+def _bench_subprocess_spawn():
+    from curly_octo_guacamole.api.controllers import controller as controller_module
+
+    directory = _stub_test_dir()
+    command = controller_module.PYTEST_COMMAND
+    controller_module.PYTEST_COMMAND = [sys.executable, "-m", "pytest"]
+    pool_size = os.environ.get("PYTEST_WORKER_POOL_SIZE")
+    os.environ["PYTEST_WORKER_POOL_SIZE"] = "0"
+    controller = controller_module.Controller()
+    args = ["test_stub.py", "-q", "-p", "no:cacheprovider"]
+
+    def teardown():
+        controller_module.PYTEST_COMMAND = command
+        if pool_size is None:
+            os.environ.pop("PYTEST_WORKER_POOL_SIZE", None)
+        else:
+            os.environ["PYTEST_WORKER_POOL_SIZE"] = pool_size
+        directory.cleanup()
+
+    return lambda: controller._execute_pytest(args, {}, Path(directory.name)), teardown
+
+
+def _bench_worker_pool_run():
+    from curly_octo_guacamole.api.controllers.worker_pool import PytestWorkerPool
+
+    directory = _stub_test_dir()
+    pool = PytestWorkerPool(size=1, warm_modules=(), project_root=directory.name)
+    args = [str(Path(directory.name, "test_stub.py")), "-q", "-p", "no:cacheprovider"]
+
+    def teardown():
+        pool.close()
+        directory.cleanup()
+
+    return lambda: pool.run(args, {}), teardown
+
+
+# name -> (benchmark, calls per repeat)
+BENCHMARKS: Dict[str, Tuple[Benchmark, int]] = {
+    "validation": (_bench_validation, 2000),
+    "runner_dispatch": (_bench_runner_dispatch, 2000),
+    "controller_route": (_bench_controller_route, 2000),
+    "subprocess_spawn": (_bench_subprocess_spawn, 1),
+    "worker_pool_run": (_bench_worker_pool_run, 5),
+}
+
+
+def time_calls(func: Callable[[], Any], number: int, repeat: int) -> List[float]:
+    """Seconds per call for each of ``repeat`` rounds of ``number`` calls."""
+    func()  # warm up caches and lazy imports
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 5, scale: float = 1.0) -> Dict[str, Any]:
+    """
+    Run the selected benchmarks.
+
+    Args:
+        names: Benchmarks to run (default all).
+        repeat: Timed rounds per benchmark.
+        scale: Multiplier for the calls per round (e.g. 0.01 for a smoke run).
+
+    Returns:
+        dict: ``meta`` about the machine and per-benchmark ``results`` with
+        median/min/max microseconds per call.
+    """
+    results = {}
+    for name in names or list(BENCHMARKS):
+        benchmark, number = BENCHMARKS[name]
+        number = max(1, int(number * scale))
+        func, teardown = benchmark()
+        try:
+            timings = time_calls(func, number, repeat)
+        finally:
+            teardown()
+        results[name] = {
+            "median_us": round(statistics.median(timings) * 1e6, 3),
+            "min_us": round(min(timings) * 1e6, 3),
+            "max_us": round(max(timings) * 1e6, 3),
+            "calls": number,
+            "repeat": repeat,
+        }
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.node(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compare medians against a baseline.
+
+    Returns:
+        list: One row per benchmark present in both runs with the ``ratio``
+        current/baseline and ``regression`` set when the ratio exceeds
+        ``1 + threshold``.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or not base["median_us"]:
+            continue
+        ratio = result["median_us"] / base["median_us"]
+        rows.append({
+            "name": name,
+            "baseline_us": base["median_us"],
+            "current_us": result["median_us"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def format_results(report: Dict[str, Any], rows: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Render results (and a comparison, if given) as a text table."""
+    lines = [f"{'benchmark':<20} {'median us':>12} {'min us':>12} {'calls':>7}"]
+    for name, result in report["results"].items():
+        lines.append(f"{name:<20} {result['median_us']:>12.2f} {result['min_us']:>12.2f} {result['calls']:>7}")
+    if rows:
+        lines.append("")
+        lines.append(f"{'benchmark':<20} {'baseline us':>12} {'current us':>12} {'ratio':>7}")
+        for row in rows:
+            flag = "  ❌ regression" if row["regression"] else ""
+            lines.append(
+                f"{row['name']:<20} {row['baseline_us']:>12.2f} {row['current_us']:>12.2f} {row['ratio']:>7.2f}{flag}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the runner dispatch path.")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per benchmark")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for calls per round")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline results file")
+    parser.add_argument("--save", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown before a benchmark counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    report = run_benchmarks(args.names or None, repeat=args.repeat, scale=args.scale)
+
+    rows = None
+    if args.compare:
+        baseline_path = Path(args.baseline)
+        if not baseline_path.exists():
+            print(f"❌ No baseline at {baseline_path}, run with --save first")
+            return 2
+        rows = compare(report, json.loads(baseline_path.read_text()), args.threshold)
+    print(format_results(report, rows))
+
+    if args.save:
+        baseline_path = Path(args.baseline)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline to {baseline_path}")
+    if rows and any(row["regression"] for row in rows):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
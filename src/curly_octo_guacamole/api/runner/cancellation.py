@@ -0,0 +1,133 @@
+"""
+Timeouts and cancellation for test runs.
+
+The JobManager gives every run a RunContext with the keyword's deadline and
+binds it to the thread executing the run. Code that blocks on a test process
+(the Controller's pytest subprocess, the worker pool, the distributed queue)
+polls ``current_run()`` while it waits and, once the run is cancelled or past
+its deadline, kills the whole process group, browsers included, and raises
+RunCancelled. The JobManager then reports the job as ``timeout`` or
+``cancelled`` and hands its slot to the next run.
+
+Configuration (environment variables):
+    RUN_TIMEOUT_SECONDS  default run timeout (default 900, 0 disables)
+    RUN_TIMEOUTS         per-keyword timeouts, e.g. "create_account=120,create_user=300"
+"""
+import contextlib
+import contextvars
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Reasons a run is stopped, also used as the job status
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"
+
+# How often blocking waits check for cancellation
+POLL_INTERVAL = 0.25
+
+
+class RunCancelled(Exception):
+    """Raised in the run's thread once its test process has been stopped."""
+
+    def __init__(self, reason: str):
+        super().__init__("Run timed out" if reason == TIMEOUT else "Run was cancelled")
+        self.reason = reason
+
+
+class RunContext:
+    """Deadline and cancellation flag of a single run."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Ask the run to stop; it is killed at its next cancellation check."""
+        self._cancelled.set()
+
+    @property
+    def reason(self) -> Optional[str]:
+        """``cancelled``, ``timeout`` or None while the run may continue."""
+        if self._cancelled.is_set():
+            return CANCELLED
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return TIMEOUT
+        return None
+
+    def check(self) -> None:
+        """Raise RunCancelled if the run should stop."""
+        reason = self.reason
+        if reason is not None:
+            raise RunCancelled(reason)
+
+    def wait(self, seconds: float = POLL_INTERVAL) -> Optional[str]:
+        """Sleep up to ``seconds`` (less if cancelled) and return ``reason``."""
+        if self.deadline is not None:
+            seconds = max(0.0, min(seconds, self.deadline - time.monotonic()))
+        self._cancelled.wait(seconds)
+        return self.reason
+
+
+_current: "contextvars.ContextVar[Optional[RunContext]]" = contextvars.ContextVar("current_run", default=None)
+
+
+def current_run() -> Optional[RunContext]:
+    """The RunContext of the run executing in this thread, if any."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def bind(run: RunContext) -> Iterator[RunContext]:
+    """Make ``run`` the current run for the duration of the block."""
+    token = _current.set(run)
+    try:
+        yield run
+    finally:
+        _current.reset(token)
+
+
+def kill_process_group(pid: int) -> None:
+    """SIGKILL the process group led by ``pid`` (the process and all its children)."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    except OSError as e:
+        logger.warning("Could not kill process group %s: %s", pid, e)
+
+
+def parse_timeouts(spec: str) -> Dict[str, float]:
+    """Parse a "keyword=seconds,keyword=seconds" timeout specification."""
+    timeouts = {}
+    for entry in spec.split(","):
+        keyword, _, seconds = entry.strip().partition("=")
+        if keyword and seconds:
+            timeouts[keyword.strip()] = float(seconds)
+    return timeouts
+
+
+class RunTimeouts:
+    """Per-keyword run timeouts with a default."""
+
+    def __init__(self, default: Optional[float] = None, per_keyword: Optional[Dict[str, float]] = None):
+        self.default = default
+        self.per_keyword = per_keyword or {}
+
+    @classmethod
+    def from_env(cls) -> "RunTimeouts":
+        return cls(
+            default=float(os.getenv("RUN_TIMEOUT_SECONDS", "900")),
+            per_keyword=parse_timeouts(os.getenv("RUN_TIMEOUTS", "")),
+        )
+
+    def for_keyword(self, keyword: str) -> Optional[float]:
+        """Timeout in seconds for ``keyword``, None when unlimited."""
+        timeout = self.per_keyword.get(keyword, self.default)
+        return timeout if timeout and timeout > 0 else None
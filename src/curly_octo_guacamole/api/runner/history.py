@@ -0,0 +1,267 @@
+"""
+Persistent history of test runs in SQLite.
+
+Every finished job is recorded with its keyword, payload hash, status, exit
+code, host, timings and per-test outcomes and durations, so runs can be
+analyzed long after the HTTP response is gone. The database runs in WAL mode
+so queries never block the writer. Recording only enqueues the run; a
+background thread inserts queued runs in batches, one transaction per batch.
+
+Every run is stored with one of ``RUN_STATUSES``, whether it came from a
+synchronous, background, batch or streamed request: ``success``, ``failed``
+(the tests ran and failed), ``error`` (the run itself broke), ``timeout`` or
+``cancelled``.
+
+Configuration (environment variables):
+    RUN_HISTORY_PATH        SQLite database file (default run_history.sqlite3,
+                            empty to disable)
+    RUN_HISTORY_BATCH_SIZE  runs inserted per transaction (default 100)
+    RUN_HISTORY_FLUSH_S     maximum delay before queued runs are written (default 1.0)
+"""
+import contextlib
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from curly_octo_guacamole.api.runner.cancellation import CANCELLED, TIMEOUT
+from curly_octo_guacamole.api.runner.jobs import COMPLETED
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    payload_hash TEXT,
+    status TEXT NOT NULL,
+    returncode INTEGER,
+    host TEXT,
+    run_class TEXT,
+    priority TEXT,
+    submitted_at TEXT,
+    started_at TEXT,
+    finished_at TEXT NOT NULL,
+    wait_s REAL,
+    duration_s REAL,
+    counts TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_finished_at ON runs (finished_at);
+CREATE INDEX IF NOT EXISTS idx_runs_keyword ON runs (keyword, finished_at);
+CREATE INDEX IF NOT EXISTS idx_runs_status ON runs (status, finished_at);
+
+CREATE TABLE IF NOT EXISTS run_tests (
+    run_id TEXT NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    nodeid TEXT NOT NULL,
+    outcome TEXT,
+    duration_s REAL
+);
+CREATE INDEX IF NOT EXISTS idx_run_tests_run_id ON run_tests (run_id);
+CREATE INDEX IF NOT EXISTS idx_run_tests_nodeid ON run_tests (nodeid);
+"""
+
+RUN_COLUMNS = (
+    "id", "keyword", "payload_hash", "status", "returncode", "host", "run_class", "priority",
+    "submitted_at", "started_at", "finished_at", "wait_s", "duration_s", "counts", "error",
+)
+
+# Run statuses stored in the history
+SUCCESS = "success"
+FAILED = "failed"
+ERROR = "error"
+RUN_STATUSES = (SUCCESS, FAILED, ERROR, TIMEOUT, CANCELLED)
+
+_FLUSH = object()
+_STOP = object()
+
+
+def run_status(job) -> str:
+    """The RUN_STATUSES entry for a finished job, from its state and its result."""
+    if job.status in (TIMEOUT, CANCELLED):
+        return job.status
+    if job.status != COMPLETED or job.error:
+        return ERROR
+    result = job.result if isinstance(job.result, dict) else {}
+    if result.get("status") == "error":
+        return FAILED if result.get("returncode") not in (None, 0) else ERROR
+    return SUCCESS
+
+
+class RunHistory:
+    """SQLite-backed run history with a batching background writer."""
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.host = socket.gethostname()
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name="run-history", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["RunHistory"]:
+        """Build the history from RUN_HISTORY_* settings, or None when disabled."""
+        path = os.getenv("RUN_HISTORY_PATH", "run_history.sqlite3")
+        if not path:
+            return None
+        return cls(
+            path,
+            batch_size=int(os.getenv("RUN_HISTORY_BATCH_SIZE", "100")),
+            flush_interval=float(os.getenv("RUN_HISTORY_FLUSH_S", "1.0")),
+        )
+
+    def record(self, job) -> None:
+        """Queue a finished job for insertion; never blocks on the database."""
+        result = job.result if isinstance(job.result, dict) else {}
+        summary = result.get("summary") or {}
+        duration = None
+        if job.started_at and job.finished_at:
+            duration = round((job.finished_at - job.started_at).total_seconds(), 4)
+        run = {
+            "id": job.id,
+            "keyword": job.keyword,
+            "payload_hash": job.payload_hash,
+            "status": run_status(job),
+            "returncode": result.get("returncode"),
+            "host": self.host,
+            "run_class": job.run_class,
+            "priority": job.priority,
+            "submitted_at": job.submitted_at.isoformat(),
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": (job.finished_at or job.submitted_at).isoformat(),
+            "wait_s": job.wait_s,
+            "duration_s": duration,
+            "counts": json.dumps(summary["counts"]) if summary.get("counts") else None,
+            "error": job.error or result.get("error"),
+        }
+        tests = [
+            (job.id, test["nodeid"], test.get("outcome"), test.get("duration"))
+            for test in summary.get("tests", [])
+        ]
+        self._queue.put((run, tests))
+
+    def query(
+        self,
+        keyword: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Runs matching the filters, newest first.
+
+        ``since``/``until`` are ISO timestamps compared against ``finished_at``.
+
+        Returns:
+            dict: ``total`` matching runs and the ``runs`` of the requested page.
+        """
+        clauses, params = [], []
+        for column, value, op in (("keyword", keyword, "="), ("status", status, "="),
+                                  ("finished_at", since, ">="), ("finished_at", until, "<")):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with contextlib.closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM runs {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM runs {where} ORDER BY finished_at DESC, id LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return {"total": total, "runs": [self._row(row) for row in rows]}
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """A single run including its per-test outcomes, or None if unknown."""
+        with contextlib.closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            tests = conn.execute(
+                "SELECT nodeid, outcome, duration_s FROM run_tests WHERE run_id = ? ORDER BY rowid",
+                (run_id,),
+            ).fetchall()
+        run = self._row(row)
+        run["tests"] = [dict(test) for test in tests]
+        return run
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every run recorded so far has been written."""
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Write pending runs and stop the background writer."""
+        if self._writer.is_alive():
+            self._queue.put((_STOP, None))
+            self._writer.join()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        run = dict(row)
+        run["counts"] = json.loads(run["counts"]) if run["counts"] else {}
+        return run
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                batch: List[Any] = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                # Gather more runs until the batch is full, a control message
+                # arrives or the flush interval has passed
+                while len(batch) < self.batch_size and batch[-1][0] not in (_FLUSH, _STOP):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                control = batch[-1] if batch[-1][0] in (_FLUSH, _STOP) else None
+                runs = batch[:-1] if control else batch
+                if runs:
+                    self._insert(conn, runs)
+                if control is not None:
+                    if control[0] is _STOP:
+                        return
+                    control[1].set()
+        finally:
+            conn.close()
+
+    def _insert(self, conn: sqlite3.Connection, runs: List[Any]) -> None:
+        placeholders = ", ".join("?" for _ in RUN_COLUMNS)
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}) VALUES ({placeholders})",
+                    [tuple(run[column] for column in RUN_COLUMNS) for run, _ in runs],
+                )
+                conn.executemany(
+                    "INSERT INTO run_tests (run_id, nodeid, outcome, duration_s) VALUES (?, ?, ?, ?)",
+                    [test for _, tests in runs for test in tests],
+                )
+        except sqlite3.Error as e:
+            logger.error("Could not record %d runs in %s: %s", len(runs), self.path, e)
@@ -0,0 +1,350 @@
+"""
+Durable job queue for distributed test execution.
+
+In coordinator mode (``RUNNER_MODE=coordinator``) the API does not run tests
+itself: each job is enqueued here and worker agents
+(``python -m curly_octo_guacamole.api.runner.agent``) on any number of hosts
+lease jobs, run them through the usual keyword runner, heartbeat while they
+run and post the result back. A lease that is not renewed in time (the agent
+crashed or lost its network) expires and the job is handed to the next agent,
+up to ``JOB_MAX_ATTEMPTS`` times. A coordinator run that times out or is
+cancelled fails its queue job, and the agent running it stops the test when
+its next heartbeat is refused.
+
+``JobQueue`` is the broker interface and ``AgentQueue`` the subset agents
+use (lease, heartbeat, complete). ``SQLiteJobQueue`` is the built-in broker, a
+single SQLite file for the coordinator (or agents sharing its disk);
+``HttpJobQueue`` is an AgentQueue that lets agents on other hosts use the
+coordinator's ``/queue`` endpoints instead.
+
+The coordinator skips its own ConcurrencyGovernor: the agents' concurrency
+bounds the runs in flight, so adding agents adds throughput. Each run the
+coordinator waits on holds a job thread, up to ``COORDINATOR_MAX_RUNS`` at
+once; agents lease jobs in priority order, then oldest first.
+
+Configuration (environment variables):
+    RUNNER_MODE        ``local`` (default) runs tests in the API process,
+                       ``coordinator`` hands them to worker agents
+    JOB_QUEUE_PATH     SQLite queue file (default job_queue.sqlite3)
+    JOB_LEASE_SECONDS  lease length an agent must renew by heartbeat (default 60)
+    JOB_MAX_ATTEMPTS   leases handed out before a job fails (default 3)
+    COORDINATOR_MAX_RUNS
+                       runs queued for agents at once; later runs wait in the
+                       API until one finishes (default 256)
+"""
+import abc
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from curly_octo_guacamole.api.runner.admission import DEFAULT_PRIORITY, PRIORITIES
+from curly_octo_guacamole.api.runner.cancellation import POLL_INTERVAL, RunCancelled, current_run
+
+logger = logging.getLogger(__name__)
+
+# Queue job states
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_jobs (
+    id TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    options TEXT NOT NULL,
+    run_class TEXT,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    worker_id TEXT,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_queue_jobs_pending ON queue_jobs (status, priority, enqueued_at);
+"""
+
+
+class AgentQueue(abc.ABC):
+    """The part of the broker worker agents use: lease, heartbeat and complete."""
+
+    lease_seconds: float = 60.0
+
+    @abc.abstractmethod
+    def lease(self, worker_id: str, run_classes: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Lease the next job (optionally of the given run classes), or None if there is none."""
+
+    @abc.abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Renew a lease; False when the worker no longer holds it."""
+
+    @abc.abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Optional[dict] = None,
+                 error: Optional[str] = None) -> bool:
+        """Record a leased job's result; False when the worker no longer holds the lease."""
+
+
+class JobQueue(AgentQueue):
+    """Full broker interface: the agents' subset plus what the coordinator needs."""
+
+    @abc.abstractmethod
+    def enqueue(self, keyword: str, payload: dict, options: Optional[dict] = None,
+                run_class: Optional[str] = None, priority: str = DEFAULT_PRIORITY) -> str:
+        """Add a job and return its queue id."""
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's state, or None if unknown."""
+
+
+class SQLiteJobQueue(JobQueue):
+    """JobQueue backed by a SQLite file in WAL mode."""
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> "SQLiteJobQueue":
+        return cls(
+            os.getenv("JOB_QUEUE_PATH", "job_queue.sqlite3"),
+            lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+        )
+
+    def enqueue(self, keyword: str, payload: dict, options: Optional[dict] = None,
+                run_class: Optional[str] = None, priority: str = DEFAULT_PRIORITY) -> str:
+        job_id = uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO queue_jobs (id, keyword, payload, options, run_class, priority, status, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, keyword, json.dumps(payload, default=str), json.dumps(options or {}),
+                 run_class, PRIORITIES[priority], QUEUED, time.time()),
+            )
+        return job_id
+
+    def lease(self, worker_id: str, run_classes: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            query = "SELECT * FROM queue_jobs WHERE status = ?"
+            params: List[Any] = [QUEUED]
+            if run_classes:
+                query += f" AND run_class IN ({', '.join('?' for _ in run_classes)})"
+                params += list(run_classes)
+            row = conn.execute(query + " ORDER BY priority, enqueued_at LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE queue_jobs SET status = ?, worker_id = ?, lease_expires_at = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (LEASED, worker_id, now + self.lease_seconds, row["id"]),
+            )
+        job = self._row(row)
+        job.update(status=LEASED, worker_id=worker_id, attempts=row["attempts"] + 1)
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE queue_jobs SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, worker_id, LEASED),
+            ).rowcount
+        return updated == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[dict] = None,
+                 error: Optional[str] = None) -> bool:
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE queue_jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND worker_id = ? AND status = ?",
+                (FAILED if error else DONE, json.dumps(result, default=str) if result is not None else None,
+                 error, time.time(), job_id, worker_id, LEASED),
+            ).rowcount
+        return updated == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with contextlib.closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM queue_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def cancel(self, job_id: str, error: str) -> bool:
+        """
+        Fail a queued or leased job; the agent running it loses its lease at
+        the next heartbeat and stops the run. False if it already finished.
+        """
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE queue_jobs SET status = ?, error = ?, finished_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND status IN (?, ?)",
+                (FAILED, error, time.time(), job_id, QUEUED, LEASED),
+            ).rowcount
+        return updated == 1
+
+    def requeue_expired(self) -> int:
+        """Return jobs whose lease expired to the queue; returns how many changed."""
+        with self._transaction() as conn:
+            return self._expire_leases(conn, time.time())
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per state."""
+        with contextlib.closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM queue_jobs GROUP BY status").fetchall()
+        return {status: 0 for status in (QUEUED, LEASED, DONE, FAILED)} | {row[0]: row[1] for row in rows}
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> int:
+        """Requeue expired leases, failing jobs that used up their attempts."""
+        failed = conn.execute(
+            "UPDATE queue_jobs SET status = ?, error = ?, finished_at = ?, lease_expires_at = NULL "
+            "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+            (FAILED, f"Lease lost {self.max_attempts} times", now, LEASED, now, self.max_attempts),
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE queue_jobs SET status = ?, worker_id = NULL, lease_expires_at = NULL "
+            "WHERE status = ? AND lease_expires_at < ?",
+            (QUEUED, LEASED, now),
+        ).rowcount
+        if failed or requeued:
+            logger.warning("Expired leases: %d requeued, %d failed", requeued, failed)
+        return failed + requeued
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so two agents can't lease the same job
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class HttpJobQueue(AgentQueue):
+    """AgentQueue talking to a coordinator's ``/queue`` endpoints."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+        self.lease_seconds = self._session.get(f"{self.base_url}/queue", timeout=timeout).json()["lease_seconds"]
+
+    def lease(self, worker_id: str, run_classes: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        response = self._session.post(
+            f"{self.base_url}/queue/lease",
+            json={"worker_id": worker_id, "run_classes": run_classes},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json() if response.status_code == 200 else None
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        response = self._session.post(
+            f"{self.base_url}/queue/{job_id}/heartbeat", json={"worker_id": worker_id}, timeout=self.timeout
+        )
+        return response.status_code == 200
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[dict] = None,
+                 error: Optional[str] = None) -> bool:
+        response = self._session.post(
+            f"{self.base_url}/queue/{job_id}/complete",
+            json={"worker_id": worker_id, "result": result, "error": error},
+            timeout=self.timeout,
+        )
+        return response.status_code == 200
+
+
+class DistributedRunner:
+    """
+    Runner for the JobManager in coordinator mode: enqueue the run and wait
+    for an agent to post its result.
+
+    Results posted through the coordinator's API wake the waiting run
+    immediately (``notify``); results written by agents sharing the SQLite
+    file are picked up by polling.
+    """
+
+    def __init__(self, queue: SQLiteJobQueue, classify: Optional[Callable[[str, dict], str]] = None,
+                 poll_interval: float = 1.0):
+        self.queue = queue
+        self.classify = classify
+        self.poll_interval = poll_interval
+        self._waiting: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, keyword: str, payload: dict, priority: str = DEFAULT_PRIORITY, **options: Any) -> dict:
+        run_class = self.classify(keyword, payload) if self.classify else None
+        event = threading.Event()
+        job_id = self.queue.enqueue(keyword, payload, options, run_class=run_class, priority=priority)
+        with self._lock:
+            self._waiting[job_id] = event
+        logger.info("Enqueued job %s for keyword '%s' for worker agents", job_id, keyword)
+        run = current_run()
+        try:
+            while True:
+                if run is not None and run.reason is not None:
+                    self.queue.cancel(job_id, f"Run {run.reason}")
+                    raise RunCancelled(run.reason)
+                job = self.queue.get(job_id)
+                if job["status"] == DONE:
+                    return job["result"]
+                if job["status"] == FAILED:
+                    raise RuntimeError(job["error"] or f"Queued job {job_id} failed")
+                if job["status"] == LEASED and job["lease_expires_at"] < time.time():
+                    # The agent stopped heartbeating: hand the job to another agent
+                    self.queue.requeue_expired()
+                event.wait(min(self.poll_interval, POLL_INTERVAL) if run is not None else self.poll_interval)
+                event.clear()
+        finally:
+            with self._lock:
+                self._waiting.pop(job_id, None)
+
+    def notify(self, job_id: str) -> None:
+        """Wake the run waiting for ``job_id``."""
+        with self._lock:
+            event = self._waiting.get(job_id)
+        if event is not None:
+            event.set()
+
+
+def runner_mode() -> str:
+    """``local`` or ``coordinator`` (RUNNER_MODE)."""
+    return os.getenv("RUNNER_MODE", "local").lower()
+
+
+def coordinator_max_runs() -> int:
+    """Runs a coordinator waits on at once (COORDINATOR_MAX_RUNS)."""
+    return int(os.getenv("COORDINATOR_MAX_RUNS", "256"))
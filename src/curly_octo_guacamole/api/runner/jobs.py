@@ -0,0 +1,338 @@
+"""
+Asynchronous job execution for the test runner API.
+
+Test runs are submitted to a bounded thread pool and tracked by job id, so
+HTTP handlers can return immediately (or await the run without holding a
+server thread) and clients poll for status and results. Submissions that
+share a dedupe key with a job still in flight attach to that job instead of
+starting a second run (single-flight). With a ConcurrencyGovernor, each job
+waits for a slot of its run class, in priority order, before it reaches that
+class's worker pool. Every run gets a RunContext carrying its keyword's
+timeout; runs that exceed it, or are cancelled through ``cancel``, have their
+test process killed and finish as ``timeout`` or ``cancelled``.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from curly_octo_guacamole.api.runner import metrics
+from curly_octo_guacamole.api.runner.admission import AdmissionRejected, ConcurrencyGovernor, DEFAULT_PRIORITY
+from curly_octo_guacamole.api.runner.cancellation import (
+    CANCELLED, TIMEOUT, RunCancelled, RunContext, RunTimeouts, bind,
+)
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+REJECTED = "rejected"
+
+FINISHED_STATES = (COMPLETED, FAILED, REJECTED, TIMEOUT, CANCELLED)
+
+
+@dataclass
+class Job:
+    """A single test run submitted to the JobManager."""
+    keyword: str
+    payload: Dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    submitted_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    coalesced: int = 0
+    run_class: Optional[str] = None
+    priority: str = DEFAULT_PRIORITY
+    wait_s: Optional[float] = None
+    payload_hash: Optional[str] = None
+    timeout_s: Optional[float] = None
+    dedupe_key: Optional[str] = field(default=None, repr=False)
+    runner: Optional[Callable[..., Dict[str, Any]]] = field(default=None, repr=False)
+    run: Optional[RunContext] = field(default=None, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """Serialize the job for API responses."""
+        data = {
+            "job_id": self.id,
+            "keyword": self.keyword,
+            "status": self.status,
+            "run_class": self.run_class,
+            "priority": self.priority,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "wait_s": self.wait_s,
+            "timeout_s": self.timeout_s,
+            "error": self.error,
+            "coalesced_requests": self.coalesced,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """Runs test jobs on a bounded executor and keeps a bounded job history."""
+
+    def __init__(
+        self,
+        runner: Callable[[str, dict], dict],
+        max_workers: int = 4,
+        max_jobs: int = 1000,
+        governor: Optional[ConcurrencyGovernor] = None,
+        classify: Optional[Callable[[str, dict], str]] = None,
+        on_finish: Optional[Callable[["Job"], None]] = None,
+        timeouts: Optional[RunTimeouts] = None,
+        pass_priority: bool = False,
+    ):
+        """
+        Args:
+            runner: Callable executing a test, e.g. ``playwright_runner.run_test``.
+            max_workers: Maximum number of test runs executing concurrently
+                (ignored with a governor, which gets one worker pool per run
+                class sized to that class's slots).
+            max_jobs: Number of jobs kept for polling; oldest finished jobs are evicted.
+            governor: Optional admission control applied per run class.
+            classify: Maps (keyword, payload) to the job's run class for the governor.
+            on_finish: Called with each job once it has finished running
+                (e.g. ``RunHistory.record``); must not block.
+            timeouts: Per-keyword run timeouts (default none).
+            pass_priority: Pass each job's priority to the manager's runner as
+                ``priority`` (e.g. a DistributedRunner, whose queue leases by it).
+        """
+        self.runner = runner
+        self.governor = governor
+        self.classify = classify
+        self.on_finish = on_finish
+        self.timeouts = timeouts or RunTimeouts()
+        self.pass_priority = pass_priority
+        self.max_workers = governor.total_slots if governor else max_workers
+        self.max_jobs = max_jobs
+        if governor is None:
+            self._executors = {None: ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")}
+        else:
+            self._executors = {
+                run_class: ThreadPoolExecutor(
+                    max_workers=max(1, governor.slots(run_class)),
+                    thread_name_prefix=f"job-{run_class}",
+                )
+                for run_class in governor.run_classes
+            }
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        keyword: str,
+        payload: Dict[str, Any],
+        dedupe_key: Optional[str] = None,
+        priority: str = DEFAULT_PRIORITY,
+        payload_hash: Optional[str] = None,
+        runner: Optional[Callable[..., Dict[str, Any]]] = None,
+        **options: Any,
+    ) -> Job:
+        """
+        Queue a test run and return its Job immediately.
+
+        Args:
+            keyword: Test keyword passed to the runner.
+            payload: Test data passed to the runner.
+            dedupe_key: When a job with the same key is still queued or running,
+                that job is returned instead of starting a new run.
+            priority: Scheduling priority while waiting for a slot
+                ("high", "normal" or "low").
+            payload_hash: Hash of the payload recorded with the job (defaults
+                to ``dedupe_key``).
+            runner: Runs this job instead of the manager's runner (e.g. a
+                streamed run forwarding its output events).
+            **options: Extra keyword arguments passed through to the runner.
+
+        Raises:
+            AdmissionRejected: If the governor's queue for the job's class is full.
+        """
+        label = metrics.keyword_label(keyword)
+        metrics.REQUESTS.inc(keyword=label)
+        with self._lock:
+            if dedupe_key is not None:
+                existing = self._inflight.get(dedupe_key)
+                if existing is not None:
+                    existing.coalesced += 1
+                    metrics.COALESCED.inc(keyword=label)
+                    logger.info("Attached request to in-flight job %s for keyword '%s'", existing.id, keyword)
+                    return existing
+
+            job = Job(
+                keyword=keyword,
+                payload=payload,
+                dedupe_key=dedupe_key,
+                payload_hash=payload_hash or dedupe_key,
+                priority=priority,
+                timeout_s=self.timeouts.for_keyword(keyword),
+                runner=runner,
+                future=Future(),
+            )
+            if self.governor is not None:
+                job.run_class = self.classify(keyword, payload) if self.classify else "default"
+            self._jobs[job.id] = job
+            self._evict()
+            if dedupe_key is not None:
+                self._inflight[dedupe_key] = job
+
+        if self.governor is None:
+            self._start(job, options, 0.0)
+        else:
+            try:
+                self.governor.submit(
+                    job.run_class, lambda waited: self._start(job, options, waited), priority=priority
+                )
+            except (AdmissionRejected, ValueError) as e:
+                logger.warning("Rejected job %s: %s", job.id, e)
+                metrics.REJECTED.inc(keyword=label)
+                job.status = REJECTED
+                job.error = str(e)
+                job.finished_at = datetime.now()
+                self._forget_inflight(job)
+                # Callers attached through single-flight see the rejection too
+                job.future.set_exception(e)
+                raise
+        logger.info("Queued job %s for keyword '%s'", job.id, keyword)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job with ``job_id``, or None if unknown or evicted."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job.
+
+        A queued job finishes as ``cancelled`` right away and gives up its slot
+        as soon as the governor hands it one; a running job has its test
+        process group killed and finishes as ``cancelled`` shortly after.
+        Finished jobs are left unchanged.
+
+        Returns:
+            The job, or None if unknown or evicted.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.error = str(RunCancelled(CANCELLED))
+                job.finished_at = datetime.now()
+                queued = True
+            else:
+                queued = False
+        if queued:
+            logger.info("Cancelled queued job %s", job.id)
+            metrics.record_result(metrics.keyword_label(job.keyword), job.status, None)
+            self._finish(job)
+            job.future.set_result(job)
+        else:
+            logger.info("Cancelling running job %s", job.id)
+            job.run.cancel()
+        return job
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Job]:
+        """Return the most recently submitted jobs, newest first."""
+        with self._lock:
+            jobs = list(reversed(self._jobs.values()))
+        if status:
+            jobs = [job for job in jobs if job.status == status]
+        return jobs[:limit]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs and optionally wait for running ones."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+
+    def _start(self, job: Job, options: Dict[str, Any], waited: float) -> None:
+        job.wait_s = round(waited, 4)
+        if job.status == CANCELLED:
+            # Cancelled while queued: hand the slot straight to the next job
+            if self.governor is not None:
+                self.governor.release(job.run_class, 0.0)
+            return
+        metrics.QUEUE_SECONDS.observe(waited, keyword=metrics.keyword_label(job.keyword))
+        self._executors[job.run_class].submit(self._execute, job, options)
+
+    def _execute(self, job: Job, options: Dict[str, Any]) -> None:
+        label = metrics.keyword_label(job.keyword)
+        with self._lock:
+            if job.status == CANCELLED:
+                if self.governor is not None:
+                    self.governor.release(job.run_class, 0.0)
+                return
+            job.run = RunContext(job.timeout_s)
+            job.status = RUNNING
+        job.started_at = datetime.now()
+        metrics.IN_FLIGHT.inc(keyword=label)
+        start = time.perf_counter()
+        try:
+            if job.runner is None and self.pass_priority:
+                options = dict(options, priority=job.priority)
+            with bind(job.run):
+                result = (job.runner or self.runner)(job.keyword, job.payload, **options)
+            # Runners that don't check for cancellation still report it
+            job.run.check()
+            job.result = result
+            job.status = COMPLETED
+        except RunCancelled as e:
+            logger.warning("Job %s stopped: %s", job.id, e.reason)
+            job.error = str(e)
+            job.status = e.reason
+        except Exception as e:
+            logger.error("Job %s raised an exception: %s", job.id, e)
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now()
+            metrics.IN_FLIGHT.dec(keyword=label)
+            metrics.RUN_SECONDS.observe(time.perf_counter() - start, keyword=label)
+            metrics.record_result(label, job.status, job.result)
+            self._finish(job)
+            if self.governor is not None:
+                run_time = (job.finished_at - job.started_at).total_seconds()
+                self.governor.release(job.run_class, run_time)
+        job.future.set_result(job)
+
+    def _finish(self, job: Job) -> None:
+        if self.on_finish is not None:
+            try:
+                self.on_finish(job)
+            except Exception as e:
+                logger.error("on_finish failed for job %s: %s", job.id, e)
+        self._forget_inflight(job)
+
+    def _forget_inflight(self, job: Job) -> None:
+        if job.dedupe_key is None:
+            return
+        with self._lock:
+            if self._inflight.get(job.dedupe_key) is job:
+                del self._inflight[job.dedupe_key]
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs while over capacity (lock held)."""
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].status in FINISHED_STATES:
+                del self._jobs[job_id]
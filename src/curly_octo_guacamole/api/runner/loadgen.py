@@ -0,0 +1,299 @@
+"""
+Replay recorded requests against the test runner API and report latency.
+
+Reads a JSON Lines file of requests, one per line, and streams it (the file
+is never loaded at once):
+
+    {"method": "POST", "path": "/create_user", "body": {...}, "offset": 1.25}
+    {"keyword": "create_account", "payload": {...}}
+
+``offset`` (seconds since the start of the recording) is optional; a line
+with ``keyword``/``payload`` and no ``path`` is sent to ``POST /run_test``.
+Lines that are not requests are skipped and counted.
+
+Arrivals are open-loop: each request is sent at its scheduled time whether or
+not earlier requests have finished, and latency is measured from the
+scheduled time, so queueing in the generator (``--concurrency``) shows up in
+the numbers instead of hiding server slowdowns. The schedule comes from
+``--rate`` (requests per second, optionally ``--poisson``), otherwise from the
+recorded offsets divided by ``--time-scale``, otherwise requests are sent as
+fast as the concurrency limit allows.
+
+    pdm run python -m curly_octo_guacamole.api.runner.loadgen traffic.jsonl --rate 20 --output load.json
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+DEFAULT_BASE_URL = "http://localhost:8000"
+
+
+@dataclass
+class RecordedRequest:
+    """A single request read from the traffic file."""
+    method: str
+    path: str
+    body: Optional[Any] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    offset: Optional[float] = None
+
+    @property
+    def label(self) -> str:
+        keyword = self.body.get("keyword") if isinstance(self.body, dict) else None
+        return f"{self.method} {self.path}" + (f" [{keyword}]" if keyword else "")
+
+
+def parse_request(entry: Dict[str, Any]) -> Optional[RecordedRequest]:
+    """Turn one JSONL entry into a request, or None if it does not describe one."""
+    if "path" in entry:
+        return RecordedRequest(
+            method=entry.get("method", "POST").upper(),
+            path=entry["path"],
+            body=entry.get("body"),
+            headers=entry.get("headers") or {},
+            offset=entry.get("offset"),
+        )
+    if "keyword" in entry and "payload" in entry:
+        return RecordedRequest(
+            method="POST",
+            path="/run_test",
+            body={"keyword": entry["keyword"], "payload": entry["payload"]},
+            offset=entry.get("offset"),
+        )
+    return None
+
+
+def read_requests(lines: Iterable[str], stats: Optional[Dict[str, int]] = None) -> Iterator[RecordedRequest]:
+    """Stream requests from JSONL lines, counting skipped lines in ``stats``."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = parse_request(json.loads(line))
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            request = None
+        if request is None:
+            if stats is not None:
+                stats["skipped"] = stats.get("skipped", 0) + 1
+            continue
+        yield request
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles (ms), throughput and error rate of one group of requests."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round(count / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            name: round(value * 1000, 2) if value is not None else None
+            for name, value in (
+                ("p50", percentile(ordered, 50)),
+                ("p95", percentile(ordered, 95)),
+                ("p99", percentile(ordered, 99)),
+                ("max", ordered[-1] if ordered else None),
+                ("mean", sum(ordered) / count if count else None),
+            )
+        },
+    }
+
+
+class LoadGenerator:
+    """Sends recorded requests on an open-loop schedule and collects timings."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        concurrency: int = 8,
+        rate: Optional[float] = None,
+        poisson: bool = False,
+        time_scale: float = 1.0,
+        timeout: float = 300.0,
+        seed: Optional[int] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.rate = rate
+        self.poisson = poisson
+        self.time_scale = time_scale
+        self.timeout = timeout
+        self._random = random.Random(seed)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._results: List[Dict[str, Any]] = []
+
+    def run(self, recorded: Iterable[RecordedRequest], limit: Optional[int] = None) -> Dict[str, Any]:
+        """Replay ``recorded`` and return the report."""
+        self._results = []
+        started = time.perf_counter()
+        next_arrival = 0.0
+        first_offset = None
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="loadgen") as executor:
+            for index, request in enumerate(recorded):
+                if limit is not None and index >= limit:
+                    break
+                if self.rate:
+                    scheduled = next_arrival
+                    gap = self._random.expovariate(self.rate) if self.poisson else 1 / self.rate
+                    next_arrival += gap
+                elif request.offset is not None:
+                    # Offsets are relative to the first recorded request
+                    first_offset = request.offset if first_offset is None else first_offset
+                    scheduled = max(0.0, request.offset - first_offset) / self.time_scale
+                else:
+                    scheduled = None
+                if scheduled is not None:
+                    delay = started + scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    intended = started + scheduled
+                else:
+                    intended = None
+                executor.submit(self._send, request, intended)
+        elapsed = time.perf_counter() - started
+        return self._report(elapsed)
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _send(self, request: RecordedRequest, intended: Optional[float]) -> None:
+        sent = time.perf_counter()
+        status, error = None, None
+        try:
+            response = self._session().request(
+                request.method,
+                self.base_url + request.path,
+                json=request.body,
+                headers=request.headers,
+                timeout=self.timeout,
+            )
+            status = response.status_code
+        except requests.RequestException as e:
+            error = type(e).__name__
+        done = time.perf_counter()
+        with self._lock:
+            self._results.append({
+                "label": request.label,
+                "status": status,
+                "error": error,
+                # Measured from the scheduled send time to include generator queueing
+                "latency": done - (intended if intended is not None else sent),
+                "service": done - sent,
+            })
+
+    def _report(self, elapsed: float) -> Dict[str, Any]:
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        statuses: Dict[str, int] = {}
+        for result in self._results:
+            groups.setdefault(result["label"], []).append(result)
+            code = str(result["status"]) if result["status"] is not None else result["error"]
+            statuses[code] = statuses.get(code, 0) + 1
+
+        def failed(result):
+            return result["status"] is None or result["status"] >= 400
+
+        overall = summarize(
+            [r["latency"] for r in self._results], sum(1 for r in self._results if failed(r)), elapsed
+        )
+        overall["service_latency_ms"] = summarize([r["service"] for r in self._results], 0, elapsed)["latency_ms"]
+        return {
+            "config": {
+                "base_url": self.base_url,
+                "concurrency": self.concurrency,
+                "rate": self.rate,
+                "poisson": self.poisson,
+                "time_scale": self.time_scale,
+            },
+            "duration_s": round(elapsed, 3),
+            "overall": overall,
+            "status_codes": statuses,
+            "endpoints": {
+                label: summarize([r["latency"] for r in results], sum(1 for r in results if failed(r)), elapsed)
+                for label, results in sorted(groups.items())
+            },
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a short text table."""
+    lines = [
+        f"{'endpoint':<40} {'reqs':>6} {'err%':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    ]
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for label, stats in rows:
+        latency = stats["latency_ms"]
+        lines.append(
+            f"{label[:40]:<40} {stats['requests']:>6} {stats['error_rate'] * 100:>6.1f} "
+            f"{stats['throughput_rps']:>8.2f} {latency['p50'] or 0:>9.1f} {latency['p95'] or 0:>9.1f} "
+            f"{latency['p99'] or 0:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded requests against the test runner API.")
+    parser.add_argument("traffic", help="JSONL file of recorded requests ('-' for stdin)")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help=f"Service URL (default: {DEFAULT_BASE_URL})")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    parser.add_argument("--rate", type=float, default=None, help="Open-loop arrival rate in requests per second")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times at --rate")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Speed-up applied to recorded offsets (2.0 replays twice as fast)")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for --poisson")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    stats: Dict[str, int] = {}
+    source = sys.stdin if args.traffic == "-" else open(args.traffic)
+    try:
+        generator = LoadGenerator(
+            base_url=args.base_url,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            poisson=args.poisson,
+            time_scale=args.time_scale,
+            timeout=args.timeout,
+            seed=args.seed,
+        )
+        report = generator.run(read_requests(source, stats), limit=args.limit)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    report["skipped_lines"] = stats.get("skipped", 0)
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+            file.write("\n")
+    return 1 if report["overall"]["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
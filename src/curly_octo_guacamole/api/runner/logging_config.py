@@ -0,0 +1,211 @@
+"""
+Logging setup for the test runner service.
+
+Request threads only put log records on a bounded in-memory queue; a
+background listener thread formats and writes them. Messages are formatted
+lazily (``%``-style arguments are rendered on the listener thread, not by
+the caller), oversized messages and fields are truncated, and chatty loggers
+can be sampled. When the queue is full, records are dropped and counted
+instead of blocking the request.
+
+Structured fields are passed with ``extra``:
+
+    logger.info("API request received", extra={"endpoint": "/run_test", "keyword": keyword})
+
+Configuration (environment variables):
+    LOG_FORMAT        ``text`` (default) or ``json`` (one JSON object per line)
+    LOG_LEVEL         root log level (default INFO)
+    LOG_ASYNC         write logs from a background thread (default true)
+    LOG_QUEUE_SIZE    records buffered before dropping (default 10000)
+    LOG_FIELD_LIMIT   maximum characters per message or field (default 4000)
+    LOG_SAMPLING      per-logger sample rates, e.g. ``tests.keyword_handlers=0.1``;
+                      warnings and errors are never sampled out
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+TEXT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def truncate(value: str, limit: int) -> str:
+    """Cap ``value`` at ``limit`` characters, noting how much was cut."""
+    if limit <= 0 or len(value) <= limit:
+        return value
+    return f"{value[:limit]}... [truncated {len(value) - limit} chars]"
+
+
+def record_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    """Structured fields attached to ``record`` through ``extra``."""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class TextFormatter(logging.Formatter):
+    """Classic console format with extra fields appended as ``key=value``."""
+
+    def __init__(self, field_limit: int = 4000):
+        super().__init__(TEXT_FORMAT, TEXT_DATEFMT)
+        self.field_limit = field_limit
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = truncate(super().format(record), self.field_limit)
+        fields = record_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={truncate(str(value), self.field_limit)}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message and extra fields."""
+
+    def __init__(self, field_limit: int = 4000):
+        super().__init__()
+        self.field_limit = field_limit
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage(), self.field_limit),
+            "thread": record.threadName,
+        }
+        for key, value in record_fields(record).items():
+            entry[key] = self._field(value)
+        if record.exc_info:
+            entry["exc_info"] = truncate(self.formatException(record.exc_info), self.field_limit)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+    def _field(self, value: Any) -> Any:
+        if isinstance(value, (bool, int, float)) or value is None:
+            return value
+        if isinstance(value, str):
+            return truncate(value, self.field_limit)
+        text = json.dumps(value, default=str, ensure_ascii=False)
+        if len(text) <= self.field_limit:
+            return value
+        return truncate(text, self.field_limit)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of the records below WARNING from selected loggers.
+
+    Rates apply to a logger and its children (longest prefix wins). Sampling
+    is deterministic: a rate of 0.25 keeps every fourth record.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._credit: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_string(cls, spec: str) -> "SamplingFilter":
+        rates = {}
+        for item in spec.split(","):
+            name, _, rate = item.strip().partition("=")
+            if name and rate:
+                rates[name] = min(1.0, max(0.0, float(rate)))
+        return cls(rates)
+
+    def _rate(self, name: str) -> Optional[str]:
+        while name:
+            if name in self.rates:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        prefix = self._rate(record.name)
+        if prefix is None:
+            return True
+        with self._lock:
+            credit = self._credit.get(prefix, 0.0) + self.rates[prefix]
+            keep = credit >= 1.0
+            self._credit[prefix] = credit - 1.0 if keep else credit
+        return keep
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records without formatting them and drop them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record can be formatted there
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(
+    log_format: Optional[str] = None,
+    level: Optional[str] = None,
+    use_queue: Optional[bool] = None,
+    stream=None,
+) -> logging.Handler:
+    """
+    Install the service's root log handler, replacing existing root handlers.
+
+    Arguments default to the LOG_* environment variables. Returns the handler
+    installed on the root logger.
+    """
+    global _listener
+    log_format = (log_format or os.getenv("LOG_FORMAT", "text")).lower()
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    if use_queue is None:
+        use_queue = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    field_limit = int(os.getenv("LOG_FIELD_LIMIT", "4000"))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter(field_limit) if log_format == "json" else TextFormatter(field_limit))
+
+    stop_listener()
+    if use_queue:
+        handler: logging.Handler = NonBlockingQueueHandler(queue.Queue(int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+        _listener = logging.handlers.QueueListener(handler.queue, output)
+        _listener.start()
+    else:
+        handler = output
+    handler.addFilter(SamplingFilter.from_string(os.getenv("LOG_SAMPLING", "")))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    return handler
+
+
+def stop_listener() -> None:
+    """Flush queued records and stop the background writer, if running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_listener)
@@ -0,0 +1,208 @@
+"""
+Prometheus-style metrics for the test runner service.
+
+A small, dependency-free implementation of counters, gauges and histograms
+rendered in the Prometheus text exposition format by ``GET /metrics``.
+Recording a sample is a dict update under a lock, so instrumenting the
+request path costs microseconds. Values that already live elsewhere (queue
+depth, cache counters) are read by collectors at scrape time instead of
+being mirrored on every request.
+"""
+import bisect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from curly_octo_guacamole.api.runner.registry import keywords
+
+# Latency buckets in seconds, from fast API runs to slow UI runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelValues = Tuple[str, ...]
+# Scrape-time samples: (metric name, help text, labels, value)
+Sample = Tuple[str, str, Dict[str, str], float]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations over cumulative buckets."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        names = self.label_names + ("le",)
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (le,))} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors and renders them as text."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, label_names))
+
+    def gauge(self, name: str, help: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, label_names))
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, label_names, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Register a callable returning gauge samples, evaluated on every scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        grouped: Dict[str, Tuple[str, List[str]]] = {}
+        for collector in self._collectors:
+            for name, help, labels, value in collector():
+                _, samples = grouped.setdefault(name, (help, []))
+                samples.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        for name, (help, samples) in grouped.items():
+            lines.extend([f"# HELP {name} {help}", f"# TYPE {name} gauge"] + samples)
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+def keyword_label(keyword: str) -> str:
+    """Registered keywords are labelled by name, anything else as "other" to bound cardinality."""
+    return keyword if keyword in keywords else "other"
+
+
+def record_result(label: str, status: str, result: Optional[Dict[str, Any]]) -> None:
+    """Record a finished run's status, pytest exit code and spawn/execution timings.
+
+    Cached results only count towards the status; their timings belong to
+    the run that produced them.
+    """
+    RESULTS.inc(keyword=label, status=status)
+    if not isinstance(result, dict) or result.get("cached"):
+        return
+    if result.get("returncode") is not None:
+        EXIT_CODES.inc(keyword=label, code=str(result["returncode"]))
+    timings = result.get("timings") or {}
+    if timings.get("spawn_s") is not None:
+        SPAWN_SECONDS.observe(timings["spawn_s"], keyword=label)
+    if timings.get("execution_s") is not None:
+        EXECUTION_SECONDS.observe(timings["execution_s"], keyword=label)
+
+
+# Shared registry and the runner's metrics
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter("runner_requests_total", "Test runs requested", ["keyword"])
+COALESCED = REGISTRY.counter("runner_coalesced_total", "Requests attached to an identical in-flight run", ["keyword"])
+REJECTED = REGISTRY.counter("runner_rejected_total", "Runs rejected by admission control", ["keyword"])
+IN_FLIGHT = REGISTRY.gauge("runner_in_flight", "Test runs currently executing", ["keyword"])
+RESULTS = REGISTRY.counter("runner_results_total", "Finished test runs by status", ["keyword", "status"])
+EXIT_CODES = REGISTRY.counter("runner_exit_codes_total", "Pytest exit codes of finished runs", ["keyword", "code"])
+QUEUE_SECONDS = REGISTRY.histogram("runner_queue_seconds", "Time runs waited for an admission slot", ["keyword"])
+SPAWN_SECONDS = REGISTRY.histogram(
+    "runner_spawn_seconds", "Time to start pytest (subprocess spawn or pool worker acquisition)", ["keyword"]
+)
+EXECUTION_SECONDS = REGISTRY.histogram("runner_execution_seconds", "Time pytest spent running tests", ["keyword"])
+RUN_SECONDS = REGISTRY.histogram("runner_run_seconds", "Time from run start to result", ["keyword"])
@@ -0,0 +1,150 @@
+"""
+Registry mapping test keywords to their handler functions.
+
+Handlers are declared either eagerly with the ``register`` decorator or lazily
+as ``"module:attribute"`` targets (in code with ``register_lazy`` or through
+the ``curly_octo_guacamole.keywords`` entry point group). Lazy targets are
+only imported the first time their keyword is dispatched, so declaring a
+keyword costs nothing at server startup. Lookup is a single dict access.
+
+A handler takes the test data dict and returns a result dict. A keyword can
+also have a stream handler (``register_stream``, or ``stream_target`` for lazy
+declarations) yielding run events (``start``, ``line``, ``end``) as the test
+produces them; keywords without one stream their handler's result as a single
+``end`` event.
+"""
+import importlib
+import logging
+import threading
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Entry point group third-party packages use to contribute keywords
+ENTRY_POINT_GROUP = "curly_octo_guacamole.keywords"
+
+Handler = Callable[[dict], dict]
+StreamHandler = Callable[[dict], Iterator[dict]]
+
+
+@dataclass
+class KeywordEntry:
+    """A registered keyword and its (possibly not yet imported) handler."""
+    keyword: str
+    target: str
+    description: str = ""
+    handler: Optional[Handler] = None
+    stream_target: Optional[str] = None
+    stream_handler: Optional[StreamHandler] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "keyword": self.keyword,
+            "target": self.target,
+            "description": self.description,
+            "loaded": self.handler is not None,
+        }
+
+
+class KeywordRegistry:
+    """Keyword to handler mapping with lazy imports and introspection."""
+
+    def __init__(self, entry_point_group: Optional[str] = ENTRY_POINT_GROUP):
+        self.entry_point_group = entry_point_group
+        self._entries: Dict[str, KeywordEntry] = {}
+        self._entry_points_loaded = entry_point_group is None
+        self._lock = threading.Lock()
+
+    def register(self, keyword: str, description: str = "") -> Callable[[Handler], Handler]:
+        """Decorator registering ``func`` as the handler for ``keyword``."""
+        def decorator(func: Handler) -> Handler:
+            target = f"{func.__module__}:{func.__qualname__}"
+            with self._lock:
+                entry = self._entries.get(keyword)
+                if entry is None:
+                    entry = self._entries[keyword] = KeywordEntry(keyword, target, description)
+                entry.target = target
+                entry.description = description or entry.description or (func.__doc__ or "").strip()
+                entry.handler = func
+            return func
+        return decorator
+
+    def register_stream(self, keyword: str) -> Callable[[StreamHandler], StreamHandler]:
+        """Decorator registering ``func`` as the stream handler of an already registered ``keyword``."""
+        def decorator(func: StreamHandler) -> StreamHandler:
+            with self._lock:
+                entry = self._entries.get(keyword)
+                if entry is None:
+                    raise KeyError(f"Register keyword '{keyword}' before its stream handler")
+                entry.stream_target = f"{func.__module__}:{func.__qualname__}"
+                entry.stream_handler = func
+            return func
+        return decorator
+
+    def register_lazy(self, keyword: str, target: str, description: str = "",
+                      stream_target: Optional[str] = None) -> None:
+        """Declare ``keyword`` without importing its ``"module:attribute"`` handler (or stream handler)."""
+        for value in (target, stream_target):
+            if value is not None and ":" not in value:
+                raise ValueError(f"Handler target must look like 'module:attribute', got '{value}'")
+        with self._lock:
+            if keyword not in self._entries:
+                self._entries[keyword] = KeywordEntry(keyword, target, description, stream_target=stream_target)
+
+    def load_entry_points(self) -> None:
+        """Declare keywords contributed through the entry point group (once)."""
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for entry_point in entry_points(group=self.entry_point_group):
+            self.register_lazy(entry_point.name, entry_point.value)
+
+    def get(self, keyword: str) -> Optional[Handler]:
+        """Return the handler for ``keyword``, importing it on first use."""
+        entry = self._entry(keyword)
+        if entry is None:
+            return None
+        if entry.handler is None:
+            entry.handler = self._import(entry.target)
+            logger.info("Loaded handler for keyword '%s' from %s", keyword, entry.target)
+        return entry.handler
+
+    def get_stream(self, keyword: str) -> Optional[StreamHandler]:
+        """Return the stream handler for ``keyword``, or None if it has none."""
+        entry = self._entry(keyword)
+        if entry is None or entry.stream_target is None:
+            return None
+        if entry.stream_handler is None:
+            entry.stream_handler = self._import(entry.stream_target)
+            logger.info("Loaded stream handler for keyword '%s' from %s", keyword, entry.stream_target)
+        return entry.stream_handler
+
+    def _entry(self, keyword: str) -> Optional[KeywordEntry]:
+        entry = self._entries.get(keyword)
+        if entry is None and not self._entry_points_loaded:
+            self.load_entry_points()
+            entry = self._entries.get(keyword)
+        return entry
+
+    def __contains__(self, keyword: str) -> bool:
+        self.load_entry_points()
+        return keyword in self._entries
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """All known keywords, sorted, without importing any handler."""
+        self.load_entry_points()
+        return [self._entries[k].to_dict() for k in sorted(self._entries)]
+
+    @staticmethod
+    def _import(target: str) -> Handler:
+        module_name, _, attribute = target.partition(":")
+        obj: Any = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            obj = getattr(obj, part)
+        return obj
+
+
+# Shared registry used by the runner dispatcher
+keywords = KeywordRegistry()
@@ -0,0 +1,127 @@
+"""
+Content-addressed cache of test results for idempotent test keywords.
+
+Results are keyed by a hash of the keyword and the canonicalized payload, so
+retried requests with an identical payload are answered without re-running
+the test. Entries expire after a per-keyword TTL and the cache is bounded
+with LRU eviction.
+
+Configuration (environment variables):
+    RESULT_CACHE_ENABLED      "true" to enable the cache (default off)
+    RESULT_CACHE_MAX_ENTRIES  maximum cached results (default 256)
+    RESULT_CACHE_TTL          default TTL in seconds (default 300)
+    RESULT_CACHE_TTLS         per-keyword TTLs, e.g. "create_account=60,create_user=0"
+                              (a TTL of 0 disables caching for that keyword)
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(keyword: str, payload: Dict[str, Any]) -> str:
+    """Return a stable hash of ``keyword`` and the canonical JSON of ``payload``."""
+    canonical = json.dumps(
+        {"keyword": keyword, "payload": payload},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse a "keyword=seconds,keyword=seconds" TTL specification."""
+    ttls = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        keyword, _, seconds = entry.partition("=")
+        try:
+            ttls[keyword.strip()] = float(seconds)
+        except ValueError:
+            logger.warning("Ignoring invalid result cache TTL entry: '%s'", entry)
+    return ttls
+
+
+class ResultCache:
+    """Thread-safe LRU cache of test results with per-keyword TTLs."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        default_ttl: float = 300.0,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["ResultCache"]:
+        """Build a cache from environment variables, or None when disabled."""
+        if os.getenv("RESULT_CACHE_ENABLED", "false").lower() != "true":
+            return None
+        return cls(
+            max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256")),
+            default_ttl=float(os.getenv("RESULT_CACHE_TTL", "300")),
+            ttls=parse_ttls(os.getenv("RESULT_CACHE_TTLS", "")),
+        )
+
+    def ttl_for(self, keyword: str) -> float:
+        return self.ttls.get(keyword, self.default_ttl)
+
+    def get(self, keyword: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result, or None on a miss or expiry."""
+        key = cache_key(keyword, payload)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, keyword: str, payload: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Cache ``result`` unless the keyword's TTL disables caching."""
+        ttl = self.ttl_for(keyword)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        key = cache_key(keyword, payload)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
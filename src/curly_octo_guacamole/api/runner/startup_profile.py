@@ -0,0 +1,113 @@
+"""
+Startup import profiler for the test runner API.
+
+Performs a cold import of a module (default ``app.main``) in a fresh
+interpreter with ``-X importtime`` and reports the import cost per module,
+so regressions in server cold start can be traced to the import responsible.
+
+    pdm run python -m curly_octo_guacamole.api.runner.startup_profile
+    pdm run python -m curly_octo_guacamole.api.runner.startup_profile --top 40 --budget 2.0
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Project root (go up from src/curly_octo_guacamole/api/runner/)
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` stderr into per-module timings (microseconds)."""
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            })
+    return modules
+
+
+def profile_import(module: str = "app.main", cwd: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Import ``module`` in a fresh interpreter and collect its import timings.
+
+    Returns:
+        dict: ``module``, ``returncode``, ``wall_time_s`` of the whole cold
+        start, ``import_time_s`` of the module itself, per-module ``modules``
+        timings and ``error`` output when the import failed.
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=cwd or PROJECT_ROOT,
+        env=os.environ.copy(),
+    )
+    wall_time = time.perf_counter() - start
+
+    modules = parse_importtime(completed.stderr)
+    own = next((m for m in modules if m["module"] == module), None)
+    error = None
+    if completed.returncode != 0:
+        error = "\n".join(l for l in completed.stderr.splitlines() if not l.startswith("import time:"))
+    return {
+        "module": module,
+        "returncode": completed.returncode,
+        "wall_time_s": round(wall_time, 4),
+        "import_time_s": round(own["cumulative_us"] / 1e6, 4) if own else None,
+        "modules": modules,
+        "error": error,
+    }
+
+
+def format_report(profile: Dict[str, Any], top: int = 20) -> str:
+    """Render the most expensive imports of a profile as a text table."""
+    lines = [
+        f"Cold start of {profile['module']}: {profile['wall_time_s']:.3f}s wall, "
+        f"{profile['import_time_s'] or 0:.3f}s importing",
+        f"{'cumulative ms':>14} {'self ms':>9}  module",
+    ]
+    ranked = sorted(profile["modules"], key=lambda m: m["cumulative_us"], reverse=True)
+    for entry in ranked[:top]:
+        lines.append(
+            f"{entry['cumulative_us'] / 1000:>14.1f} {entry['self_us'] / 1000:>9.1f}  "
+            f"{'  ' * entry['depth']}{entry['module']}"
+        )
+    if profile["error"]:
+        lines.append(f"Import failed:\n{profile['error']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report per-module import cost of a cold start.")
+    parser.add_argument("module", nargs="?", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=20, help="Number of modules to list")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Fail (exit 1) if the cold start exceeds this many seconds")
+    args = parser.parse_args(argv)
+
+    profile = profile_import(args.module)
+    print(format_report(profile, top=args.top))
+    if profile["returncode"] != 0:
+        return profile["returncode"]
+    if args.budget is not None and profile["wall_time_s"] > args.budget:
+        print(f"❌ Cold start {profile['wall_time_s']:.3f}s exceeds budget {args.budget:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
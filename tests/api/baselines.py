@@ -0,0 +1,138 @@
+"""
+Seeded baseline datasets for API tests that need related entities.
+
+A baseline is built once per session through the entity API, captured as raw
+BSON documents and restored with one bulk insert per collection before each
+test that asks for it, so a test with a user, account, event and user event
+costs about as much as one on an empty database:
+
+    @pytest.mark.baseline("userevent_graph")
+    def test_something(self, api_context, baseline):
+        user_id = baseline.first_id("users")
+
+Building a baseline only touches the documents its builder creates: they are
+tracked, captured by id and deleted again, so other data in the database
+survives. Restored documents are registered with the test's
+``document_tracker``, so tracked cleanup (API_TEST_CLEANUP=tracked) removes
+them as well.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from playwright.sync_api import APIRequestContext
+
+from .test_utils import APITestHelper, DocumentTracker, MongoDBCleaner, TrackingRequestContext, document_keys
+
+logger = logging.getLogger(__name__)
+
+# Documents are read and written as undecoded BSON
+RAW_BSON = CodecOptions(document_class=RawBSONDocument)
+
+Builder = Callable[[APIRequestContext, APITestHelper], None]
+
+# name -> builder creating the dataset through the API
+BASELINES: Dict[str, Builder] = {}
+
+
+def baseline(name: str) -> Callable[[Builder], Builder]:
+    """Register a baseline dataset builder under ``name``."""
+    def register(builder: Builder) -> Builder:
+        BASELINES[name] = builder
+        return builder
+    return register
+
+
+def create_entity(api: APIRequestContext, helper: APITestHelper, entity: str, data: dict) -> dict:
+    """Create one entity through the API and return it."""
+    response = api.post(helper.get_entity_url(entity), data=data)
+    assert response.ok, f"Could not create {entity} for baseline: {response.status} {response.text()}"
+    return response.json()["data"][0]
+
+
+@baseline("user_with_account")
+def _user_with_account(api: APIRequestContext, helper: APITestHelper) -> None:
+    account = create_entity(api, helper, "account", helper.create_test_data("account"))
+    create_entity(api, helper, "user", {**helper.create_test_data("user"), "accountId": account["id"]})
+
+
+@baseline("userevent_graph")
+def _userevent_graph(api: APIRequestContext, helper: APITestHelper) -> None:
+    account = create_entity(api, helper, "account", helper.create_test_data("account"))
+    user = create_entity(api, helper, "user", {**helper.create_test_data("user"), "accountId": account["id"]})
+    event = create_entity(api, helper, "event", helper.create_test_data("event"))
+    create_entity(api, helper, "userevent", {
+        **helper.create_test_data("userevent"),
+        "userId": user["id"],
+        "eventId": event["id"],
+    })
+
+
+@dataclass
+class Snapshot:
+    """Raw documents of a built baseline, per collection."""
+    name: str
+    documents: Dict[str, List[RawBSONDocument]]
+
+    def ids(self, collection: str) -> List[str]:
+        """String ids of the snapshot's documents in ``collection``."""
+        return [str(document["_id"]) for document in self.documents.get(collection, [])]
+
+    def first_id(self, collection: str) -> str:
+        ids = self.ids(collection)
+        assert ids, f"Baseline '{self.name}' has no documents in {collection}"
+        return ids[0]
+
+
+class SnapshotStore:
+    """Builds each baseline on first use and restores it on demand."""
+
+    def __init__(self, cleaner: MongoDBCleaner, api: APIRequestContext, helper: APITestHelper):
+        self.cleaner = cleaner
+        self.api = api
+        self.helper = helper
+        self._snapshots: Dict[str, Snapshot] = {}
+
+    def get(self, name: str) -> Snapshot:
+        """The snapshot of baseline ``name``, building it the first time."""
+        snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            builder = BASELINES.get(name)
+            if builder is None:
+                raise KeyError(f"Unknown baseline '{name}', expected one of {sorted(BASELINES)}")
+            tracker = DocumentTracker()
+            try:
+                builder(TrackingRequestContext(self.api, tracker), self.helper)
+                snapshot = self._snapshots[name] = self.capture(name, tracker)
+            finally:
+                self.cleaner.delete_tracked(tracker)
+            logger.info("Captured baseline '%s': %s", name,
+                        ", ".join(f"{len(docs)} {collection}" for collection, docs in snapshot.documents.items()))
+        return snapshot
+
+    def capture(self, name: str, tracker: DocumentTracker) -> Snapshot:
+        """Read the documents recorded by ``tracker`` as raw BSON, in id order."""
+        db = self._db()
+        documents = {}
+        for collection, ids in tracker.created.items():
+            docs = db[collection].with_options(codec_options=RAW_BSON).find({"_id": {"$in": document_keys(ids)}})
+            docs = sorted(docs, key=lambda document: str(document["_id"]))
+            if docs:
+                documents[collection] = docs
+        return Snapshot(name, documents)
+
+    def restore(self, snapshot: Snapshot, tracker: Optional[DocumentTracker] = None) -> None:
+        """Insert the snapshot's documents, one bulk insert per collection."""
+        db = self._db()
+        for collection, docs in snapshot.documents.items():
+            db[collection].with_options(codec_options=RAW_BSON).insert_many(docs, ordered=False)
+            if tracker is not None:
+                tracker.track_collection(collection, snapshot.ids(collection))
+
+    def _db(self):
+        if self.cleaner.db is None:
+            self.cleaner.connect()
+        return self.cleaner.db
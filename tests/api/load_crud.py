@@ -0,0 +1,273 @@
+"""
+Concurrent load and stress test for the entity CRUD API.
+
+Fires a weighted mix of create/list/get/update/delete requests across the
+entities at a fixed concurrency (closed loop: each of ``concurrency`` asyncio
+workers sends its next request as soon as the previous one returns) and
+reports throughput and latency percentiles per entity and operation. Request
+bodies come from ``APITestHelper.create_test_data``; get/update/delete act on
+documents created earlier in the run (a create is sent instead while an
+entity has none). Documents left at the end are deleted unless ``--keep``.
+
+    pdm run python -m tests.api.load_crud --concurrency 32 --requests 2000
+    pdm run python -m tests.api.load_crud --entities user,event --mix create=1,get=4 --duration 60
+    pdm run python -m tests.api.load_crud --ramp 8,16,32,64,128 --requests 1000
+
+``--ramp`` repeats the run at increasing concurrency to find where latency
+or errors start to climb.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import APIRequestContext, async_playwright
+
+from curly_octo_guacamole.api.runner.loadgen import format_report, summarize
+from tests.api.test_utils import APITestHelper, ENTITY_COLLECTIONS, worker_config
+
+ENTITIES = tuple(ENTITY_COLLECTIONS)
+OPERATIONS = ("create", "list", "get", "update", "delete")
+
+# Relative weight of each operation
+DEFAULT_MIX = {"create": 3, "list": 2, "get": 3, "update": 1, "delete": 1}
+
+# Fields made unique per request so creates don't collide
+UNIQUE_FIELDS = ("username", "email", "url", "title", "name", "tag")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "create=3,get=5" into operation weights."""
+    mix = {}
+    for entry in spec.split(","):
+        operation, _, weight = entry.strip().partition("=")
+        if not operation:
+            continue
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}', expected one of {list(OPERATIONS)}")
+        mix[operation] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("Operation mix has no positive weights")
+    return mix
+
+
+def make_payload(helper: APITestHelper, entity: str, sequence: int) -> Dict[str, Any]:
+    """Test data for ``entity`` with its identifying fields made unique."""
+    data = helper.create_test_data(entity)
+    for field in UNIQUE_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            data[field] = f"load{sequence}.{value}" if field == "email" else f"{value}-load{sequence}"
+    return data
+
+
+class CrudLoadTest:
+    """Runs a CRUD request mix against the entity API and collects timings."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        entities: Optional[List[str]] = None,
+        mix: Optional[Dict[str, float]] = None,
+        concurrency: int = 16,
+        requests: Optional[int] = 1000,
+        duration: Optional[float] = None,
+        timeout: float = 30.0,
+        seed: Optional[int] = None,
+        keep: bool = False,
+    ):
+        config = worker_config()
+        self.base_url = base_url or config.api_base_url
+        self.headers = config.api_headers
+        self.helper = APITestHelper(self.base_url)
+        self.entities = list(entities or ENTITIES)
+        unknown = [entity for entity in self.entities if entity not in ENTITY_COLLECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown entities: {', '.join(unknown)}")
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.timeout = timeout
+        self.keep = keep
+        self._random = random.Random(seed)
+        self._ids: Dict[str, List[str]] = {}
+        self._results: List[Dict[str, Any]] = []
+        self._sent = 0
+        self._sequence = 0
+
+    def run(self) -> Dict[str, Any]:
+        """Run the load test and return its report."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run_async())
+        # Called inside an event loop (e.g. next to Playwright's sync API): use a thread of its own
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(lambda: asyncio.run(self.run_async())).result()
+
+    async def run_async(self) -> Dict[str, Any]:
+        self._ids = {entity: [] for entity in self.entities}
+        self._results = []
+        self._sent = 0
+        async with async_playwright() as playwright:
+            api = await playwright.request.new_context(
+                extra_http_headers=self.headers or None, timeout=self.timeout * 1000
+            )
+            try:
+                started = time.perf_counter()
+                deadline = started + self.duration if self.duration else None
+                await asyncio.gather(*(self._worker(api, deadline) for _ in range(self.concurrency)))
+                elapsed = time.perf_counter() - started
+                if not self.keep:
+                    await self._cleanup(api)
+            finally:
+                await api.dispose()
+        return self._report(elapsed)
+
+    def _next_request(self) -> bool:
+        if self.requests is not None and self._sent >= self.requests:
+            return False
+        self._sent += 1
+        return True
+
+    async def _worker(self, api: APIRequestContext, deadline: Optional[float]) -> None:
+        operations = list(self.mix)
+        weights = [self.mix[operation] for operation in operations]
+        while self._next_request():
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            entity = self._random.choice(self.entities)
+            operation = self._random.choices(operations, weights)[0]
+            await self._send(api, entity, operation)
+
+    async def _send(self, api: APIRequestContext, entity: str, operation: str) -> None:
+        ids = self._ids[entity]
+        if operation in ("get", "update", "delete") and not ids:
+            operation = "create"
+        entity_id = None
+        if operation in ("get", "update", "delete"):
+            # Checked out of the pool so no other worker deletes it meanwhile
+            entity_id = ids.pop(self._random.randrange(len(ids)))
+
+        url = self.helper.get_entity_url(entity, entity_id)
+        self._sequence += 1
+        start = time.perf_counter()
+        status, error = None, None
+        try:
+            if operation == "create":
+                response = await api.post(url, data=make_payload(self.helper, entity, self._sequence))
+            elif operation == "update":
+                response = await api.put(url, data=make_payload(self.helper, entity, self._sequence))
+            elif operation == "delete":
+                response = await api.delete(url)
+            else:
+                response = await api.get(url)
+            status = response.status
+            if operation == "create" and response.ok:
+                created = (await response.json()).get("data") or []
+                if created and isinstance(created[0], dict) and created[0].get("id"):
+                    ids.append(created[0]["id"])
+        except Exception as e:
+            error = type(e).__name__
+        if operation in ("get", "update"):
+            ids.append(entity_id)
+        elif operation == "delete" and (status is None or status >= 400) and status != 404:
+            # Still exists: back into the pool so later requests and the cleanup see it
+            ids.append(entity_id)
+        self._results.append({
+            "label": f"{entity} {operation}",
+            "status": status,
+            "error": error,
+            "latency": time.perf_counter() - start,
+        })
+
+    async def _cleanup(self, api: APIRequestContext) -> None:
+        """Delete the documents the run left behind."""
+        for entity, ids in self._ids.items():
+            await asyncio.gather(
+                *(api.delete(self.helper.get_entity_url(entity, entity_id)) for entity_id in ids),
+                return_exceptions=True,
+            )
+            ids.clear()
+
+    def _report(self, elapsed: float) -> Dict[str, Any]:
+        def failed(result):
+            return result["status"] is None or result["status"] >= 400
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        statuses: Dict[str, int] = {}
+        for result in self._results:
+            groups.setdefault(result["label"], []).append(result)
+            code = str(result["status"]) if result["status"] is not None else result["error"]
+            statuses[code] = statuses.get(code, 0) + 1
+        return {
+            "config": {
+                "base_url": self.base_url,
+                "entities": self.entities,
+                "mix": self.mix,
+                "concurrency": self.concurrency,
+                "requests": self.requests,
+                "duration": self.duration,
+            },
+            "duration_s": round(elapsed, 3),
+            "overall": summarize(
+                [r["latency"] for r in self._results], sum(1 for r in self._results if failed(r)), elapsed
+            ),
+            "status_codes": statuses,
+            "endpoints": {
+                label: summarize([r["latency"] for r in results], sum(1 for r in results if failed(r)), elapsed)
+                for label, results in sorted(groups.items())
+            },
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent CRUD load test for the entity API.")
+    parser.add_argument("--base-url", default=None, help="Entity API (default API_BASE_URL)")
+    parser.add_argument("--entities", default=",".join(ENTITIES), help="Comma-separated entities")
+    parser.add_argument("--mix", default=None,
+                        help="Operation weights, e.g. create=3,list=2,get=3,update=1,delete=1")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--ramp", default=None, help="Comma-separated concurrency levels run one after another")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per run (0 for no limit)")
+    parser.add_argument("--duration", type=float, default=None, help="Stop each run after this many seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for the request mix")
+    parser.add_argument("--keep", action="store_true", help="Keep the documents created by the run")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+    if not args.requests and not args.duration:
+        parser.error("--requests 0 needs --duration")
+
+    levels = [int(level) for level in args.ramp.split(",")] if args.ramp else [args.concurrency]
+    reports = []
+    for concurrency in levels:
+        report = CrudLoadTest(
+            base_url=args.base_url,
+            entities=[entity.strip() for entity in args.entities.split(",") if entity.strip()],
+            mix=parse_mix(args.mix) if args.mix else None,
+            concurrency=concurrency,
+            requests=args.requests or None,
+            duration=args.duration,
+            timeout=args.timeout,
+            seed=args.seed,
+            keep=args.keep,
+        ).run()
+        print(f"\nconcurrency {concurrency}")
+        print(format_report(report))
+        reports.append(report)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(reports if args.ramp else reports[0], file, indent=2, sort_keys=True)
+            file.write("\n")
+    return 1 if any(report["overall"]["requests"] == 0 for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
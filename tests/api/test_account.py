@@ -10,6 +10,7 @@ from datetime import datetime
 import pytest
 import os
 import json
+from curly_octo_guacamole.api.controllers.payload_channel import read_payload
 from .test_utils import APITestHelper, clean_collections, api_context, api_helper
 
 class TestAccountAPI:
@@ -18,57 +19,45 @@ class TestAccountAPI:
     def test_create_account(self, api_context, api_helper: APITestHelper, clean_collections) -> None:
         """Test creating a new account."""
 
-        # Check if we're running through the controller (environment variable set)
-        test_data_env = os.environ.get('TEST_DATA')
-        if test_data_env:
-            try:
-                # Parse the test data from environment variable
-                controller_data = json.loads(test_data_env)
-                # logger.info(f"Using test data from controller: {controller_data}") # Assuming logger is available
-                
-                # Extract relevant data for the test
-                test_data = {
-                    "expiredAt": controller_data.get("expired_at")
-                }
-            except (json.JSONDecodeError, KeyError) as e:
-                # logger.warning(f"Failed to parse controller test data: {e}") # Assuming logger is available
-                # Fall back to default test data
-                test_data = api_helper.create_test_data("account")
+        # Use the controller's payload when running through it, defaults otherwise.
+        # A data-driven payload creates one account per entry of its records.
+        controller_data = read_payload("account")
+        if controller_data is not None:
+            entries = controller_data.get("records") or [controller_data]
+            cases = [{"expiredAt": entry.get("expired_at")} for entry in entries]
         else:
             # Use default test data for regular PyTest runs
-            test_data = api_helper.create_test_data("account")
+            cases = [api_helper.create_test_data("account")]
 
         url = api_helper.get_entity_url("account")
 
-        # Act
-        response = api_context.post(url, data=test_data)
-        expect(response).to_be_ok()
+        for test_data in cases:
+            # Act
+            response = api_context.post(url, data=test_data)
+            expect(response).to_be_ok()
 
-        payload = response.json()
+            payload = response.json()
 
-        # Assert response structure
-        api_helper.validate_response_structure(payload)
-        assert payload["status"] == "completed"
+            # Assert response structure
+            api_helper.validate_response_structure(payload)
+            assert payload["status"] == "completed"
 
-        # Assert data contains created account
-        data = payload["data"]
-        assert isinstance(data, list), f"'data' should be a list, got {type(data)}"
-        assert len(data) == 1, f"Expected exactly one account, got {len(data)}"
+            # Assert data contains created account
+            data = payload["data"]
+            assert isinstance(data, list), f"'data' should be a list, got {type(data)}"
+            assert len(data) == 1, f"Expected exactly one account, got {len(data)}"
 
-        account = data[0]
-        assert "id" in account, "Missing 'id' in account object"
-        if test_data.get("expiredAt"):
-            assert account["expiredAt"] == test_data["expiredAt"]
-        api_helper.validate_entity_timestamps(account)
+            account = data[0]
+            assert "id" in account, "Missing 'id' in account object"
+            if test_data.get("expiredAt"):
+                assert account["expiredAt"] == test_data["expiredAt"]
+            api_helper.validate_entity_timestamps(account)
 
-    def test_fetch_account_list(self, playwright: Playwright) -> None:
+    def test_fetch_account_list(self, api_context, api_helper: APITestHelper) -> None:
         """Test fetching an account list."""
 
-        # Create a new APIRequestContext
-        request_context = playwright.request.new_context()
-
         # Perform the GET
-        response = request_context.get("http://localhost:5500/api/account")
+        response = api_context.get(api_helper.get_entity_url("account"))
         expect(response).to_be_ok()  # 2xx
 
         # Deserialize JSON
@@ -104,21 +93,15 @@ class TestAccountAPI:
                 except ValueError:
                     pytest.fail(f"{ts_key} in item #{idx} is not valid ISO datetime: {ts_val}")
 
-        # Clean up
-        request_context.dispose()
-
     @pytest.mark.parametrize("account_id", [
         "687139d80e46574d4becf42c",
         # add more account IDs here as needed
     ])
 
-    def test_get_account_by_id(self, playwright: Playwright, account_id: str) -> None:
-        # Arrange
-        ctx = playwright.request.new_context()
-
+    def test_get_account_by_id(self, api_context, api_helper: APITestHelper, account_id: str) -> None:
         # Act
-        url = f"http://localhost:5500/api/account/{account_id}"
-        response = ctx.get(url)
+        url = api_helper.get_entity_url("account", account_id)
+        response = api_context.get(url)
         expect(response).to_be_ok()
 
         payload = response.json()
@@ -160,6 +143,3 @@ class TestAccountAPI:
                 datetime.fromisoformat(ts)
             except Exception:
                 pytest.fail(f"{ts_key} is not valid ISO datetime: {ts}")
-
-        # Cleanup
-        ctx.dispose()    
\ No newline at end of file
@@ -1,15 +1,13 @@
 from playwright.sync_api import Playwright, expect
+from .test_utils import api_context, worker_config
 
-def test_fetch_user_data(playwright: Playwright) -> None:
+def test_fetch_user_data(api_context) -> None:
     # Configuration
-    API_ROOT = "http://localhost:5500"
+    API_ROOT = worker_config().api_base_url
     API_METADATA = f"{API_ROOT}/api/metadata"
 
-    # Create an API request context
-    request_context = playwright.request.new_context()
-
     # Make a GET request to the API endpoint
-    response = request_context.get(API_METADATA)
+    response = api_context.get(API_METADATA)
     print(response)  # <APIResponse ... status=200>
 
     # Assert that the response is successful (status code 2xx)
@@ -29,4 +27,3 @@ def test_fetch_user_data(playwright: Playwright) -> None:
 
     assert metadata["projectName"] == "Events", "Project name does not match expected value"
     print("Metadata fetched successfully:", metadata)
-    request_context.dispose()
\ No newline at end of file
@@ -8,6 +8,7 @@ import os
 import json
 from datetime import datetime
 from playwright.sync_api import Playwright, expect
+from curly_octo_guacamole.api.controllers.payload_channel import read_payload
 from .test_utils import APITestHelper, clean_collections, api_context, api_helper
 
 
@@ -17,67 +18,65 @@ class TestUserAPI:
     def test_create_user(self, api_context, api_helper: APITestHelper, clean_collections) -> None:
         """Test creating a new user."""
         
-        # Check if we're running through the controller (environment variable set)
-        test_data_env = os.environ.get('TEST_DATA')
-        if test_data_env:
-            try:
-                # Parse the test data from environment variable
-                controller_data = json.loads(test_data_env)
-                
-                # Extract relevant data for the test
-                test_data = {
-                    "username": controller_data.get("username", "testuser123"),
-                    "email": controller_data.get("email", "test@example.com"),
-                    "password": controller_data.get("password", "testpassword123"),
-                    "firstName": controller_data.get("first_name", "Test"),
-                    "lastName": controller_data.get("last_name", "User"),
-                    "gender": controller_data.get("gender", "other"),
-                    "isAccountOwner": controller_data.get("is_account_owner", True),
-                    "netWorth": controller_data.get("net_worth", 50000),
-                    "accountId": controller_data.get("account_id", "507f1f77bcf86cd799439011")
+        # Use the controller's payload when running through it, defaults otherwise.
+        # A data-driven payload creates one user per entry of its records.
+        controller_data = read_payload("user")
+        if controller_data is not None:
+            entries = controller_data.get("records") or [controller_data]
+            cases = [
+                {
+                    "username": entry.get("username", f"testuser{index}"),
+                    "email": entry.get("email", f"test{index}@example.com"),
+                    "password": entry.get("password", "testpassword123"),
+                    "firstName": entry.get("first_name", "Test"),
+                    "lastName": entry.get("last_name", "User"),
+                    "gender": entry.get("gender", "other"),
+                    "isAccountOwner": entry.get("is_account_owner", True),
+                    "netWorth": entry.get("net_worth", 50000),
+                    "accountId": entry.get("account_id", "507f1f77bcf86cd799439011")
                 }
-            except (json.JSONDecodeError, KeyError) as e:
-                # Fall back to default test data
-                test_data = api_helper.create_test_data("user")
+                for index, entry in enumerate(entries, start=123)
+            ]
         else:
             # Use default test data for regular PyTest runs
-            test_data = api_helper.create_test_data("user")
+            cases = [api_helper.create_test_data("user")]
 
         url = api_helper.get_entity_url("user")
 
-        # Act
-        response = api_context.post(url, data=test_data)
-        expect(response).to_be_ok()
-
-        payload = response.json()
-
-        # Assert response structure
-        api_helper.validate_response_structure(payload)
-        assert payload["status"] == "completed"
-
-        # Assert data contains created user
-        data = payload["data"]
-        assert isinstance(data, list), f"'data' should be a list, got {type(data)}"
-        assert len(data) == 1, f"Expected exactly one user, got {len(data)}"
-
-        user = data[0]
-        required_fields = ["id", "username", "email", "firstName", "lastName", 
-                          "isAccountOwner", "netWorth", "accountId", "createdAt", "updatedAt"]
-        for field in required_fields:
-            assert field in user, f"Missing '{field}' in user object"
-
-        assert user["username"] == test_data["username"]
-        assert user["email"] == test_data["email"]
-        assert user["firstName"] == test_data["firstName"]
-        assert user["lastName"] == test_data["lastName"]
-        assert user["isAccountOwner"] == test_data["isAccountOwner"]
-        assert user["netWorth"] == test_data["netWorth"]
-        assert user["accountId"] == test_data["accountId"]
-        
-        # Password should not be returned in response
-        # assert "password" not in user, "Password should not be returned in response"
-        
-        api_helper.validate_entity_timestamps(user)
+        for test_data in cases:
+            # Act
+            response = api_context.post(url, data=test_data)
+            expect(response).to_be_ok()
+
+            payload = response.json()
+
+            # Assert response structure
+            api_helper.validate_response_structure(payload)
+            assert payload["status"] == "completed"
+
+            # Assert data contains created user
+            data = payload["data"]
+            assert isinstance(data, list), f"'data' should be a list, got {type(data)}"
+            assert len(data) == 1, f"Expected exactly one user, got {len(data)}"
+
+            user = data[0]
+            required_fields = ["id", "username", "email", "firstName", "lastName", 
+                              "isAccountOwner", "netWorth", "accountId", "createdAt", "updatedAt"]
+            for field in required_fields:
+                assert field in user, f"Missing '{field}' in user object"
+
+            assert user["username"] == test_data["username"]
+            assert user["email"] == test_data["email"]
+            assert user["firstName"] == test_data["firstName"]
+            assert user["lastName"] == test_data["lastName"]
+            assert user["isAccountOwner"] == test_data["isAccountOwner"]
+            assert user["netWorth"] == test_data["netWorth"]
+            assert user["accountId"] == test_data["accountId"]
+            
+            # Password should not be returned in response
+            # assert "password" not in user, "Password should not be returned in response"
+            
+            api_helper.validate_entity_timestamps(user)
 
     def test_list_users_empty(self, api_context, api_helper: APITestHelper, clean_collections) -> None:
         """Test listing users when none exist."""
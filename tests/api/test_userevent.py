@@ -191,6 +191,25 @@ class TestUserEventAPI:
         # Validate timestamps
         api_helper.validate_entity_timestamps(userevent)
 
+    @pytest.mark.baseline("userevent_graph")
+    def test_get_seeded_userevent_with_real_references(self, api_context, api_helper: APITestHelper, baseline) -> None:
+        """Test a user event whose user and event exist, restored from the seeded baseline."""
+        # Arrange - user, account, event and user event come from the snapshot
+        userevent_id = baseline.first_id("userevents")
+
+        # Act
+        response = api_context.get(api_helper.get_entity_url("userevent", userevent_id))
+        expect(response).to_be_ok()
+
+        # Assert the references resolve to the seeded entities
+        userevent = response.json()["data"][0]
+        assert userevent["userId"] == baseline.first_id("users")
+        assert userevent["eventId"] == baseline.first_id("events")
+
+        user_response = api_context.get(api_helper.get_entity_url("user", userevent["userId"]))
+        expect(user_response).to_be_ok()
+        assert user_response.json()["data"][0]["accountId"] == baseline.first_id("accounts")
+
     def test_get_nonexistent_userevent(self, api_context, api_helper: APITestHelper, clean_collections) -> None:
         """Test retrieving a non-existent user event returns 404."""
         # Arrange
@@ -1,18 +1,232 @@
 """
 Test utilities for API testing with MongoDB cleanup functionality.
+
+Configuration (environment variables):
+    MONGO_URL           MongoDB connection string (default mongodb://localhost:27017)
+    MONGO_DB_NAME       database of the entity API under test (default events_test)
+    API_BASE_URL        entity API under test (default http://localhost:5500)
+    API_TEST_ISOLATION  ``database`` gives each parallel worker its own database
+                        (``<MONGO_DB_NAME>_<worker>``, e.g. events_test_gw1), default ``none``
+    API_BASE_URLS       in database isolation, one entity API per worker (comma-separated;
+                        worker N uses the Nth, which must be configured with that worker's database)
+    API_DB_HEADER       in database isolation, header naming the worker's database on every
+                        request, for an entity API that selects its database per request
+    TEST_WORKER_ID      worker name when not running under pytest-xdist (PYTEST_XDIST_WORKER)
+    API_TEST_CLEANUP    ``all`` (default) wipes every collection before and after each test;
+                        ``tracked`` deletes only the documents the test created
+    API_CONTEXT_SCOPE   ``session`` (default) shares one keep-alive request context across
+                        tests; ``function`` creates a fresh context per test
 """
 
+import os
+import re
+import time
 import pytest
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+from bson import ObjectId
 from pymongo import MongoClient
 from playwright.sync_api import Playwright, APIRequestContext
 
+
+@dataclass(frozen=True)
+class WorkerConfig:
+    """Database and entity API used by this test worker."""
+    worker_id: Optional[str]
+    mongo_url: str
+    db_name: str
+    api_base_url: str
+    api_headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def isolated(self) -> bool:
+        return self.worker_id is not None
+
+
+def worker_index(worker_id: str) -> int:
+    """Number of a worker name such as "gw3" (0 when it has none)."""
+    match = re.search(r"(\d+)$", worker_id)
+    return int(match.group(1)) if match else 0
+
+
+@lru_cache(maxsize=None)
+def worker_config() -> WorkerConfig:
+    """Resolve this worker's database and entity API from the environment."""
+    mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+    db_name = os.getenv("MONGO_DB_NAME", "events_test")
+    api_base_url = os.getenv("API_BASE_URL", "http://localhost:5500")
+    worker_id = os.getenv("PYTEST_XDIST_WORKER") or os.getenv("TEST_WORKER_ID")
+    if os.getenv("API_TEST_ISOLATION", "none").lower() != "database" or not worker_id:
+        return WorkerConfig(None, mongo_url, db_name, api_base_url)
+
+    worker_db = f"{db_name}_{worker_id}"
+    headers = {}
+    base_urls = [url.strip() for url in os.getenv("API_BASE_URLS", "").split(",") if url.strip()]
+    if base_urls:
+        api_base_url = base_urls[worker_index(worker_id) % len(base_urls)]
+    elif os.getenv("API_DB_HEADER"):
+        headers[os.environ["API_DB_HEADER"]] = worker_db
+    else:
+        raise RuntimeError(
+            "API_TEST_ISOLATION=database needs API_BASE_URLS or API_DB_HEADER "
+            "to point the entity API at each worker's database"
+        )
+    return WorkerConfig(worker_id, mongo_url, worker_db, api_base_url, headers)
+
+
+# Entity name in API paths -> MongoDB collection
+ENTITY_COLLECTIONS = {
+    "account": "accounts",
+    "user": "users",
+    "profile": "profiles",
+    "tagaffinity": "tagaffinities",
+    "event": "events",
+    "userevent": "userevents",
+    "url": "urls",
+    "crawl": "crawls",
+}
+
+
+def document_keys(ids) -> List:
+    """MongoDB ``_id`` values for API ids (ObjectIds where they parse as one)."""
+    return [ObjectId(i) if ObjectId.is_valid(i) else i for i in ids]
+
+
+def cleanup_mode() -> str:
+    """``all`` or ``tracked`` (API_TEST_CLEANUP)."""
+    return os.getenv("API_TEST_CLEANUP", "all").lower()
+
+
+class DocumentTracker:
+    """Ids of the documents a test created, per collection."""
+    
+    def __init__(self):
+        self.created: Dict[str, set] = {}
+    
+    def track(self, entity_name: str, entity_id: str) -> None:
+        """Record a document of ``entity_name`` for cleanup."""
+        collection = ENTITY_COLLECTIONS.get(entity_name.lower())
+        if collection and entity_id:
+            self.created.setdefault(collection, set()).add(entity_id)
+    
+    def track_collection(self, collection: str, ids: List[str]) -> None:
+        """Record documents of ``collection`` by id for cleanup."""
+        self.created.setdefault(collection, set()).update(ids)
+    
+    def track_response(self, url: str, response) -> None:
+        """Record the entities returned by a successful create/update call."""
+        parts = urlparse(url).path.strip("/").split("/")
+        if len(parts) < 2 or parts[0] != "api" or not response.ok:
+            return
+        try:
+            data = response.json().get("data")
+        except Exception:
+            return
+        for entity in data if isinstance(data, list) else [data]:
+            if isinstance(entity, dict):
+                self.track(parts[1], entity.get("id"))
+    
+    def clear(self) -> None:
+        self.created.clear()
+
+
+class TrackingRequestContext:
+    """APIRequestContext that records the documents created through it."""
+    
+    def __init__(self, context: APIRequestContext, tracker: DocumentTracker):
+        self._context = context
+        self.tracker = tracker
+    
+    def post(self, url: str, **kwargs):
+        response = self._context.post(url, **kwargs)
+        self.tracker.track_response(url, response)
+        return response
+    
+    def put(self, url: str, **kwargs):
+        response = self._context.put(url, **kwargs)
+        self.tracker.track_response(url, response)
+        return response
+    
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+class APIContextPool:
+    """
+    One keep-alive APIRequestContext shared by the tests of a session.
+    
+    Headers are passed per request, so the only state a test can leave behind
+    is cookies; the context is recycled after a test that received any. Setup
+    and reset times are recorded to report the time saved against a context
+    per test.
+    """
+    
+    def __init__(self, playwright: Playwright, headers: Optional[Dict[str, str]] = None):
+        self.playwright = playwright
+        self.headers = headers or None
+        self.context: Optional[APIRequestContext] = None
+        self.tests = 0
+        self.recycled = 0
+        self.created_s: List[float] = []
+        self.reset_s = 0.0
+    
+    def new_context(self) -> APIRequestContext:
+        """Create a context, recording how long it took."""
+        start = time.perf_counter()
+        context = self.playwright.request.new_context(extra_http_headers=self.headers)
+        self.created_s.append(time.perf_counter() - start)
+        return context
+    
+    def acquire(self) -> APIRequestContext:
+        """The shared context for the next test."""
+        if self.context is None:
+            self.context = self.new_context()
+        self.tests += 1
+        return self.context
+    
+    def reset(self) -> None:
+        """Drop per-test state: recycle the context if the test picked up cookies."""
+        if self.context is None:
+            return
+        start = time.perf_counter()
+        if self.context.storage_state()["cookies"]:
+            self.context.dispose()
+            self.context = None
+            self.recycled += 1
+        self.reset_s += time.perf_counter() - start
+    
+    def close(self) -> None:
+        if self.context is not None:
+            self.context.dispose()
+            self.context = None
+    
+    def summary(self) -> str:
+        """Per-test overhead of the shared context and the estimated time saved."""
+        if not self.tests or not self.created_s:
+            return "api_context pool: no tests"
+        per_context = sum(self.created_s) / len(self.created_s)
+        shared = (sum(self.created_s) + self.reset_s) / self.tests
+        return (
+            f"api_context pool: {self.tests} tests, {len(self.created_s)} contexts "
+            f"({self.recycled} recycled), {shared * 1000:.2f} ms/test vs {per_context * 1000:.2f} ms/test "
+            f"for a new context, saved ~{(per_context - shared) * self.tests * 1000:.0f} ms"
+        )
+
+
+def api_context_scope() -> str:
+    """``session`` or ``function`` (API_CONTEXT_SCOPE)."""
+    return os.getenv("API_CONTEXT_SCOPE", "session").lower()
+
+
 class MongoDBCleaner:
     """Utility class for cleaning up MongoDB collections during testing."""
     
-    def __init__(self, connection_string: str = "mongodb://localhost:27017", db_name: str = "events_test"):
-        self.connection_string = connection_string
-        self.db_name = db_name
+    def __init__(self, connection_string: Optional[str] = None, db_name: Optional[str] = None):
+        config = worker_config()
+        self.connection_string = connection_string or config.mongo_url
+        self.db_name = db_name or config.db_name
         self.client = None
         self.db = None
     
@@ -43,6 +257,28 @@ class MongoDBCleaner:
             except Exception as e:
                 print(f"Warning: Could not clean collection {collection_name}: {e}")
     
+    def delete_tracked(self, tracker: DocumentTracker):
+        """Delete only the tracked documents: one bulk delete per touched collection."""
+        if self.db is None:
+            self.connect()
+        
+        for collection_name, ids in tracker.created.items():
+            if not ids:
+                continue
+            try:
+                result = self.db[collection_name].delete_many({"_id": {"$in": document_keys(ids)}})
+                print(f"Deleted {result.deleted_count} tracked documents from {collection_name}")
+            except Exception as e:
+                print(f"Warning: Could not delete tracked documents from {collection_name}: {e}")
+        tracker.clear()
+    
+    def drop_database(self):
+        """Drop the whole database (used for per-worker databases)."""
+        if self.client is None:
+            self.connect()
+        self.client.drop_database(self.db_name)
+        print(f"Dropped database: {self.db_name}")
+    
     def clean_collection(self, collection_name: str):
         """Remove all documents from a specific collection."""
         if self.db is None:
@@ -58,8 +294,8 @@ class MongoDBCleaner:
 class APITestHelper:
     """Helper class for API testing operations."""
     
-    def __init__(self, base_url: str = "http://localhost:5500"):
-        self.base_url = base_url
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url or worker_config().api_base_url
     
     def get_entity_url(self, entity_name: str, entity_id: Optional[str] = None) -> str:
         """Get the full URL for an entity endpoint."""
@@ -152,25 +388,14 @@ class APITestHelper:
         return test_data.get(entity_type.lower(), {})
 
 
-@pytest.fixture(scope="session")
-def mongodb_cleaner():
-    """Pytest fixture for MongoDB cleanup."""
-    cleaner = MongoDBCleaner()
-    cleaner.connect()
-    
-    # Clean before tests start
-    cleaner.clean_all_collections()
-    
-    yield cleaner
-    
-    # Clean after tests complete
-    cleaner.clean_all_collections()
-    cleaner.disconnect()
-
-
 @pytest.fixture(scope="function")
-def clean_collections(mongodb_cleaner):
-    """Pytest fixture to clean collections before each test."""
+def clean_collections(mongodb_cleaner, document_tracker):
+    """Pytest fixture to clean collections before each test (``mongodb_cleaner`` lives in tests/conftest.py)."""
+    if cleanup_mode() == "tracked":
+        # The session starts clean and every test removes what it created
+        yield
+        mongodb_cleaner.delete_tracked(document_tracker)
+        return
     mongodb_cleaner.clean_all_collections()
     yield
     # Clean after each test as well
@@ -184,22 +409,27 @@ def api_helper():
 
 
 @pytest.fixture(scope="function")
-def api_context(playwright: Playwright):
-    """Pytest fixture for Playwright API request context."""
-    context = playwright.request.new_context()
-    yield context
-    context.dispose()
+def api_context(playwright: Playwright, document_tracker, api_context_pool):
+    """Pytest fixture for Playwright API request context (shared keep-alive context by default)."""
+    if api_context_scope() == "function":
+        context = playwright.request.new_context(extra_http_headers=worker_config().api_headers or None)
+        yield TrackingRequestContext(context, document_tracker)
+        context.dispose()
+        return
+    yield TrackingRequestContext(api_context_pool.acquire(), document_tracker)
+    api_context_pool.reset()
 
 
-def wait_for_api_ready(base_url: str = "http://localhost:5500", timeout: int = 30) -> bool:
+def wait_for_api_ready(base_url: Optional[str] = None, timeout: int = 30) -> bool:
     """Wait for the API server to be ready."""
     import time
     import requests
     
+    base_url = base_url or worker_config().api_base_url
     start_time = time.time()
     while time.time() - start_time < timeout:
         try:
-            response = requests.get(f"{base_url}/api/metadata", timeout=5)
+            response = requests.get(f"{base_url}/api/metadata", headers=worker_config().api_headers, timeout=5)
             if response.status_code == 200:
                 return True
         except requests.exceptions.RequestException:
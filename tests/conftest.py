@@ -17,6 +17,9 @@ def get_base_url():
 # Configure pytest-playwright settings from environment variables
 def pytest_configure(config):
     """Configure pytest-playwright settings from environment variables."""
+    config.addinivalue_line(
+        "markers", "baseline(name): restore the named seeded dataset (tests/api/baselines.py) before the test"
+    )
     # Set playwright settings based on .env values
     if os.getenv("HEADLESS"):
         headless = os.getenv("HEADLESS", "false").lower() == "true"
@@ -64,36 +67,56 @@ def browser_type_launch_args(browser_type_launch_args):
 
 @pytest.fixture(scope="session")
 def mongodb_cleaner():
-    """Pytest fixture for MongoDB cleanup."""
-    class MongoDBCleaner:
-        def __init__(self, connection_string: str = "mongodb://localhost:27017", db_name: str = "events_test"):
-            self.connection_string = connection_string
-            self.db_name = db_name
-            self.client = None
-            self.db = None
-        def connect(self):
-            self.client = MongoClient(self.connection_string)
-            self.db = self.client[self.db_name]
-        def disconnect(self):
-            if self.client:
-                self.client.close()
-        def clean_all_collections(self):
-            if self.db is None:
-                self.connect()
-            
-            collections = [
-                "accounts", "users", "profiles", "tagaffinities", 
-                "events", "userevents", "urls", "crawls"
-            ]
-            for collection_name in collections:
-                try:
-                    self.db[collection_name].delete_many({})
-                    print(f"Cleaned collection: {collection_name}")
-                except Exception as e:
-                    print(f"Warning: Could not clean collection {collection_name}: {e}")
+    """Pytest fixture for MongoDB cleanup of this worker's database."""
+    from tests.api.test_utils import MongoDBCleaner, worker_config
+
     cleaner = MongoDBCleaner()
     cleaner.connect()
     cleaner.clean_all_collections()
     yield cleaner
-    cleaner.clean_all_collections()
-    cleaner.disconnect() 
\ No newline at end of file
+    if worker_config().isolated:
+        cleaner.drop_database()
+    else:
+        cleaner.clean_all_collections()
+    cleaner.disconnect()
+
+
+@pytest.fixture(scope="function")
+def document_tracker():
+    """Documents created by the current test through ``api_context``."""
+    from tests.api.test_utils import DocumentTracker
+
+    return DocumentTracker()
+
+
+@pytest.fixture(scope="session")
+def baseline_snapshots(playwright, mongodb_cleaner):
+    """Seeded baseline datasets, each built once per session."""
+    from tests.api.baselines import SnapshotStore
+    from tests.api.test_utils import APITestHelper, worker_config
+
+    context = playwright.request.new_context(extra_http_headers=worker_config().api_headers or None)
+    yield SnapshotStore(mongodb_cleaner, context, APITestHelper())
+    context.dispose()
+
+
+@pytest.fixture(scope="function")
+def baseline(request, baseline_snapshots, document_tracker, clean_collections):
+    """Restore the dataset named by the test's ``baseline`` marker and return its snapshot."""
+    marker = request.node.get_closest_marker("baseline")
+    if marker is None or not marker.args:
+        raise pytest.UsageError(f"{request.node.nodeid} uses the baseline fixture without @pytest.mark.baseline(name)")
+    snapshot = baseline_snapshots.get(marker.args[0])
+    baseline_snapshots.restore(snapshot, document_tracker)
+    return snapshot
+
+
+@pytest.fixture(scope="session")
+def api_context_pool(playwright):
+    """Keep-alive request context shared by the ``api_context`` of every test."""
+    from tests.api.test_utils import APIContextPool, worker_config
+
+    pool = APIContextPool(playwright, worker_config().api_headers)
+    yield pool
+    pool.close()
+    print(pool.summary())
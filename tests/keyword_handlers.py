@@ -0,0 +1,74 @@
+# tests/keyword_handlers.py
+"""
+Handlers for the built-in test keywords.
+
+Imported lazily by the keyword registry the first time one of these keywords
+is dispatched (see `tests/playwright_runner.py`).
+"""
+import logging
+from typing import Iterator
+
+from curly_octo_guacamole.api.controllers.controller import Controller
+from curly_octo_guacamole.api.runner.registry import keywords
+
+logger = logging.getLogger(__name__)
+
+@keywords.register("create_account", description="Create an account through the API or UI test")
+def run_create_account_test(data: dict) -> dict:
+    """
+    Run the account creation test using Playwright.
+    """
+    logger.info("🧪 ACCOUNT CREATION TEST STARTED: Creating account with expiration date from the request data", extra={"request_data": dict(data)})
+
+    if data["ui_test"]:
+        test_type = "ui"
+    else:
+        test_type = "api"
+
+    # Add test_type to data for controller routing
+    data["test_type"] = "account"
+
+    controller = Controller()
+    result = controller.run_test(test_type, data)
+    logger.info("Test Result: %s", result)
+
+    # Return the actual controller result instead of hardcoded response
+    return result
+
+@keywords.register("create_user", description="Create a user through the API or UI test")
+def run_create_user_test(data: dict) -> dict:
+    """
+    Run the user creation test using Playwright.
+    """
+    logger.info("🧪 USER CREATION TEST STARTED: Creating user with data from the request", extra={"request_data": dict(data)})
+
+    if data["ui_test"]:
+        test_type = "ui"
+    else:
+        test_type = "api"
+
+    # Add test_type to data for controller routing
+    data["test_type"] = "user"
+
+    controller = Controller()
+    result = controller.run_test(test_type, data)
+    logger.info("Test Result: %s", result)
+
+    # Return the actual controller result instead of hardcoded response
+    return result
+
+@keywords.register_stream("create_account")
+def stream_create_account_test(data: dict) -> Iterator[dict]:
+    """
+    Run the account creation test, yielding its output events as they happen.
+    """
+    data["test_type"] = "account"
+    yield from Controller().stream_test("ui" if data.get("ui_test") else "api", data)
+
+@keywords.register_stream("create_user")
+def stream_create_user_test(data: dict) -> Iterator[dict]:
+    """
+    Run the user creation test, yielding its output events as they happen.
+    """
+    data["test_type"] = "user"
+    yield from Controller().stream_test("ui" if data.get("ui_test") else "api", data)
@@ -1,89 +1,76 @@
 # tests/playwright_runner.py
-from playwright.sync_api import sync_playwright
-import subprocess
-import json
-import sys
 import logging
-from pathlib import Path
+from typing import Iterator
 
-from curly_octo_guacamole.api.controllers.controller import Controller
+from curly_octo_guacamole.api.runner.registry import keywords
+from curly_octo_guacamole.api.runner.result_cache import ResultCache
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Logging is configured by the application (app/main.py)
 logger = logging.getLogger(__name__)
 
-def run_test(keyword: str, data: dict) -> dict:
-    """
-    Dispatch to your Playwright test modules based on `keyword`.
-    For demo, we'll just echo back.
-    """
-    # Example: if keyword == "create_account", run a Python module or subprocess
-    # result = subprocess.run(["pytest", f"--keyword={keyword}", f"--data={json.dumps(data)}"], capture_output=True)
-    # return {"stdout": result.stdout.decode(), "returncode": result.returncode}
-    
-    if keyword == "create_account":
-        return run_create_account_test(data)
-    elif keyword == "create_user":
-        return run_create_user_test(data)
-    
-    return {"keyword": keyword, "received": data}
+# Built-in keywords; their handlers (and Playwright/Controller imports) load on first use.
+# Additional keywords can be declared with @keywords.register or through the
+# "curly_octo_guacamole.keywords" entry point group.
+keywords.register_lazy(
+    "create_account",
+    "tests.keyword_handlers:run_create_account_test",
+    description="Create an account through the API or UI test",
+    stream_target="tests.keyword_handlers:stream_create_account_test",
+)
+keywords.register_lazy(
+    "create_user",
+    "tests.keyword_handlers:run_create_user_test",
+    description="Create a user through the API or UI test",
+    stream_target="tests.keyword_handlers:stream_create_user_test",
+)
 
-def run_create_account_test(data: dict) -> dict:
-    """
-    Run the account creation test using Playwright.
-    """
-    logger.info("=" * 60)
-    logger.info("🧪 ACCOUNT CREATION TEST STARTED")
-    logger.info("=" * 60)
-    logger.info(f"📋 Test Description: Creating account with expiration date from the request data")
-    logger.info(f"📅 Request Data: {data}")
-    logger.info(f"🎯 Target UI: http://localhost:4200")
-    logger.info(f"🔧 Test Type: Playwright UI Automation")
-    logger.info("-" * 60)
+# Opt-in cache of results for identical keyword/payload pairs (RESULT_CACHE_ENABLED)
+result_cache = ResultCache.from_env()
 
-    if data["ui_test"]:
-        test_type = "ui"
-    else:
-        test_type = "api"
+def run_test(keyword: str, data: dict, use_cache: bool = True) -> dict:
+    """
+    Dispatch to the handler registered for `keyword`.
+    Unknown keywords are echoed back.
 
-    # Add test_type to data for controller routing
-    data["test_type"] = "account"
+    When the result cache is enabled, successful results are reused for
+    identical payloads; pass `use_cache=False` to force a fresh run.
+    """
+    cache = result_cache if use_cache else None
+    if cache is not None:
+        cached = cache.get(keyword, data)
+        if cached is not None:
+            logger.info("♻️  Returning cached result for keyword: %s", keyword)
+            return {**cached, "cached": True}
+        # Key on the request payload; handlers add routing fields to `data`
+        original_data = dict(data)
 
-    controller = Controller()
-    result = controller.run_test(test_type, data)
-    logger.info(f"Test Result: {result}")
+    result = _dispatch(keyword, data)
 
-    # Return the actual controller result instead of hardcoded response
+    if cache is not None and result.get("status") != "error":
+        cache.put(keyword, original_data, result)
     return result
 
-def run_create_user_test(data: dict) -> dict:
-    """
-    Run the user creation test using Playwright.
-    """
-    logger.info("=" * 60)
-    logger.info("🧪 USER CREATION TEST STARTED")
-    logger.info("=" * 60)
-    logger.info(f"📋 Test Description: Creating user with data from the request")
-    logger.info(f"📅 Request Data: {data}")
-    logger.info(f"🎯 Target UI: http://localhost:4200")
-    logger.info(f"🔧 Test Type: Playwright UI Automation")
-    logger.info("-" * 60)
-
-    if data["ui_test"]:
-        test_type = "ui"
-    else:
-        test_type = "api"
+def _dispatch(keyword: str, data: dict) -> dict:
+    handler = keywords.get(keyword)
+    if handler is None:
+        return {"keyword": keyword, "received": data}
+    return handler(data)
 
-    # Add test_type to data for controller routing
-    data["test_type"] = "user"
+def stream_test(keyword: str, data: dict) -> Iterator[dict]:
+    """
+    Streaming counterpart of `run_test`: yield the run's output events
+    (`start`, `line`, `end`) as the test produces them.
 
-    controller = Controller()
-    result = controller.run_test(test_type, data)
-    logger.info(f"Test Result: {result}")
+    Keywords without a stream handler run their regular handler and stream
+    its result as a single `end` event.
+    """
+    stream = keywords.get_stream(keyword)
+    if stream is not None:
+        yield from stream(data)
+        return
 
-    # Return the actual controller result instead of hardcoded response
-    return result
+    handler = keywords.get(keyword)
+    if handler is None:
+        yield {"event": "end", "status": "error", "error": f"Unknown keyword: {keyword}"}
+        return
+    yield {"event": "end", **handler(data)}
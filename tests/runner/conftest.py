@@ -0,0 +1,77 @@
+"""
+Fixtures for exercising the runner API endpoints with a stub keyword runner.
+"""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+class StubRunner:
+    """
+    Stands in for ``playwright_runner.run_test``.
+
+    The payload drives the run: ``sleep`` seconds to take, ``status`` to
+    report (default ``success``) and ``raise`` to fail with an exception.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, keyword, payload, **options):
+        with self._lock:
+            self.calls.append((keyword, dict(payload)))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(payload.get("sleep", 0))
+            if payload.get("raise"):
+                raise RuntimeError(payload["raise"])
+            status = payload.get("status", "success")
+            return {"status": status, "returncode": 0 if status == "success" else 1, "keyword": keyword}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def one_api_slot(monkeypatch):
+    """One admission slot and one queue place for API runs; list it before ``app_client``."""
+    monkeypatch.setenv("ADMISSION_API_SLOTS", "1")
+    monkeypatch.setenv("ADMISSION_API_QUEUE", "1")
+
+
+@pytest.fixture
+def runner_mode():
+    """RUNNER_MODE of ``app_client``; parametrize it to test coordinator mode."""
+    return "local"
+
+
+@pytest.fixture
+def app_client(tmp_path, monkeypatch, runner_mode):
+    """TestClient for app.main running a StubRunner, with its run history (and job queue) in ``tmp_path``."""
+    from app import main
+
+    monkeypatch.setenv("RUN_HISTORY_PATH", str(tmp_path / "run_history.sqlite3"))
+    monkeypatch.setenv("RUN_HISTORY_FLUSH_S", "0.01")
+    monkeypatch.setenv("RUNNER_MODE", runner_mode)
+    monkeypatch.setenv("JOB_QUEUE_PATH", str(tmp_path / "job_queue.sqlite3"))
+    # Runs go to the StubRunner; don't spawn pytest workers
+    monkeypatch.setenv("PYTEST_WORKER_POOL_SIZE", "0")
+    # Keep pytest's log capture instead of installing the service's handler
+    monkeypatch.setattr(main, "configure_logging", lambda: None)
+    runner = StubRunner()
+    monkeypatch.setattr(main, "run_test", runner)
+    # Restore the module's runner state once the app has shut down
+    for name in ("log_handler", "governor", "run_history", "job_queue", "distributed_runner", "job_manager"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+
+    with TestClient(main.app) as client:
+        client.main = main
+        client.runner = runner
+        yield client
@@ -0,0 +1,131 @@
+"""
+Tests for per-class admission control of test runs.
+
+pdm run pytest tests/runner/test_admission.py -s
+"""
+
+import threading
+import pytest
+from curly_octo_guacamole.api.runner.admission import AdmissionRejected, ConcurrencyGovernor
+from curly_octo_guacamole.api.runner.jobs import JobManager, COMPLETED, REJECTED
+
+
+def test_governor_queues_then_rejects():
+    governor = ConcurrencyGovernor(limits={"api": 1}, max_queue={"api": 1})
+    started = []
+
+    assert governor.submit("api", lambda waited: started.append("first")) is True
+    assert governor.submit("api", lambda waited: started.append("second")) is False
+    with pytest.raises(AdmissionRejected) as excinfo:
+        governor.submit("api", lambda waited: started.append("third"))
+
+    assert excinfo.value.retry_after >= 1
+    assert started == ["first"]
+    assert governor.stats()["api"]["queued"] == 1
+    assert governor.stats()["api"]["rejected"] == 1
+
+    # Releasing hands the slot straight to the queued work
+    governor.release("api", run_time_s=2.0)
+    assert started == ["first", "second"]
+    assert governor.stats()["api"]["in_use"] == 1
+    assert governor.stats()["api"]["avg_run_s"] == 2.0
+
+    governor.release("api")
+    assert governor.stats()["api"]["in_use"] == 0
+
+
+def test_classes_have_independent_slots():
+    governor = ConcurrencyGovernor(limits={"ui": 1, "api": 1}, max_queue={"ui": 0, "api": 0})
+    governor.submit("ui", lambda waited: None)
+
+    with pytest.raises(AdmissionRejected):
+        governor.submit("ui", lambda waited: None)
+    assert governor.submit("api", lambda waited: None) is True
+
+
+def test_job_manager_runs_jobs_through_governor():
+    release = threading.Event()
+
+    def runner(keyword, payload):
+        if payload.get("ui_test"):
+            release.wait(5)
+        return {"status": "success"}
+
+    governor = ConcurrencyGovernor(limits={"ui": 1, "api": 1}, max_queue={"ui": 0, "api": 5})
+    manager = JobManager(
+        runner,
+        governor=governor,
+        classify=lambda keyword, payload: "ui" if payload.get("ui_test") else "api",
+    )
+    try:
+        ui_job = manager.submit("create_account", {"ui_test": True})
+        with pytest.raises(AdmissionRejected):
+            manager.submit("create_account", {"ui_test": True, "n": 2})
+
+        # API runs are not blocked by the busy UI slot
+        api_jobs = [manager.submit("create_user", {"n": i}) for i in range(3)]
+        for job in api_jobs:
+            job.future.result(timeout=5)
+        release.set()
+        ui_job.future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert all(job.status == COMPLETED and job.run_class == "api" for job in api_jobs)
+    assert ui_job.run_class == "ui"
+    assert manager.list(status=REJECTED)[0].error.startswith("Too many 'ui' runs")
+    assert governor.stats()["ui"]["in_use"] == 0
+
+
+def test_waiting_work_starts_in_priority_order():
+    governor = ConcurrencyGovernor(limits={"api": 1}, max_queue={"api": 10}, aging_seconds=0)
+    started = []
+    governor.submit("api", lambda waited: started.append("running"))
+    for name, priority in [("low", "low"), ("normal", "normal"), ("high-1", "high"), ("high-2", "high")]:
+        governor.submit("api", lambda waited, name=name: started.append(name), priority=priority)
+
+    for _ in range(4):
+        governor.release("api")
+
+    assert started == ["running", "high-1", "high-2", "normal", "low"]
+    assert governor.stats()["api"]["queued_by_priority"] == {"high": 0, "normal": 0, "low": 0}
+
+
+def test_aging_prevents_starvation(monkeypatch):
+    from curly_octo_guacamole.api.runner import admission
+
+    now = [0.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    governor = ConcurrencyGovernor(limits={"api": 1}, max_queue={"api": 10}, aging_seconds=10)
+    started = []
+    governor.submit("api", lambda waited: started.append("running"))
+    governor.submit("api", lambda waited: started.append("old-low"), priority="low")
+
+    # 25s later the low priority work has aged past a fresh high priority request
+    now[0] = 25.0
+    governor.submit("api", lambda waited: started.append("new-high"), priority="high")
+    governor.release("api")
+
+    assert started == ["running", "old-low"]
+
+
+def test_invalid_priority_is_rejected():
+    governor = ConcurrencyGovernor(limits={"api": 1}, max_queue={"api": 1})
+    with pytest.raises(ValueError):
+        governor.submit("api", lambda waited: None, priority="urgent")
+
+
+def test_admission_endpoint_and_rejection_response(one_api_slot, app_client):
+    jobs = [
+        app_client.post("/jobs", json={"keyword": "create_user", "payload": {"n": n, "sleep": 0.3}})
+        for n in range(2)
+    ]
+    rejected = app_client.post("/jobs", json={"keyword": "create_user", "payload": {"n": 2}})
+    stats = app_client.get("/admission").json()
+
+    assert [job.status_code for job in jobs] == [202, 202]
+    assert rejected.status_code == 429
+    assert rejected.json()["run_class"] == "api"
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert (stats["api"]["limit"], stats["api"]["in_use"], stats["api"]["rejected"]) == (1, 1, 1)
+    assert "ui" in stats
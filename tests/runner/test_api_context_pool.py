@@ -0,0 +1,62 @@
+"""
+Tests for the shared keep-alive request context behind api_context.
+
+pdm run pytest tests/runner/test_api_context_pool.py -s
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from tests.api.test_utils import APIContextPool
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"data": []}'
+        self.send_response(200)
+        if self.path == "/login":
+            self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_context_is_shared_until_a_test_gets_cookies(playwright, base_url):
+    pool = APIContextPool(playwright)
+    try:
+        first = pool.acquire()
+        assert first.get(f"{base_url}/api/account").ok
+        pool.reset()
+        second = pool.acquire()
+        assert second is first
+
+        assert second.get(f"{base_url}/login").ok
+        pool.reset()
+        third = pool.acquire()
+        assert third is not first
+        assert third.storage_state()["cookies"] == []
+        pool.reset()
+    finally:
+        pool.close()
+
+    assert pool.tests == 3
+    assert pool.recycled == 1
+    assert len(pool.created_s) == 2
+    assert "3 tests, 2 contexts (1 recycled)" in pool.summary()
@@ -0,0 +1,127 @@
+"""
+Tests for seeded baseline snapshots of the API test database.
+
+pdm run pytest tests/runner/test_baselines.py -s
+"""
+
+import bson
+import pytest
+from bson import ObjectId
+from tests.api import baselines
+from tests.api.baselines import SnapshotStore
+from tests.api.test_utils import APITestHelper, DocumentTracker, ENTITY_COLLECTIONS
+
+# Written by another test; building a baseline must leave it alone
+OTHER_USER = {"_id": ObjectId(), "username": "someone-else"}
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+        self.inserts = 0
+
+    def with_options(self, codec_options):
+        self.codec_options = codec_options
+        return self
+
+    def find(self, query):
+        keys = query.get("_id", {}).get("$in")
+        return [
+            self.codec_options.document_class(bson.encode(document), self.codec_options)
+            for document in self.documents
+            if keys is None or document["_id"] in keys
+        ]
+
+    def insert_many(self, documents, ordered=True):
+        self.inserts += 1
+        self.documents.extend(bson.decode(document.raw) for document in documents)
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+
+class FakeCleaner:
+    def __init__(self):
+        self.db = FakeDatabase()
+
+    def clean_all_collections(self):
+        raise AssertionError("building a baseline must not wipe the database")
+
+    def delete_tracked(self, tracker):
+        for collection, ids in tracker.created.items():
+            documents = self.db[collection].documents
+            documents[:] = [document for document in documents if str(document["_id"]) not in ids]
+        tracker.clear()
+
+
+class FakeResponse:
+    ok = True
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return {"data": [self.data]}
+
+
+class FakeAPI:
+    """Entity API writing straight into the fake database."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def post(self, url, data):
+        document = {"_id": ObjectId(), **data}
+        self.db[ENTITY_COLLECTIONS[url.rsplit("/", 1)[-1]]].documents.append(document)
+        return FakeResponse({"id": str(document["_id"]), **data})
+
+
+@pytest.fixture
+def store(monkeypatch):
+    cleaner = FakeCleaner()
+    cleaner.db["users"].documents.append(OTHER_USER)
+    builds = []
+
+    def build(api, helper):
+        builds.append(api)
+        account = baselines.create_entity(api, helper, "account", {"expiredAt": None})
+        user = baselines.create_entity(api, helper, "user", {"accountId": account["id"]})
+        store.created = {"accounts": account["id"], "users": user["id"]}
+
+    monkeypatch.setitem(baselines.BASELINES, "fake_graph", build)
+    store = SnapshotStore(cleaner, api=FakeAPI(cleaner.db), helper=APITestHelper("http://api"))
+    store.builds = builds
+    return store
+
+
+def test_baseline_is_built_once_without_touching_other_data(store):
+    first = store.get("fake_graph")
+    second = store.get("fake_graph")
+
+    assert first is second
+    assert len(store.builds) == 1
+    assert first.ids("users") == [store.created["users"]]
+    assert first.first_id("accounts") == store.created["accounts"]
+    # The baseline's own documents are deleted again, everything else is kept
+    assert store.cleaner.db["users"].documents == [OTHER_USER]
+    assert store.cleaner.db["accounts"].documents == []
+
+
+def test_restore_bulk_inserts_and_tracks_documents(store):
+    snapshot = store.get("fake_graph")
+    tracker = DocumentTracker()
+
+    store.restore(snapshot, tracker)
+
+    users = store.cleaner.db["users"]
+    assert users.inserts == 1
+    assert [str(document["_id"]) for document in users.documents] == [str(OTHER_USER["_id"]), store.created["users"]]
+    assert tracker.created == {"accounts": {store.created["accounts"]}, "users": {store.created["users"]}}
+
+
+def test_unknown_baseline(store):
+    with pytest.raises(KeyError, match="fake_graph"):
+        store.get("missing")
@@ -0,0 +1,114 @@
+"""
+Tests for batch fan-out of test payloads.
+
+pdm run pytest tests/runner/test_batch.py -s
+"""
+
+import threading
+import time
+import pytest
+from curly_octo_guacamole.api.runner.batch import parse_jsonl, run_batch
+
+
+def test_parse_jsonl_skips_blank_lines():
+    text = '{"keyword": "a", "payload": {}}\n\n{"keyword": "b", "payload": {"x": 1}}\n'
+    assert parse_jsonl(text) == [
+        {"keyword": "a", "payload": {}},
+        {"keyword": "b", "payload": {"x": 1}},
+    ]
+
+
+def test_parse_jsonl_reports_bad_line():
+    with pytest.raises(ValueError, match="line 2"):
+        parse_jsonl('{"keyword": "a", "payload": {}}\nnot json\n')
+
+
+def test_run_batch_respects_parallelism_and_keeps_order():
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def runner(keyword, payload):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return {"status": "success", "n": payload["n"]}
+
+    items = [{"keyword": "create_user", "payload": {"n": i}} for i in range(8)]
+    report = run_batch(items, runner, parallelism=3)
+
+    assert peak <= 3
+    assert [item["result"]["n"] for item in report["items"]] == list(range(8))
+    assert report["summary"]["succeeded"] == 8
+    assert report["summary"]["wall_time_s"] < report["summary"]["total_run_time_s"]
+
+
+def test_run_batch_reports_failures_per_item():
+    def runner(keyword, payload):
+        if keyword == "boom":
+            raise RuntimeError("exploded")
+        return {"status": "error" if keyword == "bad" else "success"}
+
+    items = [{"keyword": k, "payload": {}} for k in ("ok", "bad", "boom")]
+    report = run_batch(items, runner, parallelism=2)
+
+    assert [item["status"] for item in report["items"]] == ["success", "error", "error"]
+    assert report["items"][2]["error"] == "exploded"
+    assert report["summary"]["failed"] == 2
+
+
+def test_batch_endpoint_items_share_the_admission_slots(one_api_slot, app_client, monkeypatch):
+    monkeypatch.setattr(app_client.main, "SINGLE_FLIGHT_ENABLED", False)
+    items = [{"keyword": "create_user", "payload": {"n": i, "sleep": 0.2}} for i in range(3)]
+
+    response = app_client.post("/run_batch?parallelism=3", json=items)
+
+    assert response.status_code == 200
+    report = response.json()
+    # One slot and one queue place: the third item is rejected like a third /run_test call
+    assert sorted(item["status"] for item in report["items"]) == ["error", "success", "success"]
+    assert app_client.runner.peak == 1
+    assert len(app_client.get("/jobs").json()["jobs"]) == 3
+
+
+def test_batch_endpoint_accepts_json_lines(app_client):
+    body = '{"keyword": "create_user", "payload": {"n": 1}}\n\n{"keyword": "create_user", "payload": {"n": 2}}\n'
+
+    response = app_client.post("/run_batch", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["items"]] == ["success", "success"]
+
+
+@pytest.mark.parametrize("body", [
+    b"\xff\xfe[]",
+    b"[{",
+    b"5",
+    b'"items"',
+    b'{"items": null}',
+    b'{"items": 5}',
+    b'[{"payload": {}}]',
+    b'{"items": [], "parallelism": "two"}',
+    b'{"items": [], "parallelism": 0}',
+])
+def test_batch_endpoint_rejects_invalid_bodies(app_client, body):
+    assert app_client.post("/run_batch", content=body).status_code == 422
+    assert app_client.runner.calls == []
+
+
+@pytest.mark.parametrize("parallelism", [0, -1])
+def test_batch_endpoint_rejects_parallelism_below_one(app_client, parallelism):
+    assert app_client.post(f"/run_batch?parallelism={parallelism}", json=[]).status_code == 422
+
+
+def test_batch_endpoint_parallelism_from_body(app_client, monkeypatch):
+    monkeypatch.setattr(app_client.main, "SINGLE_FLIGHT_ENABLED", False)
+    items = [{"keyword": "create_user", "payload": {"n": i, "sleep": 0.1}} for i in range(4)]
+
+    response = app_client.post("/run_batch", json={"items": items, "parallelism": "2"})
+
+    assert response.status_code == 200
+    assert response.json()["summary"]["parallelism"] == 2
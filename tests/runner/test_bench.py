@@ -0,0 +1,76 @@
+"""
+Tests for the runner micro-benchmark suite and its baseline comparison.
+
+pdm run pytest tests/runner/test_bench.py -s
+"""
+
+import json
+
+import pytest
+
+from curly_octo_guacamole.api.runner import bench
+
+
+def test_compare_flags_regressions_above_threshold():
+    baseline = {"results": {"a": {"median_us": 10.0}, "b": {"median_us": 10.0}}}
+    current = {"results": {"a": {"median_us": 11.0}, "b": {"median_us": 13.0}, "new": {"median_us": 1.0}}}
+
+    rows = {row["name"]: row for row in bench.compare(current, baseline, threshold=0.2)}
+
+    assert set(rows) == {"a", "b"}
+    assert rows["a"]["regression"] is False
+    assert rows["b"]["regression"] is True
+    assert rows["b"]["ratio"] == 1.3
+
+
+def test_save_then_compare_against_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    args = ["runner_dispatch", "controller_route", "--repeat", "2", "--scale", "0.01", "--baseline", str(baseline)]
+
+    assert bench.main(args + ["--save"]) == 0
+    saved = json.loads(baseline.read_text())
+    assert set(saved["results"]) == {"runner_dispatch", "controller_route"}
+
+    # A baseline far faster than anything achievable must be reported as a regression
+    for result in saved["results"].values():
+        result["median_us"] = 1e-6
+    baseline.write_text(json.dumps(saved))
+    assert bench.main(args + ["--compare"]) == 1
+
+
+def test_benchmarks_leave_the_shared_registry_and_app_alone(monkeypatch):
+    import sys
+    from curly_octo_guacamole.api.runner.registry import keywords
+
+    monkeypatch.delitem(sys.modules, "app.main", raising=False)
+    bench.run_benchmarks(["validation", "runner_dispatch"], repeat=1, scale=0.001)
+
+    assert "bench_noop" not in keywords
+    assert "app.main" not in sys.modules
+
+
+def test_runner_dispatch_restores_the_registry_when_a_run_raises(monkeypatch):
+    from tests import playwright_runner
+
+    shared = playwright_runner.keywords
+
+    def boom(keyword, data, use_cache=True):
+        raise RuntimeError("dispatch failed")
+
+    monkeypatch.setattr(playwright_runner, "run_test", boom)
+    dispatch, teardown = bench.BENCHMARKS["runner_dispatch"][0]()
+    try:
+        with pytest.raises(RuntimeError):
+            dispatch()
+    finally:
+        teardown()
+
+    assert playwright_runner.keywords is shared
+
+
+def test_validation_benchmark_goes_through_fastapi():
+    post, teardown = bench.BENCHMARKS["validation"][0]()
+    try:
+        post()
+    finally:
+        teardown()
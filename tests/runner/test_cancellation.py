@@ -0,0 +1,196 @@
+"""
+Tests for run timeouts and cancellation.
+
+pdm run pytest tests/runner/test_cancellation.py -s
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+from curly_octo_guacamole.api.controllers import controller as controller_module
+from curly_octo_guacamole.api.controllers.worker_pool import PytestWorkerPool
+from curly_octo_guacamole.api.runner.admission import ConcurrencyGovernor
+from curly_octo_guacamole.api.runner.cancellation import (
+    CANCELLED, TIMEOUT, RunCancelled, RunContext, RunTimeouts, bind, current_run, parse_timeouts,
+)
+from curly_octo_guacamole.api.runner.jobs import COMPLETED, JobManager
+
+
+def cooperative_runner(keyword, payload):
+    """Runs until stopped, like the Controller waiting on pytest."""
+    run = current_run()
+    while run.wait(0.05) is None:
+        pass
+    raise RunCancelled(run.reason)
+
+
+def test_run_timeouts_per_keyword():
+    timeouts = RunTimeouts(default=60, per_keyword=parse_timeouts("create_account=5, create_user=0"))
+
+    assert timeouts.for_keyword("create_account") == 5
+    assert timeouts.for_keyword("create_user") is None
+    assert timeouts.for_keyword("other") == 60
+
+
+def test_job_past_its_timeout_finishes_as_timeout():
+    manager = JobManager(cooperative_runner, max_workers=1, timeouts=RunTimeouts(default=0.2))
+    try:
+        job = manager.submit("create_account", {})
+        job.future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert job.status == TIMEOUT
+    assert job.error == "Run timed out"
+    assert job.to_dict()["timeout_s"] == 0.2
+
+
+def test_runner_ignoring_cancellation_is_still_reported():
+    def slow_runner(keyword, payload):
+        time.sleep(0.3)
+        return {"status": "success"}
+
+    manager = JobManager(slow_runner, max_workers=1, timeouts=RunTimeouts(default=0.1))
+    try:
+        job = manager.submit("create_account", {})
+        job.future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert job.status == TIMEOUT
+    assert job.result is None
+
+
+def test_cancel_running_job():
+    manager = JobManager(cooperative_runner, max_workers=1)
+    try:
+        job = manager.submit("create_account", {})
+        deadline = time.monotonic() + 5
+        while job.status != "running" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.cancel(job.id)
+        job.future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert job.status == CANCELLED
+    assert job.error == "Run was cancelled"
+
+
+def test_cancel_queued_job_hands_its_slot_on():
+    release = threading.Event()
+    ran = []
+
+    def runner(keyword, payload):
+        ran.append(keyword)
+        release.wait(5)
+        return {"keyword": keyword}
+
+    governor = ConcurrencyGovernor(limits={"api": 1}, max_queue={"api": 5})
+    manager = JobManager(runner, governor=governor, classify=lambda keyword, payload: "api")
+    try:
+        running = manager.submit("first", {})
+        queued = manager.submit("second", {})
+        waiting = manager.submit("third", {})
+        assert manager.cancel(queued.id).status == CANCELLED
+        assert queued.future.done()
+        release.set()
+        waiting.future.result(timeout=5)
+        running.future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert ran == ["first", "third"]
+    assert waiting.status == COMPLETED
+    assert governor.stats()["api"]["in_use"] == 0
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A killed child not yet reaped by its (dead) parent is a zombie
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+@pytest.fixture
+def hanging_test(tmp_path):
+    """A test that starts a child process (like a browser) and hangs."""
+    pid_file = tmp_path / "child.pid"
+    (tmp_path / "test_hang.py").write_text(
+        "import subprocess, sys, time\n"
+        "def test_hang():\n"
+        "    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"    open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "    time.sleep(60)\n"
+    )
+    return tmp_path, pid_file
+
+
+def _wait_for_pid(pid_file):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if pid_file.exists() and pid_file.read_text():
+            return int(pid_file.read_text())
+        time.sleep(0.05)
+    raise AssertionError("test never started its child process")
+
+
+def _cancel_once_started(run, pid_file):
+    """Cancel ``run`` as soon as the hanging test has started its child."""
+    def cancel():
+        _wait_for_pid(pid_file)
+        run.cancel()
+
+    canceller = threading.Thread(target=cancel)
+    canceller.start()
+    return canceller
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups are POSIX only")
+def test_subprocess_run_kills_whole_process_group(hanging_test, monkeypatch):
+    directory, pid_file = hanging_test
+    monkeypatch.setattr(controller_module, "PYTEST_COMMAND", [sys.executable, "-m", "pytest"])
+    monkeypatch.setenv("PYTEST_WORKER_POOL_SIZE", "0")
+    controller = controller_module.Controller()
+    run = RunContext()
+
+    canceller = _cancel_once_started(run, pid_file)
+    with bind(run), pytest.raises(RunCancelled) as raised:
+        controller._execute_pytest(["test_hang.py", "-p", "no:cacheprovider"], {}, directory)
+    canceller.join()
+
+    assert raised.value.reason == CANCELLED
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while _alive(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(child)
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups are POSIX only")
+def test_pool_replaces_killed_worker(hanging_test):
+    directory, pid_file = hanging_test
+    pool = PytestWorkerPool(size=1, warm_modules=(), project_root=str(directory))
+    run = RunContext()
+    try:
+        canceller = _cancel_once_started(run, pid_file)
+        with bind(run), pytest.raises(RunCancelled) as raised:
+            pool.run([str(directory / "test_hang.py"), "-p", "no:cacheprovider"], {})
+        canceller.join()
+        (directory / "test_ok.py").write_text("def test_ok():\n    assert True\n")
+        result = pool.run([str(directory / "test_ok.py"), "-p", "no:cacheprovider"], {})
+    finally:
+        pool.close()
+
+    assert raised.value.reason == CANCELLED
+    assert not _alive(int(pid_file.read_text()))
+    assert result["returncode"] == 0
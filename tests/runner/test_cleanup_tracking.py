@@ -0,0 +1,84 @@
+"""
+Tests for targeted cleanup of the documents an API test created.
+
+pdm run pytest tests/runner/test_cleanup_tracking.py -s
+"""
+
+from bson import ObjectId
+from tests.api.test_utils import DocumentTracker, MongoDBCleaner, TrackingRequestContext
+
+USER_ID = "507f1f77bcf86cd799439011"
+
+
+class FakeResponse:
+    def __init__(self, body, ok=True):
+        self.body = body
+        self.ok = ok
+
+    def json(self):
+        return self.body
+
+
+class FakeContext:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append(("post", url))
+        return self.response
+
+    def get(self, url, **kwargs):
+        self.calls.append(("get", url))
+        return self.response
+
+
+class FakeCollection:
+    def __init__(self):
+        self.deletes = []
+
+    def delete_many(self, query):
+        self.deletes.append(query)
+        return type("Result", (), {"deleted_count": len(query["_id"]["$in"])})()
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+
+def test_creates_through_api_context_are_tracked():
+    tracker = DocumentTracker()
+    context = TrackingRequestContext(FakeContext(FakeResponse({"data": [{"id": USER_ID}]})), tracker)
+
+    context.post("http://localhost:5500/api/user", data={})
+    context.get("http://localhost:5500/api/account")
+
+    assert tracker.created == {"users": {USER_ID}}
+
+
+def test_failed_or_non_entity_responses_are_ignored():
+    tracker = DocumentTracker()
+    tracker.track_response("http://localhost:5500/api/user", FakeResponse({"data": [{"id": "x"}]}, ok=False))
+    tracker.track_response("http://localhost:5500/metadata", FakeResponse({"data": [{"id": "x"}]}))
+    tracker.track_response("http://localhost:5500/api/event", FakeResponse({"data": None}))
+
+    assert tracker.created == {}
+
+
+def test_delete_tracked_issues_one_delete_per_touched_collection():
+    tracker = DocumentTracker()
+    tracker.track("user", USER_ID)
+    tracker.track("user", "legacy-id")
+    tracker.track("event", USER_ID)
+    cleaner = MongoDBCleaner()
+    cleaner.db = FakeDatabase()
+
+    cleaner.delete_tracked(tracker)
+
+    assert sorted(cleaner.db) == ["events", "users"]
+    assert len(cleaner.db["users"].deletes) == 1
+    keys = cleaner.db["users"].deletes[0]["_id"]["$in"]
+    assert sorted(keys, key=str) == sorted([ObjectId(USER_ID), "legacy-id"], key=str)
+    assert tracker.created == {}
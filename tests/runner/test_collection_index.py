@@ -0,0 +1,111 @@
+"""
+Tests for the collection index resolving test types to pytest nodeids.
+
+pdm run pytest tests/runner/test_collection_index.py -s
+"""
+
+import os
+
+import pytest
+from curly_octo_guacamole.api.controllers.collection_index import CollectionIndex, collect_nodeids
+
+
+@pytest.fixture
+def project(tmp_path):
+    api_dir = tmp_path / "tests" / "api"
+    api_dir.mkdir(parents=True)
+    (api_dir / "test_widget.py").write_text(
+        "import pytest\n"
+        "def helper():\n"
+        "    pass\n"
+        "def test_module_level():\n"
+        "    pass\n"
+        "class TestWidgetAPI:\n"
+        "    def test_create_widget(self):\n"
+        "        pass\n"
+        "    def test_create_widget_invalid(self):\n"
+        "        pass\n"
+        "    @pytest.mark.parametrize('n', [1, 2])\n"
+        "    def test_list_widgets(self, n):\n"
+        "        pass\n"
+        "class TestNotCollected:\n"
+        "    def __init__(self):\n"
+        "        pass\n"
+        "    def test_ignored(self):\n"
+        "        pass\n"
+    )
+    return tmp_path
+
+
+def test_collect_nodeids_follows_pytest_discovery(project):
+    path = project / "tests" / "api" / "test_widget.py"
+
+    assert collect_nodeids(path, project) == [
+        ("test_module_level", "tests/api/test_widget.py::test_module_level"),
+        ("test_create_widget", "tests/api/test_widget.py::TestWidgetAPI::test_create_widget"),
+        ("test_create_widget_invalid", "tests/api/test_widget.py::TestWidgetAPI::test_create_widget_invalid"),
+        ("test_list_widgets", "tests/api/test_widget.py::TestWidgetAPI::test_list_widgets"),
+    ]
+
+
+def test_resolve_by_convention_and_unknown_type(project):
+    index = CollectionIndex(project_root=project)
+
+    assert index.resolve("widget") == [
+        "tests/api/test_widget.py::TestWidgetAPI::test_create_widget",
+        "tests/api/test_widget.py::TestWidgetAPI::test_create_widget_invalid",
+    ]
+    with pytest.raises(LookupError, match="test_create_gadget"):
+        index.resolve("gadget")
+
+
+def test_resolve_stays_in_the_test_type_module(project):
+    # Like `test_widget.py -k test_create_widget`, a longer entity name elsewhere is not selected
+    (project / "tests" / "api" / "test_widgetgroup.py").write_text("def test_create_widgetgroup():\n    pass\n")
+    index = CollectionIndex(project_root=project)
+
+    assert "tests/api/test_widgetgroup.py::test_create_widgetgroup" not in index.resolve("widget")
+    assert index.resolve("widgetgroup") == ["tests/api/test_widgetgroup.py::test_create_widgetgroup"]
+
+
+def test_index_refreshes_changed_and_removed_files(project):
+    index = CollectionIndex(project_root=project, refresh_interval=0)
+    index.refresh()
+    gadget = project / "tests" / "api" / "test_gadget.py"
+
+    assert not index.refresh()
+    gadget.write_text("def test_create_gadget():\n    pass\n")
+    assert index.resolve("gadget") == ["tests/api/test_gadget.py::test_create_gadget"]
+
+    gadget.write_text("def test_create_gadget_v2():\n    pass\n")
+    stat = gadget.stat()
+    os.utime(gadget, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert index.nodeids("test_create_gadget") == []
+    assert index.nodeids("test_create_gadget_v2") == ["tests/api/test_gadget.py::test_create_gadget_v2"]
+
+    gadget.unlink()
+    assert index.nodeids("test_create_gadget_v2") == []
+
+
+def test_refresh_interval_limits_file_checks(project):
+    index = CollectionIndex(project_root=project, refresh_interval=60)
+    index.refresh(force=True)
+    (project / "tests" / "api" / "test_gadget.py").write_text("def test_create_gadget():\n    pass\n")
+
+    assert index.nodeids("test_create_gadget") == []
+    assert index.refresh(force=True)
+    assert index.nodeids("test_create_gadget") == ["tests/api/test_gadget.py::test_create_gadget"]
+
+
+def test_project_test_types_resolve():
+    index = CollectionIndex()
+
+    assert index.resolve("account") == ["tests/api/test_account.py::TestAccountAPI::test_create_account"]
+    assert index.resolve("user") == [
+        "tests/api/test_user.py::TestUserAPI::test_create_user",
+        "tests/api/test_user.py::TestUserAPI::test_create_user_variations",
+        "tests/api/test_user.py::TestUserAPI::test_create_user_duplicate_username",
+        "tests/api/test_user.py::TestUserAPI::test_create_user_duplicate_email",
+        "tests/api/test_user.py::TestUserAPI::test_create_user_invalid_email",
+        "tests/api/test_user.py::TestUserAPI::test_create_user_invalid_gender",
+    ]
@@ -0,0 +1,152 @@
+"""
+Tests for the SQLite run history behind /runs.
+
+pdm run pytest tests/runner/test_history.py -s
+"""
+
+import time
+
+from curly_octo_guacamole.api.runner.cancellation import RunTimeouts
+from curly_octo_guacamole.api.runner.history import RUN_STATUSES, RunHistory
+from curly_octo_guacamole.api.runner.jobs import JobManager
+
+
+def fake_runner(keyword, payload):
+    if payload.get("fail"):
+        return {"status": "error", "returncode": 1, "summary": {
+            "counts": {"failed": 1},
+            "tests": [{"nodeid": "tests/api/test_user.py::test_create_user", "outcome": "failed", "duration": 0.5}],
+        }}
+    return {"status": "success", "returncode": 0, "summary": {
+        "counts": {"passed": 2},
+        "tests": [
+            {"nodeid": "tests/api/test_account.py::test_a", "outcome": "passed", "duration": 0.1},
+            {"nodeid": "tests/api/test_account.py::test_b", "outcome": "passed", "duration": 0.2},
+        ],
+    }}
+
+
+def test_finished_jobs_are_recorded_and_queryable(tmp_path):
+    history = RunHistory(str(tmp_path / "runs.sqlite3"), batch_size=10, flush_interval=0.05)
+    manager = JobManager(fake_runner, max_workers=2, on_finish=history.record)
+    try:
+        jobs = [manager.submit("create_account", {"n": i}, payload_hash=f"hash-{i}") for i in range(3)]
+        jobs.append(manager.submit("create_user", {"fail": True}))
+        for job in jobs:
+            job.future.result(timeout=5)
+        history.flush(timeout=5)
+
+        everything = history.query()
+        assert everything["total"] == 4
+
+        failures = history.query(status="failed")
+        assert failures["total"] == 1
+        assert failures["runs"][0]["keyword"] == "create_user"
+        assert failures["runs"][0]["returncode"] == 1
+        assert failures["runs"][0]["counts"] == {"failed": 1}
+
+        page = history.query(keyword="create_account", limit=2, offset=2)
+        assert page["total"] == 3
+        assert len(page["runs"]) == 1
+
+        run = history.get(jobs[0].id)
+        assert run["payload_hash"] == "hash-0"
+        assert run["host"]
+        assert [t["nodeid"] for t in run["tests"]] == [
+            "tests/api/test_account.py::test_a",
+            "tests/api/test_account.py::test_b",
+        ]
+        assert history.get("unknown") is None
+    finally:
+        manager.shutdown()
+        history.close()
+
+
+def test_history_uses_wal_and_survives_reopen(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    history = RunHistory(path)
+    manager = JobManager(fake_runner, max_workers=1, on_finish=history.record)
+    manager.submit("create_account", {}).future.result(timeout=5)
+    manager.shutdown()
+    history.close()
+
+    reopened = RunHistory(path)
+    try:
+        assert reopened.query()["total"] == 1
+        conn = reopened._connect()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+    finally:
+        reopened.close()
+
+
+def test_statuses_map_to_one_vocabulary(tmp_path):
+    def runner(keyword, payload):
+        if keyword == "boom":
+            raise RuntimeError("exploded")
+        if keyword == "slow":
+            time.sleep(0.3)
+        if keyword == "broken":
+            return {"status": "error", "error": "could not start pytest"}
+        return fake_runner(keyword, payload)
+
+    history = RunHistory(str(tmp_path / "runs.sqlite3"), flush_interval=0.05)
+    manager = JobManager(runner, max_workers=4, on_finish=history.record,
+                         timeouts=RunTimeouts(per_keyword={"slow": 0.1}))
+    try:
+        jobs = {keyword: manager.submit(keyword, payload) for keyword, payload in
+                (("ok", {}), ("fail", {"fail": True}), ("broken", {}), ("boom", {}), ("slow", {}))}
+        for job in jobs.values():
+            job.future.result(timeout=5)
+        history.flush(timeout=5)
+    finally:
+        manager.shutdown()
+        history.close()
+
+    statuses = {run["keyword"]: run["status"] for run in history.query()["runs"]}
+    assert statuses == {"ok": "success", "fail": "failed", "broken": "error", "boom": "error", "slow": "timeout"}
+    assert set(statuses.values()) <= set(RUN_STATUSES)
+
+
+
+def stub_stream(keyword, payload):
+    yield {"event": "start", "run_id": "r1"}
+    yield {"event": "line", "run_id": "r1", "line": "tests/api/test_user.py::test_create_user PASSED"}
+    yield {"event": "end", "run_id": "r1", "status": "error", "returncode": 1, "summary": {"counts": {"failed": 1}}}
+
+
+def test_batch_and_streamed_runs_are_recorded(app_client, monkeypatch):
+    monkeypatch.setattr(app_client.main, "stream_test", stub_stream)
+    batch = app_client.post("/run_batch", json=[
+        {"keyword": "create_account", "payload": {"n": 1}},
+        {"keyword": "create_account", "payload": {"n": 2, "raise": "exploded"}},
+    ])
+    streamed = app_client.post("/run_test/stream?format=ndjson", json={"keyword": "create_user", "payload": {}})
+    assert batch.status_code == streamed.status_code == 200
+    app_client.main.run_history.flush(timeout=5)
+
+    runs = app_client.get("/runs").json()
+    assert runs["total"] == 3
+    assert sorted((run["keyword"], run["status"]) for run in runs["runs"]) == [
+        ("create_account", "error"), ("create_account", "success"), ("create_user", "failed"),
+    ]
+    assert app_client.get("/runs?status=done").status_code == 422
+
+
+def test_runs_endpoints_filter_paginate_and_get(app_client):
+    job_ids = [
+        app_client.post("/jobs", json={"keyword": keyword, "payload": {"n": n}}).json()["job_id"]
+        for n, keyword in enumerate(("create_account", "create_user", "create_user"))
+    ]
+    for job_id in job_ids:
+        app_client.main.job_manager.get(job_id).future.result(timeout=5)
+    app_client.main.run_history.flush(timeout=5)
+
+    page = app_client.get("/runs?keyword=create_user&limit=1").json()
+    assert (page["total"], page["limit"], page["offset"]) == (2, 1, 0)
+    assert [run["keyword"] for run in page["runs"]] == ["create_user"]
+    run = app_client.get(f"/runs/{job_ids[0]}").json()
+    assert (run["id"], run["keyword"], run["status"], run["tests"]) == (job_ids[0], "create_account", "success", [])
+    assert app_client.get("/runs/missing").status_code == 404
+    assert app_client.get("/runs?limit=0").status_code == 422
+    assert app_client.get("/runs?offset=-1").status_code == 422
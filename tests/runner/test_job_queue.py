@@ -0,0 +1,179 @@
+"""
+Tests for the durable job queue and worker agents used in coordinator mode.
+
+pdm run pytest tests/runner/test_job_queue.py -s
+"""
+
+import threading
+import time
+
+import pytest
+from curly_octo_guacamole.api.runner.agent import WorkerAgent
+from curly_octo_guacamole.api.runner.cancellation import TIMEOUT, RunCancelled, RunContext, bind, current_run
+from curly_octo_guacamole.api.runner.job_queue import (
+    DONE, FAILED, QUEUED, AgentQueue, DistributedRunner, HttpJobQueue, JobQueue, SQLiteJobQueue,
+)
+
+
+def test_lease_order_run_classes_and_completion(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "queue.sqlite3"))
+    low = queue.enqueue("create_user", {"n": 1}, run_class="api", priority="low")
+    ui = queue.enqueue("create_user", {"n": 2}, run_class="ui")
+    high = queue.enqueue("create_account", {"n": 3}, {"use_cache": False}, run_class="api", priority="high")
+
+    first = queue.lease("agent-a", ["api"])
+    assert first["id"] == high
+    assert first["options"] == {"use_cache": False}
+    assert queue.lease("agent-a", ["api"])["id"] == low
+    assert queue.lease("agent-a", ["api"]) is None
+    assert queue.lease("agent-b")["id"] == ui
+
+    assert queue.complete(high, "agent-b", result={"status": "success"}) is False, "agent-b holds no lease on it"
+    assert queue.complete(high, "agent-a", result={"status": "success"}) is True
+    assert queue.get(high)["status"] == DONE
+    assert queue.get(high)["result"] == {"status": "success"}
+
+
+def test_expired_leases_are_requeued_then_failed(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=0.05, max_attempts=2)
+    job_id = queue.enqueue("create_user", {})
+
+    assert queue.lease("agent-a")["attempts"] == 1
+    time.sleep(0.1)
+    assert queue.heartbeat(job_id, "agent-a") is True, "Lease is still held until someone expires it"
+    time.sleep(0.1)
+    assert queue.requeue_expired() == 1
+    assert queue.get(job_id)["status"] == QUEUED
+    assert queue.heartbeat(job_id, "agent-a") is False
+
+    assert queue.lease("agent-b")["attempts"] == 2
+    time.sleep(0.1)
+    queue.requeue_expired()
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert "Lease lost" in job["error"]
+
+
+def test_distributed_runner_waits_for_agent_result(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "queue.sqlite3"))
+    runner = DistributedRunner(queue, classify=lambda keyword, payload: "api", poll_interval=0.05)
+    calls = []
+
+    def run_test(keyword, payload, **options):
+        calls.append((keyword, payload, options))
+        if payload.get("fail"):
+            raise RuntimeError("browser crashed")
+        return {"status": "success", "keyword": keyword}
+
+    agent = WorkerAgent(queue, run_test, worker_id="agent-a", run_classes=["api"], poll_interval=0.05)
+    thread = threading.Thread(target=agent.run_forever, daemon=True)
+    thread.start()
+    try:
+        assert runner("create_user", {"n": 1}, use_cache=False) == {"status": "success", "keyword": "create_user"}
+        try:
+            runner("create_user", {"fail": True})
+        except RuntimeError as e:
+            assert "browser crashed" in str(e)
+        else:
+            raise AssertionError("Agent failure should propagate to the coordinator")
+    finally:
+        agent.stop()
+        thread.join(5)
+
+    assert calls[0] == ("create_user", {"n": 1}, {"use_cache": False})
+    assert queue.stats()[DONE] == 1
+    assert queue.stats()[FAILED] == 1
+
+
+def test_coordinator_timeout_stops_the_agent_run(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "queue.sqlite3"))
+    runner = DistributedRunner(queue, poll_interval=0.05)
+    stopped = threading.Event()
+
+    def run_test(keyword, payload, **options):
+        run = current_run()
+        while run.wait(0.05) is None:
+            pass
+        stopped.set()
+        raise RunCancelled(run.reason)
+
+    agent = WorkerAgent(queue, run_test, worker_id="agent-a", poll_interval=0.05, heartbeat_interval=0.05)
+    thread = threading.Thread(target=agent.run_forever, daemon=True)
+    thread.start()
+    try:
+        with bind(RunContext(timeout=0.3)), pytest.raises(RunCancelled) as raised:
+            runner("create_user", {})
+        assert stopped.wait(5), "Agent should stop the run once its lease is refused"
+    finally:
+        agent.stop()
+        thread.join(5)
+
+    assert raised.value.reason == TIMEOUT
+    assert queue.stats()[FAILED] == 1
+
+
+def test_queue_interfaces_are_abstract():
+    class LeaseOnly(AgentQueue):
+        def lease(self, worker_id, run_classes=None):
+            return None
+
+    with pytest.raises(TypeError):
+        LeaseOnly()
+    with pytest.raises(TypeError):
+        JobQueue()
+    # Agents on other hosts only get the lease/heartbeat/complete subset
+    assert issubclass(SQLiteJobQueue, JobQueue)
+    assert issubclass(HttpJobQueue, AgentQueue) and not issubclass(HttpJobQueue, JobQueue)
+
+
+def test_queue_endpoints_are_disabled_in_local_mode(app_client):
+    assert app_client.get("/queue").status_code == 404
+    assert app_client.post("/queue/lease", json={"worker_id": "w1"}).status_code == 404
+
+
+@pytest.mark.parametrize("runner_mode", ["coordinator"])
+def test_queue_endpoints_lease_heartbeat_and_complete(app_client):
+    job_id = app_client.post("/jobs", json={"keyword": "create_user", "payload": {"n": 1}}).json()["job_id"]
+    deadline = time.monotonic() + 5
+    while app_client.get("/queue").json()["jobs"][QUEUED] == 0:
+        assert time.monotonic() < deadline, "run never reached the queue"
+        time.sleep(0.01)
+
+    leased = app_client.post("/queue/lease", json={"worker_id": "w1", "run_classes": ["api"]})
+    assert leased.status_code == 200
+    queue_id = leased.json()["id"]
+    assert app_client.post("/queue/lease", json={"worker_id": "w2"}).status_code == 204
+    assert app_client.post(f"/queue/{queue_id}/heartbeat", json={"worker_id": "w1"}).status_code == 200
+    assert app_client.post(f"/queue/{queue_id}/heartbeat", json={"worker_id": "w2"}).status_code == 409
+    assert app_client.post(f"/queue/{queue_id}/complete", json={"worker_id": "w2"}).status_code == 409
+    completed = app_client.post(f"/queue/{queue_id}/complete", json={"worker_id": "w1", "result": {"status": "success"}})
+    assert completed.status_code == 200
+
+    app_client.main.job_manager.get(job_id).future.result(timeout=5)
+    job = app_client.get(f"/jobs/{job_id}").json()
+    assert (job["status"], job["result"]) == ("completed", {"status": "success"})
+    assert app_client.runner.calls == []
+
+
+@pytest.mark.parametrize("runner_mode", ["coordinator"])
+def test_coordinator_queues_past_the_local_slots_and_leases_by_priority(one_api_slot, app_client):
+    jobs = [
+        app_client.post(f"/jobs?priority={priority}", json={"keyword": "create_user", "payload": {"n": n}})
+        for n, priority in enumerate(["low", "low", "normal", "high"])
+    ]
+    # One local slot and one queue place would reject the third run; the agents bound them instead
+    assert [response.status_code for response in jobs] == [202, 202, 202, 202]
+    assert app_client.get("/admission").json() == {}
+
+    deadline = time.monotonic() + 5
+    while app_client.get("/queue").json()["jobs"][QUEUED] < len(jobs):
+        assert time.monotonic() < deadline, "runs never reached the queue"
+        time.sleep(0.01)
+
+    leased = [app_client.post("/queue/lease", json={"worker_id": "w1"}).json() for _ in jobs]
+    assert [job["payload"]["n"] for job in leased] == [3, 2, 0, 1]
+
+    for response in jobs:
+        app_client.delete(f"/jobs/{response.json()['job_id']}")
+    for response in jobs:
+        app_client.main.job_manager.get(response.json()["job_id"]).future.result(timeout=5)
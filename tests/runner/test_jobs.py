@@ -0,0 +1,190 @@
+"""
+Tests for the asynchronous JobManager behind the runner API.
+
+pdm run pytest tests/runner/test_jobs.py -s
+"""
+
+import threading
+import time
+
+import pytest
+from curly_octo_guacamole.api.runner.admission import AdmissionRejected
+from curly_octo_guacamole.api.runner.jobs import JobManager, COMPLETED, FAILED
+
+
+def test_submit_returns_before_run_finishes():
+    """Submitting a job does not wait for the runner."""
+    release = threading.Event()
+
+    def slow_runner(keyword, payload):
+        release.wait(5)
+        return {"status": "success", "keyword": keyword}
+
+    manager = JobManager(slow_runner, max_workers=1)
+    try:
+        job = manager.submit("create_account", {"expired_at": "20250819"})
+        assert job.status in ("queued", "running")
+        release.set()
+        job.future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert job.status == COMPLETED
+    assert job.result == {"status": "success", "keyword": "create_account"}
+    assert manager.get(job.id) is job
+
+
+def test_runner_exception_marks_job_failed():
+    def broken_runner(keyword, payload):
+        raise RuntimeError("boom")
+
+    manager = JobManager(broken_runner, max_workers=1)
+    try:
+        job = manager.submit("create_user", {})
+        job.future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert job.status == FAILED
+    assert job.error == "boom"
+    assert job.to_dict()["error"] == "boom"
+
+
+def test_list_is_newest_first_and_history_is_bounded():
+    manager = JobManager(lambda keyword, payload: {"keyword": keyword}, max_workers=1, max_jobs=3)
+    try:
+        jobs = []
+        for i in range(5):
+            job = manager.submit(f"kw{i}", {})
+            job.future.result(timeout=5)
+            jobs.append(job)
+    finally:
+        manager.shutdown()
+
+    listed = manager.list()
+    assert [job.keyword for job in listed] == ["kw4", "kw3", "kw2"]
+    assert manager.get(jobs[0].id) is None
+    assert manager.list(status=COMPLETED, limit=1)[0].keyword == "kw4"
+
+
+def test_identical_in_flight_submissions_share_one_run():
+    """Submissions with the same dedupe key attach to the running job."""
+    release = threading.Event()
+    calls = []
+
+    def slow_runner(keyword, payload):
+        calls.append(keyword)
+        release.wait(5)
+        return {"status": "success"}
+
+    manager = JobManager(slow_runner, max_workers=2)
+    try:
+        first = manager.submit("create_account", {"expired_at": "1"}, dedupe_key="same")
+        second = manager.submit("create_account", {"expired_at": "1"}, dedupe_key="same")
+        other = manager.submit("create_account", {"expired_at": "2"}, dedupe_key="other")
+        release.set()
+        first.future.result(timeout=5)
+        other.future.result(timeout=5)
+
+        # Once finished, the same key starts a fresh run
+        third = manager.submit("create_account", {"expired_at": "1"}, dedupe_key="same")
+        third.future.result(timeout=5)
+    finally:
+        manager.shutdown()
+
+    assert second is first
+    assert first.coalesced == 1
+    assert other is not first
+    assert third is not first
+    assert len(calls) == 3
+
+
+def wait_for_job(client, job_id):
+    client.main.job_manager.get(job_id).future.result(timeout=5)
+    return client.get(f"/jobs/{job_id}").json()
+
+
+def test_jobs_endpoints_submit_poll_and_list(app_client):
+    submitted = app_client.post("/jobs", json={"keyword": "create_account", "payload": {"n": 1}})
+
+    assert submitted.status_code == 202
+    job_id = submitted.json()["job_id"]
+    assert submitted.json()["status_url"] == f"/jobs/{job_id}"
+    job = wait_for_job(app_client, job_id)
+    assert job["status"] == COMPLETED
+    assert job["result"]["status"] == "success"
+    listed = app_client.get("/jobs?status=completed&limit=1").json()
+    assert [job["job_id"] for job in listed["jobs"]] == [job_id]
+    assert "result" not in listed["jobs"][0]
+
+
+def test_jobs_endpoints_unknown_and_finished_jobs(app_client):
+    job_id = app_client.post("/jobs", json={"keyword": "create_account", "payload": {}}).json()["job_id"]
+    wait_for_job(app_client, job_id)
+
+    assert app_client.get("/jobs/missing").status_code == 404
+    assert app_client.delete("/jobs/missing").status_code == 404
+    assert app_client.delete(f"/jobs/{job_id}").status_code == 409
+
+
+def test_cancel_endpoint_stops_running_job(app_client):
+    job_id = app_client.post("/jobs", json={"keyword": "create_account", "payload": {"sleep": 0.5}}).json()["job_id"]
+    deadline = time.monotonic() + 5
+    while app_client.get(f"/jobs/{job_id}").json()["status"] == "queued":
+        assert time.monotonic() < deadline, "job never started"
+        time.sleep(0.01)
+
+    assert app_client.delete(f"/jobs/{job_id}").status_code == 200
+    assert wait_for_job(app_client, job_id)["status"] == "cancelled"
+
+
+def test_jobs_limit_is_validated(app_client):
+    for limit in (-1, 0, app_client.main.JOB_HISTORY_SIZE + 1):
+        assert app_client.get(f"/jobs?limit={limit}").status_code == 422
+
+
+USER_BODY = {
+    "action": "create_user", "username": "ada", "email": "ada@example.com", "first_name": "Ada",
+    "last_name": "Lovelace", "gender": "female", "birth": "18151210", "agreed_terms": True,
+    "salary": 1, "id": "1",
+}
+
+
+@pytest.mark.parametrize("path, body, keyword, payload", [
+    ("/create_account", {"expired_at": "20250819"}, "create_account",
+     {"expired_at": "20250819", "ui_test": False, "include_logs": False}),
+    ("/create_user", USER_BODY, "create_user", {**USER_BODY, "ui_test": False, "include_logs": False}),
+    ("/run_test", {"keyword": "create_account", "payload": {"n": 1}}, "create_account", {"n": 1}),
+])
+def test_caller_attached_to_a_rejected_run_gets_429(app_client, monkeypatch, path, body, keyword, payload):
+    main = app_client.main
+    attached = threading.Event()
+
+    def reject_once_attached(run_class, start, priority="normal"):
+        attached.wait(5)
+        raise AdmissionRejected(run_class, 7)
+
+    monkeypatch.setattr(main.governor, "submit", reject_once_attached)
+    # The first caller (e.g. a batch item on its own thread) is still being admitted...
+    first = threading.Thread(target=lambda: pytest.raises(AdmissionRejected, main.submit_test, keyword, payload))
+    first.start()
+    deadline = time.monotonic() + 5
+    while not main.job_manager.list():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    job = main.job_manager.list()[0]
+
+    def release():
+        while job.coalesced == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        attached.set()
+
+    threading.Thread(target=release).start()
+    # ...when an identical request attaches to its job and then shares the rejection
+    response = app_client.post(path, json=body)
+    first.join(5)
+
+    assert job.coalesced == 1
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert response.json()["status"] == "rejected"
@@ -0,0 +1,146 @@
+"""
+Tests for the concurrent CRUD load test of the entity API.
+
+pdm run pytest tests/runner/test_load_crud.py -s
+"""
+
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from tests.api.load_crud import CrudLoadTest, make_payload, parse_mix
+from tests.api.test_utils import APITestHelper
+
+
+class CrudHandler(BaseHTTPRequestHandler):
+    """In-memory stand-in for the entity API."""
+    protocol_version = "HTTP/1.1"
+    store = {}
+    lock = threading.Lock()
+    # Number of upcoming deletes answered with 503 without deleting
+    failing_deletes = 0
+
+    def _route(self):
+        parts = self.path.strip("/").split("/")
+        return parts[1], parts[2] if len(parts) > 2 else None
+
+    def _reply(self, status, data):
+        body = json.dumps({"data": data}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+    def do_GET(self):
+        entity, entity_id = self._route()
+        with self.lock:
+            documents = self.store.setdefault(entity, {})
+            if entity_id is None:
+                return self._reply(200, list(documents.values()))
+            if entity_id not in documents:
+                return self._reply(404, None)
+            return self._reply(200, [documents[entity_id]])
+
+    def do_POST(self):
+        entity, _ = self._route()
+        document = {**self._body(), "id": uuid.uuid4().hex}
+        with self.lock:
+            self.store.setdefault(entity, {})[document["id"]] = document
+        self._reply(200, [document])
+
+    def do_PUT(self):
+        entity, entity_id = self._route()
+        body = self._body()
+        with self.lock:
+            if entity_id not in self.store.setdefault(entity, {}):
+                return self._reply(404, None)
+            self.store[entity][entity_id].update(body)
+        self._reply(200, [self.store[entity][entity_id]])
+
+    def do_DELETE(self):
+        entity, entity_id = self._route()
+        with self.lock:
+            if CrudHandler.failing_deletes:
+                CrudHandler.failing_deletes -= 1
+                return self._reply(503, None)
+            found = self.store.setdefault(entity, {}).pop(entity_id, None)
+        self._reply(200 if found else 404, None)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    CrudHandler.store = {}
+    CrudHandler.failing_deletes = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CrudHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_mix():
+    assert parse_mix("create=3, get=1.5,list") == {"create": 3.0, "get": 1.5, "list": 1.0}
+    with pytest.raises(ValueError, match="Unknown operation"):
+        parse_mix("upsert=1")
+
+
+def test_make_payload_is_unique_per_request():
+    helper = APITestHelper("http://api")
+    first, second = make_payload(helper, "user", 1), make_payload(helper, "user", 2)
+
+    assert first["username"] != second["username"]
+    assert first["email"].endswith("@example.com")
+    assert first["netWorth"] == helper.create_test_data("user")["netWorth"]
+
+
+def test_load_run_reports_per_entity_and_operation(base_url):
+    report = CrudLoadTest(
+        base_url=base_url,
+        entities=["user", "event"],
+        concurrency=4,
+        requests=60,
+        seed=7,
+    ).run()
+
+    assert report["overall"]["requests"] == 60
+    assert report["overall"]["errors"] == 0
+    assert report["overall"]["latency_ms"]["p95"] is not None
+    assert set(report["endpoints"]) <= {
+        f"{entity} {operation}"
+        for entity in ("user", "event")
+        for operation in ("create", "list", "get", "update", "delete")
+    }
+    assert "user create" in report["endpoints"]
+    # Documents created by the run are deleted afterwards
+    assert all(not documents for documents in CrudHandler.store.values())
+
+
+def test_failed_deletes_are_still_cleaned_up(base_url):
+    CrudHandler.failing_deletes = 5
+    report = CrudLoadTest(
+        base_url=base_url,
+        entities=["user"],
+        mix={"create": 1, "delete": 1},
+        concurrency=2,
+        requests=40,
+        seed=3,
+    ).run()
+
+    assert report["status_codes"]["503"] == 5
+    # The documents whose delete failed went back into the pool and were deleted later
+    assert all(not documents for documents in CrudHandler.store.values())
+
+
+def test_unknown_entity_is_rejected():
+    with pytest.raises(ValueError, match="widget"):
+        CrudLoadTest(base_url="http://api", entities=["user", "widget"])
@@ -0,0 +1,83 @@
+"""
+Tests for the request replay load generator.
+
+pdm run pytest tests/runner/test_loadgen.py -s
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from curly_octo_guacamole.api.runner import loadgen
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = 500 if body.get("payload", {}).get("fail") else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_read_requests_skips_non_request_lines():
+    lines = [
+        '{"method": "post", "path": "/create_user", "body": {"action": "create_user"}, "offset": 2.5}',
+        '{"keyword": "create_account", "payload": {"expired_at": "20250819"}}',
+        '{"request_id": "user-001", "title": "not a request"}',
+        "not json",
+        "",
+    ]
+    stats = {}
+
+    requests = list(loadgen.read_requests(lines, stats))
+
+    assert [(r.method, r.path, r.offset) for r in requests] == [
+        ("POST", "/create_user", 2.5),
+        ("POST", "/run_test", None),
+    ]
+    assert requests[1].label == "POST /run_test [create_account]"
+    assert stats["skipped"] == 2
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert loadgen.percentile(values, 50) == 50
+    assert loadgen.percentile(values, 99) == 99
+    assert loadgen.percentile([3.0], 95) == 3.0
+    assert loadgen.percentile([], 50) is None
+
+
+def test_replay_reports_latency_and_errors(stub_server, tmp_path):
+    traffic = tmp_path / "traffic.jsonl"
+    lines = [{"keyword": "create_user", "payload": {"n": i}} for i in range(9)]
+    lines.append({"keyword": "create_user", "payload": {"fail": True}})
+    traffic.write_text("\n".join(json.dumps(line) for line in lines))
+    output = tmp_path / "report.json"
+
+    code = loadgen.main([str(traffic), "--base-url", stub_server, "--rate", "200",
+                         "--concurrency", "4", "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    assert code == 0
+    assert report["overall"]["requests"] == 10
+    assert report["overall"]["errors"] == 1
+    assert report["status_codes"] == {"200": 9, "500": 1}
+    assert report["overall"]["latency_ms"]["p50"] is not None
+    assert report["endpoints"]["POST /run_test [create_user]"]["error_rate"] == 0.1
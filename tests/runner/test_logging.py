@@ -0,0 +1,92 @@
+"""
+Tests for the runner's structured, queue-based logging.
+
+pdm run pytest tests/runner/test_logging.py -s
+"""
+
+import io
+import json
+import logging
+import queue
+
+from curly_octo_guacamole.api.runner.logging_config import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    TextFormatter,
+    configure_logging,
+    stop_listener,
+)
+
+
+def make_record(msg, *args, name="app.main", level=logging.INFO, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_emits_fields_and_caps_size():
+    formatter = JsonFormatter(field_limit=20)
+    record = make_record("Run %s finished", "abc", keyword="create_user", payload={"blob": "x" * 100}, count=3)
+
+    entry = json.loads(formatter.format(record))
+
+    assert entry["message"] == "Run abc finished"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.main"
+    assert entry["keyword"] == "create_user"
+    assert entry["count"] == 3
+    assert entry["payload"].startswith('{"blob": "xxxx')
+    assert "truncated" in entry["payload"]
+
+
+def test_text_formatter_appends_fields():
+    line = TextFormatter().format(make_record("API request received", keyword="create_account"))
+
+    assert line.endswith("INFO - API request received keyword=create_account")
+
+
+def test_sampling_keeps_a_fraction_of_info_records():
+    sampler = SamplingFilter.from_string("tests.keyword_handlers=0.25")
+
+    kept = [sampler.filter(make_record("hi", name="tests.keyword_handlers")) for _ in range(8)]
+    warnings = [sampler.filter(make_record("hi", name="tests.keyword_handlers", level=logging.WARNING)) for _ in range(3)]
+    others = [sampler.filter(make_record("hi", name="app.main")) for _ in range(3)]
+
+    assert kept.count(True) == 2
+    assert all(warnings) and all(others)
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    class Expensive:
+        formatted = 0
+
+        def __str__(self):
+            Expensive.formatted += 1
+            return "expensive"
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.emit(make_record("value %s", Expensive()))
+    handler.emit(make_record("value %s", Expensive()))
+
+    assert Expensive.formatted == 0, "Arguments must be formatted by the listener, not the caller"
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_configure_logging_writes_json_from_background_thread():
+    stream = io.StringIO()
+    root = logging.getLogger()
+    previous_handlers, previous_level = list(root.handlers), root.level
+    try:
+        configure_logging(log_format="json", level="INFO", use_queue=True, stream=stream)
+        logging.getLogger("app.main").info("hello %s", "world", extra={"keyword": "create_user"})
+        stop_listener()
+
+        entry = json.loads(stream.getvalue().strip())
+        assert entry["message"] == "hello world"
+        assert entry["keyword"] == "create_user"
+    finally:
+        stop_listener()
+        root.handlers[:] = previous_handlers
+        root.setLevel(previous_level)
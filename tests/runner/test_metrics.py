@@ -0,0 +1,76 @@
+"""
+Tests for the runner's Prometheus-style metrics.
+
+pdm run pytest tests/runner/test_metrics.py -s
+"""
+
+from curly_octo_guacamole.api.runner import metrics
+from curly_octo_guacamole.api.runner.jobs import JobManager
+from curly_octo_guacamole.api.runner.registry import keywords
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("run_seconds", "Run time", ["keyword"], buckets=(0.1, 1))
+
+    histogram.observe(0.05, keyword="a")
+    histogram.observe(0.5, keyword="a")
+    histogram.observe(5, keyword="a")
+
+    text = registry.render()
+    assert "# TYPE run_seconds histogram" in text
+    assert 'run_seconds_bucket{keyword="a",le="0.1"} 1' in text
+    assert 'run_seconds_bucket{keyword="a",le="1"} 2' in text
+    assert 'run_seconds_bucket{keyword="a",le="+Inf"} 3' in text
+    assert 'run_seconds_count{keyword="a"} 3' in text
+    assert 'run_seconds_sum{keyword="a"} 5.55' in text
+
+
+def test_counters_gauges_and_collectors():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter("codes_total", "Exit codes", ["code"])
+    gauge = registry.gauge("in_flight", "In flight")
+    registry.add_collector(lambda: [("queued", "Queued runs", {"run_class": 'a"b'}, 3)])
+
+    counter.inc(code="0")
+    counter.inc(code="0")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    text = registry.render()
+    assert 'codes_total{code="0"} 2' in text
+    assert "in_flight 1" in text
+    assert 'queued{run_class="a\\"b"} 3' in text
+
+
+def test_job_manager_records_run_metrics():
+    @keywords.register("metrics_probe")
+    def probe(data):
+        return {"returncode": 1, "timings": {"spawn_s": 0.02, "execution_s": 0.3}}
+
+    manager = JobManager(lambda keyword, payload: probe(payload), max_workers=1)
+    before = metrics.EXIT_CODES.value(keyword="metrics_probe", code="1")
+    manager.submit("metrics_probe", {}).future.result(timeout=5)
+    manager.submit("not_registered", {}).future.result(timeout=5)
+    manager.shutdown()
+
+    assert metrics.EXIT_CODES.value(keyword="metrics_probe", code="1") == before + 1
+    assert metrics.SPAWN_SECONDS.count(keyword="metrics_probe") >= 1
+    assert metrics.EXECUTION_SECONDS.count(keyword="metrics_probe") >= 1
+    assert metrics.IN_FLIGHT.value(keyword="metrics_probe") == 0
+    # Unregistered keywords share one label so clients can't grow cardinality
+    assert metrics.REQUESTS.value(keyword="other") >= 1
+    assert 'runner_requests_total{keyword="metrics_probe"}' in metrics.REGISTRY.render()
+
+
+def test_metrics_endpoint_renders_runs_and_service_gauges(app_client):
+    job_id = app_client.post("/jobs", json={"keyword": "create_account", "payload": {}}).json()["job_id"]
+    app_client.main.job_manager.get(job_id).future.result(timeout=5)
+
+    response = app_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'runner_requests_total{keyword="create_account"}' in response.text
+    assert 'runner_admission_slots{run_class="api"}' in response.text
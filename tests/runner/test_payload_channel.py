@@ -0,0 +1,101 @@
+"""
+Tests for the typed payload hand-off between the Controller and pytest runs.
+
+pdm run pytest tests/runner/test_payload_channel.py -s
+"""
+
+import json
+import os
+
+import pytest
+from curly_octo_guacamole.api.controllers.payload_channel import (
+    PAYLOAD_FILE_ENV, PAYLOAD_VERSION, PayloadError, payload_file, read_payload, write_payload,
+)
+from curly_octo_guacamole.api.controllers.worker_pool import PytestWorkerPool
+
+
+def test_payload_round_trip_drops_control_keys(tmp_path, monkeypatch):
+    path = tmp_path / "payload.json"
+    write_payload(str(path), "user", {
+        "test_type": "user",
+        "include_logs": True,
+        "username": "alice",
+        "salary": "50000",
+        "id": "u-1",
+    })
+    monkeypatch.setenv(PAYLOAD_FILE_ENV, str(path))
+
+    assert read_payload("user") == {"username": "alice", "salary": 50000, "id": "u-1"}
+
+
+def test_read_payload_outside_controller_returns_none(monkeypatch):
+    monkeypatch.delenv(PAYLOAD_FILE_ENV, raising=False)
+
+    assert read_payload("account") is None
+
+
+def test_invalid_payload_is_rejected_not_dropped(tmp_path, monkeypatch):
+    with pytest.raises(PayloadError, match="salary"):
+        write_payload(str(tmp_path / "bad.json"), "user", {"salary": "lots"})
+    with pytest.raises(PayloadError, match="No payload schema"):
+        write_payload(str(tmp_path / "bad.json"), "profile", {})
+
+    path = tmp_path / "payload.json"
+    write_payload(str(path), "account", {"expired_at": "20250819"})
+    monkeypatch.setenv(PAYLOAD_FILE_ENV, str(path))
+    with pytest.raises(PayloadError, match="expected 'user'"):
+        read_payload("user")
+
+
+
+def test_records_are_validated_like_the_entity_fields(tmp_path, monkeypatch):
+    path = tmp_path / "payload.json"
+    write_payload(str(path), "user", {"records": [{"username": "alice", "salary": "50000"}, {"email": "b@example.com"}]})
+    monkeypatch.setenv(PAYLOAD_FILE_ENV, str(path))
+
+    assert read_payload("user") == {"records": [{"username": "alice", "salary": 50000}, {"email": "b@example.com"}]}
+
+    with pytest.raises(PayloadError, match="records.1.salary"):
+        write_payload(str(tmp_path / "bad.json"), "user", {"records": [{"salary": 1}, {"salary": "lots"}]})
+    with pytest.raises(PayloadError, match="records.0"):
+        write_payload(str(tmp_path / "bad.json"), "account", {"records": ["20250819"]})
+
+
+def test_bad_record_in_payload_file_fails_the_read(tmp_path, monkeypatch):
+    path = tmp_path / "payload.json"
+    path.write_text(json.dumps({
+        "version": PAYLOAD_VERSION,
+        "test_type": "account",
+        "data": {"records": [{"expired_at": "20250819"}, {"expired_at": ["not", "a", "date"]}]},
+    }))
+    monkeypatch.setenv(PAYLOAD_FILE_ENV, str(path))
+
+    with pytest.raises(PayloadError, match="records.1.expired_at"):
+        read_payload("account")
+
+def test_payload_file_is_removed_after_run():
+    with payload_file("account", {"expired_at": "20250819"}) as path:
+        assert os.path.exists(path)
+
+    assert not os.path.exists(path)
+
+
+def test_large_payload_reaches_pooled_test(tmp_path):
+    """Thousands of records reach the test through the file, not the environment."""
+    test_file = tmp_path / "test_records.py"
+    test_file.write_text(
+        "from curly_octo_guacamole.api.controllers.payload_channel import read_payload\n"
+        "def test_records():\n"
+        "    data = read_payload('user')\n"
+        "    assert len(data['records']) == 5000\n"
+        "    assert data['records'][-1]['username'] == 'user4999'\n"
+    )
+    records = [{"username": f"user{i}", "email": f"user{i}@example.com"} for i in range(5000)]
+    pool = PytestWorkerPool(size=1, warm_modules=(), project_root=str(tmp_path))
+    try:
+        with payload_file("user", {"records": records}) as path:
+            result = pool.run([str(test_file), "-p", "no:cacheprovider"], {PAYLOAD_FILE_ENV: path})
+    finally:
+        pool.close()
+
+    assert result["returncode"] == 0, result["stdout"]
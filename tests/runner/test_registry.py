@@ -0,0 +1,116 @@
+"""
+Tests for the lazy keyword registry used by the runner dispatcher.
+
+pdm run pytest tests/runner/test_registry.py -s
+"""
+
+import sys
+import pytest
+from curly_octo_guacamole.api.runner.registry import KeywordRegistry
+
+
+@pytest.fixture
+def handler_module(tmp_path, monkeypatch):
+    """An importable module holding a handler, not yet imported."""
+    (tmp_path / "lazy_handlers_sample.py").write_text(
+        "def handle(data):\n"
+        "    return {'status': 'success', 'echo': data}\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_handlers_sample"
+    sys.modules.pop("lazy_handlers_sample", None)
+
+
+def test_lazy_handler_is_imported_on_first_use(handler_module):
+    registry = KeywordRegistry(entry_point_group=None)
+    registry.register_lazy("sample", f"{handler_module}:handle", description="Sample keyword")
+
+    assert handler_module not in sys.modules
+    assert registry.describe() == [{
+        "keyword": "sample",
+        "target": f"{handler_module}:handle",
+        "description": "Sample keyword",
+        "loaded": False,
+    }]
+
+    handler = registry.get("sample")
+    assert handler({"a": 1}) == {"status": "success", "echo": {"a": 1}}
+    assert handler_module in sys.modules
+    assert registry.describe()[0]["loaded"] is True
+
+
+def test_decorator_registers_handler():
+    registry = KeywordRegistry(entry_point_group=None)
+
+    @registry.register("greet")
+    def greet(data):
+        """Say hello."""
+        return {"hello": data["name"]}
+
+    assert "greet" in registry
+    assert registry.get("greet")({"name": "n8n"}) == {"hello": "n8n"}
+    assert registry.describe()[0]["description"] == "Say hello."
+
+
+def test_unknown_keyword_returns_none():
+    registry = KeywordRegistry(entry_point_group=None)
+    assert registry.get("missing") is None
+    assert "missing" not in registry
+
+
+def test_register_lazy_validates_target():
+    registry = KeywordRegistry(entry_point_group=None)
+    with pytest.raises(ValueError):
+        registry.register_lazy("bad", "no_colon_here")
+
+
+def test_stream_handler_is_imported_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "lazy_stream_sample.py").write_text(
+        "def handle(data):\n"
+        "    return {'status': 'success'}\n"
+        "def stream(data):\n"
+        "    yield {'event': 'line', 'line': data['name']}\n"
+        "    yield {'event': 'end', 'status': 'success'}\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry = KeywordRegistry(entry_point_group=None)
+    registry.register_lazy("sample", "lazy_stream_sample:handle", stream_target="lazy_stream_sample:stream")
+    try:
+        assert "lazy_stream_sample" not in sys.modules
+        events = list(registry.get_stream("sample")({"name": "n8n"}))
+    finally:
+        sys.modules.pop("lazy_stream_sample", None)
+
+    assert events == [{"event": "line", "line": "n8n"}, {"event": "end", "status": "success"}]
+
+
+def test_register_stream_needs_the_keyword():
+    registry = KeywordRegistry(entry_point_group=None)
+    with pytest.raises(KeyError):
+        registry.register_stream("missing")(lambda data: iter(()))
+
+
+def test_stream_test_dispatches_through_the_registry(monkeypatch):
+    from tests import playwright_runner
+
+    registry = KeywordRegistry(entry_point_group=None)
+    monkeypatch.setattr(playwright_runner, "keywords", registry)
+
+    @registry.register("plain")
+    def plain(data):
+        return {"status": "success", "echo": data}
+
+    @registry.register("streaming")
+    def streaming(data):
+        return {"status": "success"}
+
+    @registry.register_stream("streaming")
+    def stream_streaming(data):
+        yield {"event": "start"}
+        yield {"event": "end", "status": "success"}
+
+    assert list(playwright_runner.stream_test("plain", {"a": 1})) == [
+        {"event": "end", "status": "success", "echo": {"a": 1}}
+    ]
+    assert [e["event"] for e in playwright_runner.stream_test("streaming", {})] == ["start", "end"]
+    assert list(playwright_runner.stream_test("missing", {}))[0]["status"] == "error"
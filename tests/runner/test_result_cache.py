@@ -0,0 +1,83 @@
+"""
+Tests for the content-addressed test result cache.
+
+pdm run pytest tests/runner/test_result_cache.py -s
+"""
+
+from curly_octo_guacamole.api.runner import result_cache as result_cache_module
+from curly_octo_guacamole.api.runner.result_cache import ResultCache, cache_key, parse_ttls
+
+
+def test_cache_key_ignores_payload_key_order():
+    assert cache_key("create_user", {"a": 1, "b": 2}) == cache_key("create_user", {"b": 2, "a": 1})
+    assert cache_key("create_user", {"a": 1}) != cache_key("create_account", {"a": 1})
+
+
+def test_hit_and_miss_counters():
+    cache = ResultCache()
+    assert cache.get("create_account", {"expired_at": "20250819"}) is None
+    cache.put("create_account", {"expired_at": "20250819"}, {"status": "success"})
+    assert cache.get("create_account", {"expired_at": "20250819"}) == {"status": "success"}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_cached_result_is_a_copy():
+    cache = ResultCache()
+    cache.put("kw", {}, {"details": {"n": 1}})
+    cache.get("kw", {})["details"]["n"] = 2
+    assert cache.get("kw", {}) == {"details": {"n": 1}}
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("kw", {"n": 1}, {"n": 1})
+    cache.put("kw", {"n": 2}, {"n": 2})
+    cache.get("kw", {"n": 1})  # n=1 becomes most recently used
+    cache.put("kw", {"n": 3}, {"n": 3})
+
+    assert cache.get("kw", {"n": 2}) is None
+    assert cache.get("kw", {"n": 1}) == {"n": 1}
+    assert cache.get("kw", {"n": 3}) == {"n": 3}
+
+
+def test_per_keyword_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache_module.time, "monotonic", lambda: now[0])
+    cache = ResultCache(default_ttl=60, ttls={"short": 5, "never": 0})
+
+    cache.put("short", {}, {"kw": "short"})
+    cache.put("long", {}, {"kw": "long"})
+    cache.put("never", {}, {"kw": "never"})
+    now[0] += 10
+
+    assert cache.get("short", {}) is None
+    assert cache.get("long", {}) == {"kw": "long"}
+    assert cache.get("never", {}) is None
+
+
+def test_parse_ttls_skips_invalid_entries():
+    assert parse_ttls("create_account=60, create_user=0,bad=x,") == {
+        "create_account": 60.0,
+        "create_user": 0.0,
+    }
+
+
+def test_cache_endpoints(app_client, monkeypatch):
+    playwright_runner = app_client.main.playwright_runner
+    monkeypatch.setattr(playwright_runner, "result_cache", None)
+    assert app_client.get("/cache").json() == {"enabled": False}
+    assert app_client.delete("/cache").json() == {"status": "ok"}
+
+    cache = ResultCache()
+    monkeypatch.setattr(playwright_runner, "result_cache", cache)
+    cache.put("create_account", {"expired_at": "20250819"}, {"status": "success"})
+    cache.get("create_account", {"expired_at": "20250819"})
+
+    stats = app_client.get("/cache").json()
+    assert (stats["enabled"], stats["hits"], stats["size"]) == (True, 1, 1)
+    assert app_client.delete("/cache").status_code == 200
+    assert app_client.get("/cache").json()["size"] == 0
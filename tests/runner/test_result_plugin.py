@@ -0,0 +1,59 @@
+"""
+Tests for the structured pytest result summary returned by the Controller.
+
+pdm run pytest tests/runner/test_result_plugin.py -s
+"""
+
+import sys
+import pytest
+from curly_octo_guacamole.api.controllers import controller as controller_module
+from curly_octo_guacamole.api.controllers.controller import Controller, RESULT_PLUGIN
+from curly_octo_guacamole.api.controllers.result_plugin import failure_excerpt
+
+
+@pytest.fixture
+def local_controller(tmp_path, monkeypatch):
+    """Controller running a small local test module in a plain subprocess."""
+    test_file = tmp_path / "test_sample.py"
+    test_file.write_text(
+        "import pytest\n"
+        "def test_ok():\n"
+        "    print('noise ' * 100)\n"
+        "def test_broken():\n"
+        "    assert 1 == 2, 'numbers differ'\n"
+        "@pytest.mark.skip(reason='not today')\n"
+        "def test_skipped():\n"
+        "    pass\n"
+    )
+    args = [str(test_file), "-p", "no:cacheprovider", "--capture=no", "-p", RESULT_PLUGIN]
+    monkeypatch.setenv("PYTEST_WORKER_POOL_SIZE", "0")
+    monkeypatch.setattr(controller_module, "PYTEST_COMMAND", [sys.executable, "-m", "pytest"])
+    monkeypatch.setattr(Controller, "_prepare_api_test", lambda self, data: (list(args), {}, tmp_path))
+    return Controller()
+
+
+def test_run_returns_structured_summary_without_logs(local_controller):
+    result = local_controller.run_api_test({})
+
+    assert result["status"] == "error"
+    assert "stdout" not in result and "stderr" not in result
+    summary = result["summary"]
+    assert summary["counts"] == {"passed": 1, "failed": 1, "skipped": 1}
+
+    tests = {t["nodeid"].split("::")[-1]: t for t in summary["tests"]}
+    assert tests["test_ok"]["outcome"] == "passed"
+    assert "excerpt" not in tests["test_ok"]
+    assert "numbers differ" in tests["test_broken"]["excerpt"]
+    assert tests["test_broken"]["duration"] >= 0
+
+
+def test_include_logs_adds_full_output(local_controller):
+    result = local_controller.run_api_test({"include_logs": True})
+
+    assert "noise noise" in result["stdout"]
+    assert "stderr" in result
+
+
+def test_failure_excerpt_keeps_tail():
+    assert failure_excerpt("short", limit=10) == "short"
+    assert failure_excerpt("x" * 20 + "assert", limit=6) == "...assert"
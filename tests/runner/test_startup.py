@@ -0,0 +1,64 @@
+"""
+Cold start regression benchmark for the runner API.
+
+Fails when importing app.main in a fresh interpreter exceeds the budget or
+pulls in modules that should only load on first use.
+
+pdm run pytest tests/runner/test_startup.py -s
+STARTUP_BUDGET_SECONDS=1.5 pdm run pytest tests/runner/test_startup.py -s
+"""
+
+import os
+import subprocess
+import sys
+from curly_octo_guacamole.api.runner.startup_profile import PROJECT_ROOT, format_report, parse_importtime, profile_import
+
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "3.0"))
+
+# Modules that must be deferred until a test actually runs
+DEFERRED_MODULES = (
+    "playwright",
+    "pymongo",
+    "tests.conftest",
+    "tests.keyword_handlers",
+    "curly_octo_guacamole.api.controllers.controller",
+)
+
+
+def test_app_cold_start_within_budget():
+    profile = profile_import("app.main")
+    report = format_report(profile)
+    print(report)
+
+    assert profile["returncode"] == 0, report
+    assert profile["wall_time_s"] < STARTUP_BUDGET_SECONDS, report
+
+
+def test_app_import_defers_heavy_modules():
+    profile = profile_import("app.main")
+    imported = {entry["module"] for entry in profile["modules"]}
+
+    for module in DEFERRED_MODULES:
+        assert module not in imported, f"{module} is imported at startup"
+
+
+def test_app_import_has_no_side_effects(tmp_path):
+    # Logging, run history, admission and job threads start with the server, not on import
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(PROJECT_ROOT), str(PROJECT_ROOT / "src")])}
+    code = "import threading, app.main; assert threading.active_count() == 1, threading.enumerate()"
+    completed = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+
+    assert completed.returncode == 0, completed.stderr
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     json.decoder\n"
+        "import time:       300 |        420 |   json\n"
+    )
+    assert parse_importtime(output) == [
+        {"module": "json.decoder", "self_us": 120, "cumulative_us": 120, "depth": 2},
+        {"module": "json", "self_us": 300, "cumulative_us": 420, "depth": 1},
+    ]
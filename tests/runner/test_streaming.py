@@ -0,0 +1,110 @@
+"""
+Tests for streaming API test output from the Controller.
+
+pdm run pytest tests/runner/test_streaming.py -s
+"""
+
+import json
+import os
+import sys
+import time
+import pytest
+from curly_octo_guacamole.api.controllers import controller as controller_module
+from curly_octo_guacamole.api.controllers.controller import Controller, RESULT_PLUGIN
+from curly_octo_guacamole.api.runner.cancellation import TIMEOUT, RunContext, bind
+
+
+@pytest.fixture
+def streaming_controller(tmp_path, monkeypatch):
+    """Controller whose API test resolves to a small local test file."""
+    test_file = tmp_path / "test_stream.py"
+    test_file.write_text(
+        "def test_prints():\n"
+        "    for i in range(3):\n"
+        "        print(f'line {i}')\n"
+    )
+    args = [str(test_file), "-p", "no:cacheprovider", "--capture=no", "-p", RESULT_PLUGIN]
+    monkeypatch.setattr(controller_module, "PYTEST_COMMAND", [sys.executable, "-m", "pytest"])
+    monkeypatch.setattr(Controller, "_prepare_api_test", lambda self, data: (args, {}, tmp_path))
+    return Controller()
+
+
+def test_stream_yields_lines_then_end(streaming_controller):
+    events = list(streaming_controller.stream_test("api", {}))
+
+    assert events[0]["event"] == "start"
+    assert events[-1]["event"] == "end"
+    assert events[-1]["status"] == "success"
+    assert events[-1]["returncode"] == 0
+    assert events[-1]["summary"]["counts"] == {"passed": 1}
+    lines = [e["line"] for e in events if e["event"] == "line"]
+    assert "line 2" in "\n".join(lines)
+    assert len({e["run_id"] for e in events}) == 1
+
+
+def test_closing_stream_early_kills_process(streaming_controller):
+    events = streaming_controller.stream_api_test({})
+    start = next(events)
+    events.close()
+
+    with pytest.raises(ProcessLookupError):
+        # Reaped by the generator's cleanup, so the pid no longer exists
+        os.kill(start["pid"], 0)
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups are POSIX only")
+def test_stream_past_its_timeout_is_killed(tmp_path, monkeypatch):
+    # Prints nothing, so only the run's deadline can stop it
+    (tmp_path / "test_silent.py").write_text("import time\ndef test_silent():\n    time.sleep(60)\n")
+    args = [str(tmp_path / "test_silent.py"), "-p", "no:cacheprovider", "-q"]
+    monkeypatch.setattr(controller_module, "PYTEST_COMMAND", [sys.executable, "-m", "pytest"])
+    monkeypatch.setattr(Controller, "_prepare_api_test", lambda self, data: (args, {}, tmp_path))
+
+    start = time.monotonic()
+    with bind(RunContext(1.0)):
+        events = list(Controller().stream_api_test({}))
+
+    assert time.monotonic() - start < 10
+    assert events[-1]["event"] == "end"
+    assert events[-1]["status"] == TIMEOUT
+    assert events[-1]["returncode"] != 0
+    with pytest.raises(ProcessLookupError):
+        os.kill(events[0]["pid"], 0)
+
+
+def test_invalid_test_type_raises():
+    with pytest.raises(ValueError):
+        list(Controller().stream_test("invalid", {}))
+
+
+def stub_stream(keyword, payload):
+    yield {"event": "start", "run_id": "r1"}
+    yield {"event": "line", "run_id": "r1", "line": "collected 1 item"}
+    yield {"event": "end", "run_id": "r1", "status": "success", "returncode": 0}
+
+
+def test_stream_endpoint_ndjson_events_carry_the_job_id(app_client, monkeypatch):
+    monkeypatch.setattr(app_client.main, "stream_test", stub_stream)
+
+    response = app_client.post("/run_test/stream?format=ndjson", json={"keyword": "create_user", "payload": {}})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["start", "line", "end"]
+    job_ids = {event["job_id"] for event in events}
+    assert len(job_ids) == 1
+    job = app_client.main.job_manager.get(job_ids.pop())
+    job.future.result(timeout=5)
+    assert job.status == "completed"
+
+
+def test_stream_endpoint_sse_and_unknown_format(app_client, monkeypatch):
+    monkeypatch.setattr(app_client.main, "stream_test", stub_stream)
+
+    response = app_client.post("/run_test/stream", json={"keyword": "create_user", "payload": {}})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: start\ndata: ")
+    assert "event: end\n" in response.text
+    assert app_client.post("/run_test/stream?format=xml", json={"keyword": "create_user", "payload": {}}).status_code == 422
@@ -0,0 +1,62 @@
+"""
+Tests for per-worker database isolation of the API test suite.
+
+pdm run pytest tests/runner/test_worker_isolation.py -s
+"""
+
+import pytest
+from tests.api import test_utils
+from tests.api.test_utils import APITestHelper, MongoDBCleaner, worker_config
+
+
+@pytest.fixture(autouse=True)
+def fresh_config(monkeypatch):
+    for name in ("API_TEST_ISOLATION", "API_BASE_URLS", "API_DB_HEADER", "PYTEST_XDIST_WORKER",
+                 "TEST_WORKER_ID", "MONGO_DB_NAME", "API_BASE_URL"):
+        monkeypatch.delenv(name, raising=False)
+    worker_config.cache_clear()
+    yield
+    worker_config.cache_clear()
+
+
+def test_shared_database_by_default(monkeypatch):
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+    config = worker_config()
+
+    assert not config.isolated
+    assert config.db_name == "events_test"
+    assert MongoDBCleaner().db_name == "events_test"
+
+
+def test_each_worker_gets_its_database_and_api(monkeypatch):
+    monkeypatch.setenv("API_TEST_ISOLATION", "database")
+    monkeypatch.setenv("API_BASE_URLS", "http://localhost:5500, http://localhost:5501")
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+    config = worker_config()
+
+    assert config.isolated
+    assert config.db_name == "events_test_gw1"
+    assert config.api_base_url == "http://localhost:5501"
+    assert MongoDBCleaner().db_name == "events_test_gw1"
+    assert APITestHelper().get_entity_url("user") == "http://localhost:5501/api/user"
+
+
+def test_database_header_mode(monkeypatch):
+    monkeypatch.setenv("API_TEST_ISOLATION", "database")
+    monkeypatch.setenv("API_DB_HEADER", "X-Database")
+    monkeypatch.setenv("TEST_WORKER_ID", "w3")
+
+    assert worker_config().api_headers == {"X-Database": "events_test_w3"}
+
+
+def test_isolation_without_api_routing_is_an_error(monkeypatch):
+    monkeypatch.setenv("API_TEST_ISOLATION", "database")
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw0")
+
+    with pytest.raises(RuntimeError, match="API_BASE_URLS or API_DB_HEADER"):
+        worker_config()
+
+
+def test_worker_index():
+    assert test_utils.worker_index("gw12") == 12
+    assert test_utils.worker_index("main") == 0
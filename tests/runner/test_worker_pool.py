@@ -0,0 +1,113 @@
+"""
+Tests for the warm pytest worker pool used by the API test Controller.
+
+pdm run pytest tests/runner/test_worker_pool.py -s
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+from curly_octo_guacamole.api.controllers.worker_pool import PROJECT_ROOT, PytestWorkerPool
+from tests.runner.test_cancellation import _alive
+
+
+@pytest.fixture
+def sample_test_file(tmp_path):
+    """Write a tiny test module that reads its input from the environment."""
+    test_file = tmp_path / "test_sample.py"
+    test_file.write_text(
+        "import os\n"
+        "def test_passes():\n"
+        "    assert os.environ.get('TEST_DATA') == 'hello'\n"
+    )
+    return test_file
+
+
+def test_pool_runs_pytest_in_worker(sample_test_file):
+    """A pooled run reports pytest's return code and output."""
+    pool = PytestWorkerPool(size=1, max_runs=10, warm_modules=())
+    try:
+        args = [str(sample_test_file), "-p", "no:cacheprovider", "--capture=no"]
+        passed = pool.run(args, {"TEST_DATA": "hello"})
+        failed = pool.run(args, {"TEST_DATA": "other"})
+    finally:
+        pool.close()
+
+    assert passed["returncode"] == 0, passed["stdout"]
+    assert "1 passed" in passed["stdout"]
+    assert failed["returncode"] == 1
+    assert passed["pid"] == failed["pid"], "Both runs should reuse the warm worker"
+
+
+def test_pool_recycles_worker_after_max_runs(sample_test_file):
+    """Workers are replaced once they reach max_runs."""
+    pool = PytestWorkerPool(size=1, max_runs=2, warm_modules=())
+    try:
+        args = [str(sample_test_file), "-p", "no:cacheprovider", "--capture=no"]
+        pids = [pool.run(args, {"TEST_DATA": "hello"})["pid"] for _ in range(3)]
+    finally:
+        pool.close()
+
+    assert pids[0] == pids[1]
+    assert pids[2] != pids[1]
+
+
+def test_pool_rejects_invalid_size():
+    with pytest.raises(ValueError):
+        PytestWorkerPool(size=0)
+
+
+@pytest.fixture
+def pool_lifecycle(monkeypatch):
+    """Records the service starting and closing the shared pool; list it before ``app_client``."""
+    from app import main
+
+    calls = []
+    monkeypatch.setattr(main, "get_worker_pool", lambda: calls.append("start"))
+    monkeypatch.setattr(main, "close_worker_pool", lambda: calls.append("close"))
+    return calls
+
+
+@pytest.mark.parametrize("runner_mode, started", [("local", ["start"]), ("coordinator", [])])
+def test_service_starts_the_pool_before_the_first_request(pool_lifecycle, app_client, started):
+    assert pool_lifecycle == started
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups are POSIX only")
+def test_workers_exit_when_the_service_dies_mid_run(tmp_path):
+    pids_file = tmp_path / "pids"
+    (tmp_path / "test_hang.py").write_text(
+        "import os, subprocess, sys, time\n"
+        "def test_hang():\n"
+        "    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"    open({str(pids_file)!r}, 'w').write(f'{{os.getpid()}} {{child.pid}}')\n"
+        "    time.sleep(60)\n"
+    )
+    (tmp_path / "service.py").write_text(
+        "import sys\n"
+        "from curly_octo_guacamole.api.controllers.worker_pool import PytestWorkerPool\n"
+        "if __name__ == '__main__':\n"
+        "    pool = PytestWorkerPool(size=1, warm_modules=(), project_root=sys.argv[1])\n"
+        "    pool.run(['test_hang.py', '-p', 'no:cacheprovider'], {})\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(PROJECT_ROOT / "src"), str(PROJECT_ROOT)])}
+    service = subprocess.Popen([sys.executable, str(tmp_path / "service.py"), str(tmp_path)], env=env)
+    try:
+        deadline = time.monotonic() + 20
+        while not (pids_file.exists() and len(pids_file.read_text().split()) == 2):
+            assert time.monotonic() < deadline, "the pooled test never started"
+            time.sleep(0.05)
+        pids = [int(pid) for pid in pids_file.read_text().split()]
+        service.send_signal(signal.SIGKILL)
+        service.wait(5)
+
+        deadline = time.monotonic() + 5
+        while any(_alive(pid) for pid in pids) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not any(_alive(pid) for pid in pids)
+    finally:
+        service.kill()